@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+"""
+Performance benchmarks of the SVM40 driver.
+
+Measures the construction and the response decoding of every command class
+and complete round-trips of the ``Svm40I2cDevice`` methods against an
+in-memory transceiver replaying responses recorded from the simulator, i.e.
+only the time spent in the host software is measured. The results are
+written as JSON to allow tracking them between releases::
+
+    python benchmarks/benchmark.py --output results.json
+    python benchmarks/benchmark.py --compare results.json
+
+With ``--compare``, every benchmark which is slower than the baseline by
+more than the given tolerance is reported and the exit code is 1.
+"""
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_driver import I2cConnection
+from sensirion_i2c_driver.transceiver_v1 import I2cTransceiverV1
+from sensirion_i2c_svm40 import Svm40I2cDevice, __version__
+from sensirion_i2c_svm40.commands import generated, wrapped
+from sensirion_i2c_svm40.commands.generated import Svm40I2cCmdBase
+from sensirion_i2c_svm40.simulation import Svm40SimulatedTransceiver
+import argparse
+import inspect
+import json
+import platform
+import sys
+import timeit
+
+
+# Constructor arguments of the commands with parameters.
+COMMAND_ARGS = {
+    (generated, 'Svm40I2cCmdSetTemperatureOffsetForRhtMeasurements'): (300,),
+    (wrapped, 'Svm40I2cCmdSetTemperatureOffsetForRhtMeasurements'): (1.5,),
+    (generated, 'Svm40I2cCmdSetVocAlgorithmTuningParameters'):
+        (100, 12, 180, 50),
+    (generated, 'Svm40I2cCmdSetVocAlgorithmState'): ([0] * 8,),
+}
+
+
+def _command_classes():
+    """
+    Get all command classes defined in the generated and wrapped modules.
+    """
+    for module in (generated, wrapped):
+        for name, cls in sorted(inspect.getmembers(module, inspect.isclass)):
+            if cls.__module__ == module.__name__ and \
+                    issubclass(cls, Svm40I2cCmdBase) and \
+                    cls is not Svm40I2cCmdBase:
+                yield module, name, cls
+
+
+class ReplayTransceiver(I2cTransceiverV1):
+    """
+    In-memory transceiver which returns prerecorded responses immediately,
+    so the device benchmarks measure only the host software.
+    """
+    description = "Replay transceiver"
+    channel_count = None
+
+    def __init__(self, responses):
+        super(ReplayTransceiver, self).__init__()
+        self._responses = responses
+
+    def transceive(self, slave_address, tx_data, rx_length, read_delay,
+                   timeout):
+        if rx_length is None:
+            return self.STATUS_OK, None, b""
+        return self.STATUS_OK, None, self._responses[bytes(tx_data[0:2])]
+
+
+def _record_responses():
+    """
+    Record a valid response of every command with response data from the
+    simulator in measurement mode.
+    """
+    transceiver = Svm40SimulatedTransceiver(realtime=False, speed=1e6)
+    transceiver.transceive(0x6A, b"\x00\x10", None, 0.0, 0.0)
+    responses = {}
+    for module, name, cls in _command_classes():
+        command = cls(*COMMAND_ARGS.get((module, name), ()))
+        if command.rx_length:
+            status, error, rx_data = transceiver.transceive(
+                0x6A, command.tx_data, command.rx_length, 0.0, 0.0)
+            if status != transceiver.STATUS_OK:
+                raise error
+            responses[bytes(command.tx_data[0:2])] = rx_data
+    return responses
+
+
+def command_benchmarks():
+    """
+    Get the construction and decoding benchmarks of all command classes.
+
+    Every command with response data gets a decoding benchmark of both its
+    generated and its wrapped class (if any), so the decoders of the wrapped
+    commands can be compared with the generated ones.
+
+    :return: List of (group, name, callable) tuples.
+    :rtype: list
+    """
+    responses = _record_responses()
+    benchmarks = []
+    for module, name, cls in _command_classes():
+        short_module = module.__name__.rsplit('.', 1)[-1]
+        args = COMMAND_ARGS.get((module, name), ())
+        benchmarks.append(('construct', short_module + '.' + name,
+                           lambda cls=cls, args=args: cls(*args)))
+        command = cls(*args)
+        if command.rx_length:
+            data = responses[bytes(command.tx_data[0:2])]
+            benchmarks.append(('decode', short_module + '.' + name,
+                               lambda c=command, d=data:
+                               c.interpret_response(d)))
+    return benchmarks
+
+
+def device_benchmarks():
+    """
+    Get the round-trip benchmarks of the device methods which do not have a
+    post processing time, against the in-memory replay transceiver.
+
+    :return: List of (group, name, callable) tuples.
+    :rtype: list
+    """
+    device = Svm40I2cDevice(I2cConnection(ReplayTransceiver(
+        _record_responses())))
+    state = device.get_voc_state()
+    return [
+        ('device', 'get_serial_number', device.get_serial_number),
+        ('device', 'get_version', device.get_version),
+        ('device', 'get_compensation_temperature_offset',
+         device.get_compensation_temperature_offset),
+        ('device', 'set_compensation_temperature_offset',
+         lambda: device.set_compensation_temperature_offset(1.5)),
+        ('device', 'get_voc_tuning_parameters',
+         device.get_voc_tuning_parameters),
+        ('device', 'set_voc_tuning_parameters',
+         lambda: device.set_voc_tuning_parameters(100, 12, 180, 50)),
+        ('device', 'set_voc_state', lambda: device.set_voc_state(state)),
+        ('device', 'get_voc_state', device.get_voc_state),
+        ('device', 'read_measured_values', device.read_measured_values),
+        ('device', 'read_measured_values_raw',
+         device.read_measured_values_raw),
+        ('device', 'read_measured_values(compact=True)',
+         lambda: device.read_measured_values(compact=True)),
+        ('device', 'read_measured_values_raw(compact=True)',
+         lambda: device.read_measured_values_raw(compact=True)),
+    ]
+
+
+def run(benchmarks, number, repeat):
+    """
+    Run benchmarks and return their results.
+
+    :param list benchmarks: List of (group, name, callable) tuples.
+    :param int number: Number of calls per timing.
+    :param int repeat: Number of timings, the fastest one is reported.
+    :return: One dict per benchmark with the time per call in microseconds.
+    :rtype: list
+    """
+    results = []
+    for group, name, function in benchmarks:
+        timings = timeit.repeat(function, number=number, repeat=repeat)
+        results.append({
+            'group': group,
+            'name': name,
+            'usec_per_call': min(timings) / number * 1e6,
+        })
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results against a baseline.
+
+    :param list results: The current results.
+    :param list baseline: The baseline results.
+    :param float tolerance: Allowed relative slowdown, e.g. 0.2 for 20%.
+    :return: List of messages describing the regressions.
+    :rtype: list
+    """
+    reference = {(r['group'], r['name']): r['usec_per_call'] for r in baseline}
+    regressions = []
+    for result in results:
+        key = (result['group'], result['name'])
+        if key in reference and \
+                result['usec_per_call'] > reference[key] * (1. + tolerance):
+            regressions.append("{} {}: {:.2f} us (baseline {:.2f} us)".format(
+                key[0], key[1], result['usec_per_call'], reference[key]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--number', type=int, default=2000,
+                        help="calls per timing (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="timings per benchmark (default: %(default)s)")
+    parser.add_argument('--filter', default='',
+                        help="only run benchmarks containing this text")
+    parser.add_argument('--output', help="write JSON results to this file")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="JSON results to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed relative slowdown (default: "
+                             "%(default)s)")
+    args = parser.parse_args(argv)
+
+    benchmarks = [b for b in command_benchmarks() + device_benchmarks()
+                  if args.filter in b[0] + ' ' + b[1]]
+    results = run(benchmarks, args.number, args.repeat)
+    report = {
+        'package_version': __version__,
+        'python_version': platform.python_version(),
+        'python_implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'number': args.number,
+        'repeat': args.repeat,
+        'results': results,
+    }
+    for result in results:
+        print("{group:10} {name:60} {usec_per_call:8.2f} us".format(**result))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)['results'],
+                                  args.tolerance)
+        for message in regressions:
+            print("REGRESSION: " + message)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+"""
+Import time benchmarks of the SVM40 driver.
+
+Measures the time to import the package and some of its modules in a fresh
+interpreter (i.e. including all imported dependencies), and lists the heavy
+dependencies loaded by every import. The results use the same format as
+``benchmark.py``, so they can be stored and compared the same way::
+
+    python benchmarks/import_time.py --output import_results.json
+    python benchmarks/import_time.py --compare import_results.json
+
+With ``--compare``, every import which is slower than the baseline by more
+than the given tolerance is reported and the exit code is 1.
+"""
+
+from __future__ import absolute_import, division, print_function
+from benchmark import compare
+import argparse
+import json
+import platform
+import subprocess
+import sys
+
+
+# Modules to measure.
+MODULES = [
+    'sensirion_i2c_svm40',
+    'sensirion_i2c_svm40.version',
+    'sensirion_i2c_svm40.response_types',
+    'sensirion_i2c_svm40.cli',
+    'sensirion_i2c_svm40.device',
+]
+
+# Dependencies which should only be loaded when needed.
+HEAVY_MODULES = [
+    'sensirion_i2c_driver',
+    'sensirion_shdlc_driver',
+    'numpy',
+]
+
+_MEASURE = """
+import json, sys, time
+start = time.time()
+import {module}
+elapsed = time.time() - start
+print(json.dumps([elapsed, [m for m in {heavy!r} if m in sys.modules]]))
+"""
+
+
+def measure(module, repeat):
+    """
+    Measure the import time of a module in fresh interpreters.
+
+    :param str module: Name of the module.
+    :param int repeat: Number of interpreters, the fastest one is reported.
+    :return: The import time in microseconds and the loaded heavy modules.
+    :rtype: tuple
+    """
+    code = _MEASURE.format(module=module, heavy=HEAVY_MODULES)
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', code])
+        elapsed, loaded = json.loads(output.decode('utf-8'))
+        timings.append(elapsed)
+    return min(timings) * 1e6, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=10,
+                        help="interpreters per module (default: %(default)s)")
+    parser.add_argument('--output', help="write JSON results to this file")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="JSON results to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed relative slowdown (default: "
+                             "%(default)s)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for module in MODULES:
+        usec, loaded = measure(module, args.repeat)
+        results.append({
+            'group': 'import',
+            'name': module,
+            'usec_per_call': usec,
+            'loaded': loaded,
+        })
+        print("{:40} {:10.0f} us  {}".format(module, usec, ', '.join(loaded)))
+    report = {
+        'python_version': platform.python_version(),
+        'python_implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)['results'],
+                                  args.tolerance)
+        for message in regressions:
+            print("REGRESSION: " + message)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
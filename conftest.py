@@ -7,6 +7,7 @@ from sensirion_shdlc_sensorbridge import SensorBridgePort, \
     SensorBridgeShdlcDevice, SensorBridgeI2cProxy
 from sensirion_i2c_driver import I2cConnection
 from sensirion_i2c_svm40 import Svm40I2cDevice
+from sensirion_i2c_svm40.simulation import Svm40SimulatedTransceiver
 import pytest
 
 
@@ -73,3 +74,11 @@ def device(bridge):
 
     # make sure the channel is powered off after executing tests
     bridge.switch_supply_off(SensorBridgePort.ONE)
+
+
+@pytest.fixture
+def simulated_device():
+    # SVM40 device connected to a simulated transceiver, running 100 times
+    # faster than real time to get new measurement values every 10ms
+    transceiver = Svm40SimulatedTransceiver(speed=100.0)
+    yield Svm40I2cDevice(I2cConnection(transceiver))
@@ -3,6 +3,44 @@
 
 from __future__ import absolute_import, division, print_function
 from .version import version as __version__  # noqa: F401
-from .device import Svm40I2cDevice  # noqa: F401
+import importlib
+import sys
 
 __copyright__ = '(c) Copyright 2020 Sensirion AG, Switzerland'
+
+__all__ = ['Svm40I2cDevice']
+
+# Public names and the submodules defining them. They are imported on first
+# access, so importing the package (e.g. for the response types) does not
+# load the device and the I²C driver.
+_LAZY_IMPORTS = {
+    'Svm40I2cDevice': 'device',
+}
+
+
+def __getattr__(name):
+    """
+    Import the lazily loaded public names on first access (PEP 562). For
+    compatibility, submodules are imported on first access as well (e.g.
+    ``sensirion_i2c_svm40.device`` after ``import sensirion_i2c_svm40``).
+    """
+    from importlib.util import find_spec
+    module = _LAZY_IMPORTS.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module('.' + module, __name__), name)
+    elif not name.startswith('_') and \
+            find_spec('.' + name, __name__) is not None:
+        value = importlib.import_module('.' + name, __name__)
+    else:
+        raise AttributeError("module '{}' has no attribute '{}'".format(
+            __name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
+if sys.version_info < (3, 7):  # no module __getattr__, import eagerly
+    from .device import Svm40I2cDevice  # noqa: F401
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+import time
+
+# Clock for measuring time intervals (not affected by system time changes)
+clock = getattr(time, 'monotonic', time.time)
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from collections import deque
+from .response_types import _values_to_ticks
+import math
+import time
+
+import logging
+log = logging.getLogger(__name__)
+
+
+#: Scale factors of all fields which can be aggregated (ticks per unit).
+SCALE_FACTORS = {
+    'voc_index': 10,
+    'humidity': 100,
+    'temperature': 200,
+    'raw_voc_ticks': 1,
+    'raw_humidity': 100,
+    'raw_temperature': 200,
+}
+
+
+class WindowStatistics(object):
+    """
+    Statistics of a field over a time window, in converted units (VOC index,
+    %RH, °C or raw VOC ticks).
+    """
+    def __init__(self, count, minimum, maximum, mean, stddev):
+        super(WindowStatistics, self).__init__()
+
+        #: Number of samples in the window (int).
+        self.count = count
+
+        #: Minimum value (float), None if the window is empty.
+        self.min = minimum
+
+        #: Maximum value (float), None if the window is empty.
+        self.max = maximum
+
+        #: Mean value (float), None if the window is empty.
+        self.mean = mean
+
+        #: Population standard deviation (float), None if the window is
+        #: empty.
+        self.stddev = stddev
+
+    def __repr__(self):
+        return "WindowStatistics(count={}, min={}, max={}, mean={}, " \
+            "stddev={})".format(self.count, self.min, self.max, self.mean,
+                                self.stddev)
+
+
+class _RollingWindow(object):
+    """
+    Rolling statistics of integer values over a time window.
+
+    The sum and the sum of squares are kept as Python integers (i.e. exact,
+    without floating point drift), and the minimum and maximum are tracked
+    with monotonic deques. Every sample is added and removed exactly once,
+    so the cost per sample is amortized O(1).
+    """
+    def __init__(self, duration):
+        super(_RollingWindow, self).__init__()
+        self.duration = duration
+        self._samples = deque()
+        self._minima = deque()  # increasing values
+        self._maxima = deque()  # decreasing values
+        self._sum = 0
+        self._sum_of_squares = 0
+
+    def add(self, timestamp, value):
+        self._samples.append((timestamp, value))
+        self._sum += value
+        self._sum_of_squares += value * value
+        minima = self._minima
+        while minima and minima[-1][1] >= value:
+            minima.pop()
+        minima.append((timestamp, value))
+        maxima = self._maxima
+        while maxima and maxima[-1][1] <= value:
+            maxima.pop()
+        maxima.append((timestamp, value))
+
+    def expire(self, now):
+        cutoff = now - self.duration
+        samples = self._samples
+        while samples and samples[0][0] <= cutoff:
+            _, value = samples.popleft()
+            self._sum -= value
+            self._sum_of_squares -= value * value
+        while self._minima and self._minima[0][0] <= cutoff:
+            self._minima.popleft()
+        while self._maxima and self._maxima[0][0] <= cutoff:
+            self._maxima.popleft()
+
+    def statistics(self, scale_factor):
+        count = len(self._samples)
+        if count == 0:
+            return WindowStatistics(0, None, None, None, None)
+        # n² * variance, exact in integer arithmetic
+        scaled_variance = count * self._sum_of_squares - self._sum ** 2
+        return WindowStatistics(
+            count,
+            self._minima[0][1] / scale_factor,
+            self._maxima[0][1] / scale_factor,
+            self._sum / count / scale_factor,
+            math.sqrt(scaled_variance) / count / scale_factor,
+        )
+
+
+class WindowedAggregator(object):
+    """
+    Incrementally maintained rolling statistics (min, max, mean, standard
+    deviation) of the measured values over several time windows.
+
+    The values are aggregated as integer ticks and converted only when the
+    statistics are requested. Every window keeps only the samples within its
+    duration, so the memory usage is bounded by the longest window and the
+    sample rate.
+
+    Example:
+
+    .. sourcecode:: python
+
+        aggregator = WindowedAggregator(windows=(60., 900., 3600.))
+        for values in device.iter_measurements():
+            aggregator.add(values)
+            stats = aggregator.statistics(900., 'temperature')
+            print(stats.min, stats.max, stats.mean, stats.stddev)
+
+    .. note:: The timestamps must not decrease. The windows end at the
+              timestamp of the newest sample.
+    """
+
+    def __init__(self, windows=(60., 900., 3600.),
+                 fields=('voc_index', 'humidity', 'temperature')):
+        """
+        Creates an empty aggregator.
+
+        :param tuple windows: Durations of the windows in seconds.
+        :param tuple fields:
+            Fields to aggregate, any of ``'voc_index'``, ``'humidity'``,
+            ``'temperature'``, ``'raw_voc_ticks'``, ``'raw_humidity'`` and
+            ``'raw_temperature'`` (the raw fields require raw values to be
+            added).
+        """
+        super(WindowedAggregator, self).__init__()
+        for field in fields:
+            if field not in SCALE_FACTORS:
+                raise ValueError("Unknown field '{}'.".format(field))
+        self._windows = tuple(float(window) for window in windows)
+        self._fields = tuple(fields)
+        self._rolling = dict(
+            ((window, field), _RollingWindow(window))
+            for window in self._windows for field in self._fields)
+        self._last_timestamp = None
+
+    @property
+    def windows(self):
+        """
+        Durations of the windows in seconds.
+
+        :type: tuple(float)
+        """
+        return self._windows
+
+    @property
+    def fields(self):
+        """
+        Names of the aggregated fields.
+
+        :type: tuple(str)
+        """
+        return self._fields
+
+    def add(self, values, timestamp=None):
+        """
+        Add a measurement as returned by a device.
+
+        :param tuple values:
+            The response of
+            :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.read_measured_values`
+            or
+            :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.read_measured_values_raw`.
+        :param float timestamp:
+            Timestamp of the measurement. Defaults to the current time.
+        """  # noqa: E501
+        self.add_ticks(timestamp=timestamp, **_values_to_ticks(values))
+
+    def add_ticks(self, timestamp=None, **ticks):
+        """
+        Add a measurement given as ticks.
+
+        :param float timestamp:
+            Timestamp of the measurement. Defaults to the current time.
+        :param ticks:
+            The ticks of (at least) all aggregated fields as keyword
+            arguments, e.g. ``voc_index=1000, humidity=4500,
+            temperature=5000``.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if self._last_timestamp is not None and \
+                timestamp < self._last_timestamp:
+            raise ValueError("Timestamps must not decrease.")
+        values = [(rolling, int(ticks[field]))
+                  for (_, field), rolling in self._rolling.items()]
+        self._last_timestamp = timestamp
+        for rolling, value in values:
+            rolling.add(timestamp, value)
+            rolling.expire(timestamp)
+
+    def statistics(self, window, field):
+        """
+        Get the statistics of a field over a window.
+
+        :param float window: Duration of the window in seconds.
+        :param str field: Name of the field.
+        :return: The statistics in converted units.
+        :rtype: ~sensirion_i2c_svm40.aggregation.WindowStatistics
+        """
+        return self._rolling[(float(window), field)].statistics(
+            SCALE_FACTORS[field])
+
+    def summary(self):
+        """
+        Get the statistics of all fields over all windows.
+
+        :return: Dict of window duration to dict of field name to
+                 :py:class:`WindowStatistics`.
+        :rtype: dict
+        """
+        return dict(
+            (window, dict((field, self.statistics(window, field))
+                          for field in self._fields))
+            for window in self._windows)
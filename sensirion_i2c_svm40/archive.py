@@ -0,0 +1,519 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+"""
+Compressed, chunked archive format for long-term measurement history.
+
+The records (same fields as the :py:mod:`~sensirion_i2c_svm40.binary_log`)
+are grouped into chunks covering a configurable time span. Within a chunk,
+every field is stored as column: The values are delta encoded, zigzag
+encoded (small negative deltas become small positive numbers), split into
+byte planes and finally compressed with LZMA (or zlib, e.g. on Python 2
+where the :py:mod:`lzma` module is not available). Since the ticks change
+slowly, this typically needs less than a tenth of the size of the raw
+records.
+
+Every chunk starts with a header containing the number of records, the
+timestamp range and the minimum, maximum and mean of every field, and it
+can be decoded without reading any other chunk. Timestamps are stored with
+a resolution of one millisecond.
+
+.. note:: This module requires NumPy (``pip install numpy``).
+"""
+
+from __future__ import absolute_import, division, print_function
+from .binary_log import FIELDS, record_dtype
+from struct import Struct
+import numpy as np
+import os
+import zlib
+try:
+    import lzma
+except ImportError:  # Python 2
+    lzma = None
+
+import logging
+log = logging.getLogger(__name__)
+
+#: Magic bytes at the beginning of every archive file.
+MAGIC = b"SVM40ARC"
+
+#: Version of the file format.
+FORMAT_VERSION = 1
+
+_FILE_HEADER = Struct("<8sH6x")
+_CHUNK_HEADER = Struct("<4sB3xIIIdd")
+_FIELD_STATISTICS = Struct("<iiq")
+_CHUNK_MAGIC = b"CHNK"
+
+# Integer fields (all except the timestamp)
+_INTEGER_FIELDS = FIELDS[1:]
+
+# Compression methods: name -> (ID stored in the chunk header, compress
+# function, decompress function)
+_COMPRESSIONS = {
+    'zlib': (1, lambda data: zlib.compress(data, 9), zlib.decompress),
+}
+if lzma is not None:
+    _COMPRESSIONS['lzma'] = (2, lzma.compress, lzma.decompress)
+
+#: Compression used by default, 'lzma' if available, otherwise 'zlib'.
+DEFAULT_COMPRESSION = 'lzma' if lzma is not None else 'zlib'
+
+
+class FieldStatistics(object):
+    """
+    Statistics of a field within a chunk.
+    """
+    def __init__(self, minimum, maximum, total, count):
+        super(FieldStatistics, self).__init__()
+
+        #: Minimum value (int).
+        self.min = minimum
+
+        #: Maximum value (int).
+        self.max = maximum
+
+        #: Sum of all values (int).
+        self.total = total
+
+        #: Mean value (float).
+        self.mean = total / count if count else float('nan')
+
+    def __repr__(self):
+        return "FieldStatistics(min={}, max={}, mean={:.2f})".format(
+            self.min, self.max, self.mean)
+
+
+class ChunkInfo(object):
+    """
+    Header information of a chunk, available without decoding it.
+    """
+    def __init__(self, offset, compression, count, payload_size, checksum,
+                 min_timestamp, max_timestamp, statistics):
+        super(ChunkInfo, self).__init__()
+
+        #: Position of the chunk in the file (int).
+        self.offset = offset
+
+        #: Name of the compression method (str).
+        self.compression = compression
+
+        #: Number of records (int).
+        self.count = count
+
+        #: Size of the compressed payload in bytes (int).
+        self.payload_size = payload_size
+
+        #: CRC-32 of the compressed payload (int).
+        self.checksum = checksum
+
+        #: Smallest timestamp of the chunk (float).
+        self.min_timestamp = min_timestamp
+
+        #: Largest timestamp of the chunk (float).
+        self.max_timestamp = max_timestamp
+
+        #: Dict of field name to :py:class:`FieldStatistics` for all fields
+        #: except the timestamp.
+        self.statistics = statistics
+
+    @property
+    def size(self):
+        """
+        Total size of the chunk in the file in bytes.
+
+        :type: int
+        """
+        return _CHUNK_HEADER.size + \
+            len(_INTEGER_FIELDS) * _FIELD_STATISTICS.size + self.payload_size
+
+
+def _zigzag_delta(values):
+    """
+    Delta and zigzag encode an int64 array into an uint64 array.
+    """
+    delta = np.diff(values, prepend=np.int64(0))
+    return ((delta << 1) ^ (delta >> 63)).view(np.uint64)
+
+
+def _unzigzag_delta(encoded):
+    """
+    Inverse of :py:func:`_zigzag_delta`.
+    """
+    delta = (encoded >> np.uint64(1)).view(np.int64) ^ \
+        -(encoded & np.uint64(1)).view(np.int64)
+    return np.cumsum(delta)
+
+
+def _encode_column(values, width):
+    """
+    Encode a column to its byte planes (least significant bytes first).
+    """
+    encoded = _zigzag_delta(values.astype(np.int64)).astype('<u{}'.format(
+        width))
+    return encoded.view(np.uint8).reshape(-1, width).T.tobytes()
+
+
+def _decode_column(data, count, width):
+    """
+    Decode a column from its byte planes.
+    """
+    planes = np.frombuffer(data, dtype=np.uint8).reshape(width, count)
+    encoded = np.ascontiguousarray(planes.T).view('<u{}'.format(width))
+    return _unzigzag_delta(encoded.reshape(-1).astype(np.uint64))
+
+
+# Width in bytes of the encoded columns (zigzag encoded deltas of 16 bit
+# values need 17 bits).
+_COLUMN_WIDTHS = [8] + [4] * len(_INTEGER_FIELDS)
+
+
+def encode_chunk(records, compression=DEFAULT_COMPRESSION):
+    """
+    Encode records into a chunk.
+
+    :param numpy.ndarray records:
+        Structured array with the fields of
+        :py:func:`~sensirion_i2c_svm40.binary_log.record_dtype`.
+    :param str compression: The compression method, 'lzma' or 'zlib'.
+    :return: The encoded chunk.
+    :rtype: bytes
+    """
+    count = len(records)
+    if count == 0:
+        raise ValueError("A chunk must contain at least one record.")
+    timestamps = records['timestamp']
+    compression_id, compress, _ = _COMPRESSIONS[compression]
+    columns = [np.round(timestamps * 1e3).astype(np.int64)] + \
+        [records[name] for name in _INTEGER_FIELDS]
+    payload = compress(b"".join(
+        _encode_column(column, width)
+        for column, width in zip(columns, _COLUMN_WIDTHS)))
+    header = _CHUNK_HEADER.pack(
+        _CHUNK_MAGIC, compression_id, count, len(payload),
+        zlib.crc32(payload) & 0xFFFFFFFF, float(timestamps.min()),
+        float(timestamps.max()))
+    statistics = b"".join(_FIELD_STATISTICS.pack(
+        int(records[name].min()), int(records[name].max()),
+        int(records[name].sum(dtype=np.int64))) for name in _INTEGER_FIELDS)
+    return header + statistics + payload
+
+
+def _decode_chunk_header(data, offset=0):
+    """
+    Decode a chunk header, returns a :py:class:`ChunkInfo`.
+    """
+    magic, compression_id, count, payload_size, checksum, min_timestamp, \
+        max_timestamp = _CHUNK_HEADER.unpack_from(data, 0)
+    if magic != _CHUNK_MAGIC:
+        raise ValueError("Invalid chunk header at offset {}.".format(offset))
+    compressions = [name for name, (id_, _, _) in _COMPRESSIONS.items()
+                    if id_ == compression_id]
+    if not compressions:
+        raise ValueError("Unsupported compression of chunk at offset {}."
+                         .format(offset))
+    statistics = {}
+    for i, name in enumerate(_INTEGER_FIELDS):
+        minimum, maximum, total = _FIELD_STATISTICS.unpack_from(
+            data, _CHUNK_HEADER.size + i * _FIELD_STATISTICS.size)
+        statistics[name] = FieldStatistics(minimum, maximum, total, count)
+    return ChunkInfo(offset, compressions[0], count, payload_size, checksum,
+                     min_timestamp, max_timestamp, statistics)
+
+
+def decode_chunk(data):
+    """
+    Decode a chunk encoded with :py:func:`encode_chunk`.
+
+    :param bytes data: The encoded chunk.
+    :return: Structured array with the records of the chunk.
+    :rtype: numpy.ndarray
+    :raise ValueError: If the chunk is corrupt.
+    """
+    info = _decode_chunk_header(data)
+    start = info.size - info.payload_size
+    payload = data[start:start + info.payload_size]
+    if len(payload) != info.payload_size or \
+            zlib.crc32(payload) & 0xFFFFFFFF != info.checksum:
+        raise ValueError("Corrupt chunk (wrong checksum).")
+    columns = _COMPRESSIONS[info.compression][2](payload)
+    records = np.zeros(info.count, dtype=record_dtype())
+    position = 0
+    for name, width in zip(FIELDS, _COLUMN_WIDTHS):
+        size = width * info.count
+        values = _decode_column(columns[position:position + size],
+                                info.count, width)
+        position += size
+        if name == 'timestamp':
+            records[name] = values / 1e3
+        else:
+            records[name] = values
+    return records
+
+
+class ArchiveWriter(object):
+    """
+    Writes records to an archive file.
+
+    Records are buffered until the current chunk covers ``chunk_duration``
+    seconds (or contains ``max_chunk_records`` records), then the chunk is
+    encoded and appended to the file. :py:meth:`close` writes the remaining
+    records as last chunk. Existing archives are appended to, after removing
+    an incomplete last chunk (e.g. after a crash during writing).
+
+    Example:
+
+    .. sourcecode:: python
+
+        with ArchiveWriter('2020.svm40arc') as writer:
+            for chunk in BinaryLogReader('2020.svm40log').chunks(100000):
+                writer.write(chunk)
+    """
+
+    def __init__(self, path, chunk_duration=3600.0, max_chunk_records=100000,
+                 compression=DEFAULT_COMPRESSION):
+        """
+        Opens an archive for appending, or creates it if it does not exist.
+
+        :param str path: Path to the archive file.
+        :param float chunk_duration: Maximum time span of a chunk in seconds.
+        :param int max_chunk_records: Maximum number of records per chunk.
+        :param str compression: The compression method, 'lzma' or 'zlib'.
+        :raise ValueError:
+            If ``chunk_duration`` or ``max_chunk_records`` is not positive, or
+            if the file exists but is not a valid archive.
+        """
+        super(ArchiveWriter, self).__init__()
+        if not chunk_duration > 0:
+            raise ValueError("Chunk duration must be positive.")
+        if max_chunk_records < 1:
+            raise ValueError("Maximum chunk records must be positive.")
+        self._chunk_duration = float(chunk_duration)
+        self._max_chunk_records = int(max_chunk_records)
+        if compression not in _COMPRESSIONS:
+            raise ValueError("Unsupported compression '{}'.".format(
+                compression))
+        self._compression = compression
+        self._pending = []
+        self._pending_count = 0
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._file = open(path, 'r+b')
+            try:
+                self._recover(path)
+            except Exception:
+                self._file.close()
+                raise
+        else:
+            self._file = open(path, 'wb')
+            self._file.write(_FILE_HEADER.pack(MAGIC, FORMAT_VERSION))
+
+    def _recover(self, path):
+        """
+        Check the header and truncate an incomplete (or corrupt) last chunk,
+        so new chunks are appended behind the last complete one.
+        """
+        size = os.fstat(self._file.fileno()).st_size
+        _check_file_header(self._file.read(_FILE_HEADER.size), path)
+        chunks = _scan_chunks(self._file, size, path)
+        end = chunks[-1].offset + chunks[-1].size if chunks \
+            else _FILE_HEADER.size
+        if chunks:
+            # a crash can leave a chunk of full size but with missing data
+            last = chunks[-1]
+            self._file.seek(last.offset + last.size - last.payload_size)
+            payload = self._file.read(last.payload_size)
+            if zlib.crc32(payload) & 0xFFFFFFFF != last.checksum:
+                log.warning("Ignoring corrupt last chunk at offset {} of "
+                            "'{}'.".format(last.offset, path))
+                end = last.offset
+        if end < size:
+            log.warning("Removing incomplete last chunk ({} bytes) from "
+                        "'{}'.".format(size - end, path))
+            self._file.truncate(end)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._file.seek(end)
+
+    def write(self, records):
+        """
+        Write records, ordered by timestamp.
+
+        :param numpy.ndarray records:
+            Structured array with the fields of
+            :py:func:`~sensirion_i2c_svm40.binary_log.record_dtype`, e.g. the
+            records of a
+            :py:class:`~sensirion_i2c_svm40.binary_log.BinaryLogReader`.
+        """
+        records = np.asarray(records)
+        while len(records):
+            if self._pending:
+                first_timestamp = self._pending[0]['timestamp'][0]
+            else:
+                first_timestamp = records['timestamp'][0]
+            limit = min(
+                np.searchsorted(records['timestamp'],
+                                first_timestamp + self._chunk_duration),
+                self._max_chunk_records - self._pending_count)
+            if not self._pending:
+                limit = max(limit, 1)  # always make progress
+            if limit < len(records):
+                self._pending.append(records[:limit])
+                self._pending_count += limit
+                self._write_chunk()
+                records = records[limit:]
+            else:
+                self._pending.append(np.array(records, dtype=record_dtype()))
+                self._pending_count += len(records)
+                break
+
+    def _write_chunk(self):
+        if self._pending_count:
+            self._file.write(encode_chunk(np.concatenate(self._pending),
+                                          self._compression))
+        self._pending = []
+        self._pending_count = 0
+
+    def close(self):
+        """
+        Write the remaining records and close the file.
+        """
+        if not self._file.closed:
+            try:
+                self._write_chunk()
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            finally:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _check_file_header(header, path):
+    if len(header) < _FILE_HEADER.size:
+        raise ValueError("'{}' is not an SVM40 archive.".format(path))
+    magic, version = _FILE_HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("'{}' is not an SVM40 archive.".format(path))
+    if version != FORMAT_VERSION:
+        raise ValueError("Unsupported format version {} of '{}'.".format(
+            version, path))
+
+
+def _scan_chunks(f, size, path):
+    """
+    Read the headers of all complete chunks of an archive file.
+
+    :param file f: The opened archive file.
+    :param int size: The size of the file.
+    :param str path: Path to the file (for messages).
+    :return: The chunks, without an incomplete last chunk.
+    :rtype: list(~sensirion_i2c_svm40.archive.ChunkInfo)
+    """
+    chunks = []
+    header_size = _CHUNK_HEADER.size + \
+        len(_INTEGER_FIELDS) * _FIELD_STATISTICS.size
+    offset = _FILE_HEADER.size
+    while offset < size:
+        f.seek(offset)
+        header = f.read(header_size)
+        if len(header) < header_size:
+            log.warning("Ignoring incomplete chunk at offset {} of '{}'."
+                        .format(offset, path))
+            break
+        info = _decode_chunk_header(header, offset)
+        if offset + info.size > size:
+            log.warning("Ignoring incomplete chunk at offset {} of '{}'."
+                        .format(offset, path))
+            break
+        chunks.append(info)
+        offset += info.size
+    return chunks
+
+
+class ArchiveReader(object):
+    """
+    Reads an archive file.
+
+    Opening an archive reads only the chunk headers. The chunks are decoded
+    on request, so e.g. a time range can be read without decoding the other
+    chunks. An incomplete last chunk (e.g. after a crash) is ignored.
+
+    Example:
+
+    .. sourcecode:: python
+
+        reader = ArchiveReader('2020.svm40arc')
+        for chunk in reader.chunks:
+            print(chunk.min_timestamp, chunk.statistics['temperature'].mean)
+        records = reader.read(start=t0, end=t0 + 86400.)
+    """
+
+    def __init__(self, path):
+        """
+        Opens an archive and reads its chunk headers.
+
+        :param str path: Path to the archive file.
+        :raise ValueError: If the file is not a valid archive.
+        """
+        super(ArchiveReader, self).__init__()
+        self._path = path
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            _check_file_header(f.read(_FILE_HEADER.size), path)
+            self._chunks = _scan_chunks(f, size, path)
+
+    @property
+    def chunks(self):
+        """
+        Header information of all chunks.
+
+        :type: list(~sensirion_i2c_svm40.archive.ChunkInfo)
+        """
+        return list(self._chunks)
+
+    def __len__(self):
+        return sum(chunk.count for chunk in self._chunks)
+
+    def read_chunk(self, index):
+        """
+        Decode a single chunk.
+
+        :param int index: Index of the chunk.
+        :return: Structured array with the records of the chunk.
+        :rtype: numpy.ndarray
+        """
+        info = self._chunks[index]
+        with open(self._path, 'rb') as f:
+            f.seek(info.offset)
+            return decode_chunk(f.read(info.size))
+
+    def read(self, start=None, end=None):
+        """
+        Read all records within a time range. Only the chunks overlapping
+        the range are decoded.
+
+        :param float start: Minimum timestamp, or None for no limit.
+        :param float end: Maximum timestamp (exclusive), or None for no limit.
+        :return: Structured array with the records.
+        :rtype: numpy.ndarray
+        """
+        parts = []
+        for index, info in enumerate(self._chunks):
+            if (start is not None and info.max_timestamp < start) or \
+                    (end is not None and info.min_timestamp >= end):
+                continue
+            records = self.read_chunk(index)
+            mask = np.ones(len(records), dtype=bool)
+            if start is not None:
+                mask &= records['timestamp'] >= start
+            if end is not None:
+                mask &= records['timestamp'] < end
+            parts.append(records[mask])
+        if not parts:
+            return np.zeros(0, dtype=record_dtype())
+        return np.concatenate(parts)
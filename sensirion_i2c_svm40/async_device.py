@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+"""
+asyncio based SVM40 I²C device.
+
+.. note:: This module requires Python 3.5 or newer.
+"""
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_driver import I2cCommand
+from ._clock import clock as _clock
+from .commands import prebuilt
+from .device import _PollScheduler
+from functools import partial
+from weakref import WeakKeyDictionary
+import asyncio
+
+import logging
+log = logging.getLogger(__name__)
+
+
+# One lock per I²C connection to serialize the bus access of all devices
+# connected to the same bus.
+_bus_locks = WeakKeyDictionary()
+
+
+def _get_bus_lock(connection):
+    """
+    Get the lock of a connection, create it if it does not exist yet.
+
+    .. note:: Must be called from within a coroutine to bind the lock to the
+              running event loop on Python < 3.10.
+    """
+    lock = _bus_locks.get(connection)
+    if lock is None:
+        lock = asyncio.Lock()
+        _bus_locks[connection] = lock
+    return lock
+
+
+class Svm40I2cAsyncDevice(object):
+    """
+    SVM40 I²C device class providing awaitable versions of all methods of
+    :py:class:`~sensirion_i2c_svm40.device.Svm40I2cDevice`.
+
+    The I²C transfers are executed in an executor (the default executor of
+    the event loop, if not specified otherwise), so they do not block the
+    event loop. All delays of the commands are awaited with
+    :py:func:`asyncio.sleep`: The write and read part of a command are
+    transferred separately with the read delay awaited in between, and the
+    post processing time is awaited after the command. The bus is locked
+    only during the transfers, so while a device is processing a command,
+    other devices on the same bus can communicate. Commands to the same
+    device are serialized.
+
+    .. note:: Only single-channel I²C connections are supported.
+
+    Example:
+
+    .. sourcecode:: python
+
+        async def sample(device):
+            await device.start_measurement()
+            while True:
+                await asyncio.sleep(1.)
+                print(await device.read_measured_values())
+
+        devices = [Svm40I2cAsyncDevice(connection, address)
+                   for connection, address in sensors]
+        loop.run_until_complete(asyncio.gather(*map(sample, devices)))
+    """
+
+    def __init__(self, connection, slave_address=0x6A, executor=None):
+        """
+        Constructs a new asynchronous SVM40 I²C device.
+
+        :param ~sensirion_i2c_driver.connection.I2cConnection connection:
+            The I²C connection to use for communication. All devices using the
+            same connection object share one bus lock.
+        :param byte slave_address:
+            The I²C slave address, defaults to 0x6A.
+        :param concurrent.futures.Executor executor:
+            Executor to run the I²C transfers in. If None (default), the
+            default executor of the event loop is used.
+        """
+        super(Svm40I2cAsyncDevice, self).__init__()
+        self._connection = connection
+        self._slave_address = slave_address
+        self._executor = executor
+        self._device_lock = None
+
+    @property
+    def connection(self):
+        """
+        Get the used I²C connection.
+
+        :return: The used I²C connection.
+        :rtype: ~sensirion_i2c_driver.connection.I2cConnection
+        """
+        return self._connection
+
+    @property
+    def slave_address(self):
+        """
+        Get the I²C slave address.
+
+        :return: The I²C slave address.
+        :rtype: byte
+        """
+        return self._slave_address
+
+    async def execute(self, command):
+        """
+        Execute an I²C command on this device.
+
+        :param ~sensirion_i2c_driver.command.I2cCommand command:
+            The command to be executed.
+        :return:
+            The interpreted response of the executed command.
+        :rtype:
+            Depends on the executed command.
+        """
+        if self._device_lock is None:
+            self._device_lock = asyncio.Lock()
+        async with self._device_lock:
+            if (command.tx_data is not None) and \
+                    (command.rx_length is not None) and \
+                    (command.read_delay > 0.0):
+                await self._transceive(I2cCommand(
+                    tx_data=command.tx_data, rx_length=None, read_delay=0.0,
+                    timeout=command.timeout))
+                await asyncio.sleep(command.read_delay)
+                data = await self._transceive(I2cCommand(
+                    tx_data=None, rx_length=command.rx_length,
+                    read_delay=0.0, timeout=command.timeout))
+                response = command.interpret_response(data or b"")
+            else:
+                response = await self._transceive(command)
+            if command.post_processing_time > 0.0:
+                await asyncio.sleep(command.post_processing_time)
+            return response
+
+    async def _transceive(self, command):
+        """
+        Transfer a command in the executor while holding the bus lock,
+        without waiting for the post processing time.
+        """
+        loop = asyncio.get_event_loop()
+        async with _get_bus_lock(self._connection):
+            return await loop.run_in_executor(self._executor, partial(
+                self._connection.execute, self._slave_address, command,
+                wait_post_process=False))
+
+    async def device_reset(self):
+        """
+        Execute a device reset (reboot firmware, similar to power cycle).
+        """
+        return await self.execute(prebuilt.DEVICE_RESET)
+
+    async def get_serial_number(self):
+        """
+        Get the serial number of the device.
+
+        :return: The serial number as a hex formatted ASCII string.
+        :rtype: string
+        """
+        return await self.execute(prebuilt.GET_SERIAL_NUMBER)
+
+    async def get_version(self):
+        """
+        Get the version of the device firmware, hardware and SHDLC protocol.
+
+        :return: The device version.
+        :rtype: ~sensirion_i2c_svm40.version_types.Version
+        """
+        return await self.execute(prebuilt.GET_VERSION)
+
+    async def get_compensation_temperature_offset(self):
+        """
+        Gets the temperature offset for RHT measurements.
+
+        :return: Temperature offset in degrees celsius.
+        :rtype: float
+        """
+        return await self.execute(prebuilt.GET_TEMPERATURE_OFFSET)
+
+    async def set_compensation_temperature_offset(self, t_offset):
+        """
+        Sets the temperature offset for RHT measurements. See
+        :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.set_compensation_temperature_offset`.
+
+        :param float t_offset: Temperature offset in degrees celsius.
+        """  # noqa: E501
+        return await self.execute(prebuilt.set_temperature_offset(t_offset))
+
+    async def get_voc_tuning_parameters(self):
+        """
+        Gets the currently set parameters for customizing the VOC algorithm.
+        See
+        :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.get_voc_tuning_parameters`.
+
+        :return: voc_index_offset, learning_time_hours,
+                 gating_max_duration_minutes, std_initial
+        :rtype: tuple
+        """  # noqa: E501
+        return await self.execute(prebuilt.GET_VOC_TUNING_PARAMETERS)
+
+    async def set_voc_tuning_parameters(self, voc_index_offset,
+                                        learning_time_hours,
+                                        gating_max_duration_minutes,
+                                        std_initial):
+        """
+        Sets parameters to customize the VOC algorithm. This command is only
+        available in idle mode. See
+        :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.set_voc_tuning_parameters`.
+
+        :param int voc_index_offset: VOC index representing typical
+                                     (average) conditions.
+        :param int learning_time_hours: Time constant of long-term estimator
+                                        in hours.
+        :param int gating_max_duration_minutes: Maximum duration of gating in
+                                                minutes.
+        :param int std_initial: Initial estimate for standard deviation.
+        """  # noqa: E501
+        return await self.execute(prebuilt.set_voc_tuning_parameters(
+            voc_index_offset, learning_time_hours, gating_max_duration_minutes,
+            std_initial))
+
+    async def store_nv_data(self):
+        """
+        Stores all customer engine parameters to the non-volatile memory.
+        """
+        return await self.execute(prebuilt.STORE_NV_DATA)
+
+    async def get_voc_state(self):
+        """
+        Gets the current VOC algorithm state. This command is only available
+        during measurement mode.
+
+        :return: Current VOC algorithm state.
+        :rtype: list(int)
+        """
+        return await self.execute(prebuilt.GET_VOC_STATE)
+
+    async def set_voc_state(self, state):
+        """
+        Set previously retrieved VOC algorithm state. This command is only
+        available in idle mode.
+
+        :param list(int) state: Current VOC algorithm state.
+        """
+        return await self.execute(prebuilt.set_voc_state(state))
+
+    async def start_measurement(self):
+        """
+        Starts continuous measurement in polling mode.
+
+        .. note:: This command is only available in idle mode.
+        """
+        return await self.execute(prebuilt.START_MEASUREMENT)
+
+    async def stop_measurement(self):
+        """
+        Leaves the measurement mode and returns to the idle mode.
+
+        .. note:: This command is only available in measurement mode.
+        """
+        return await self.execute(prebuilt.STOP_MEASUREMENT)
+
+    async def read_measured_values(self, compact=False):
+        """
+        Returns the new measurement results. See
+        :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.read_measured_values`.
+
+        :param bool compact: If True, the compact response types are
+                             returned.
+        :return: air_quality, humidity, temperature
+        :rtype: tuple
+        """  # noqa: E501
+        return await self.execute(prebuilt.read_measured_values(compact))
+
+    async def read_measured_values_raw(self, compact=False):
+        """
+        Returns the new measurement results with raw values added. See
+        :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.read_measured_values_raw`.
+
+        :param bool compact: If True, the compact response types are
+                             returned.
+        :return: air_quality, humidity, temperature, raw_voc_ticks,
+                 raw_humidity, raw_temperature
+        :rtype: tuple
+        """  # noqa: E501
+        return await self.execute(prebuilt.read_measured_values_raw(compact))
+
+    def iter_measurements(self, raw=False, compact=False, period=1.0,
+                          retry_interval=0.05, phase_step=0.01):
+        """
+        Asynchronous iterator which yields every new measurement exactly
+        once, with the poll phase locked to the update of the device. See
+        :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.iter_measurements`
+        for the parameters.
+
+        .. note:: Implemented as asynchronous iterator class instead of an
+                  asynchronous generator since the latter requires
+                  Python 3.6.
+
+        Example:
+
+        .. sourcecode:: python
+
+            await device.start_measurement()
+            async for values in device.iter_measurements():
+                print("{}, {}, {}".format(*values))
+
+        :return: Asynchronous iterator yielding the same tuples as the read
+                 method.
+        :rtype: ~collections.abc.AsyncIterator
+        """  # noqa: E501
+        read = self.read_measured_values_raw if raw \
+            else self.read_measured_values
+        return _MeasurementIterator(
+            read, compact, _PollScheduler(period, retry_interval, phase_step))
+
+
+class _MeasurementIterator(object):
+    """
+    Asynchronous iterator returned by
+    :py:meth:`Svm40I2cAsyncDevice.iter_measurements`.
+    """
+    def __init__(self, read, compact, scheduler):
+        super(_MeasurementIterator, self).__init__()
+        self._read = read
+        self._compact = compact
+        self._scheduler = scheduler
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            delay = self._scheduler.next_poll - _clock()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            poll_time = _clock()
+            values = await self._read(self._compact)
+            if self._scheduler.update(poll_time, values):
+                return values
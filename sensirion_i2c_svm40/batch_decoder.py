@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+"""
+Vectorized decoding of captured measurement frames.
+
+The functions in this module decode a contiguous buffer of many raw responses
+of :py:class:`~sensirion_i2c_svm40.commands.wrapped.Svm40I2cCmdReadMeasuredValues`
+(9 bytes per frame) or
+:py:class:`~sensirion_i2c_svm40.commands.wrapped.Svm40I2cCmdReadMeasuredValuesRaw`
+(18 bytes per frame) at once into NumPy arrays. Instead of raising an
+exception on the first CRC error, every frame is checked and the result
+contains a per-frame error mask.
+
+.. note:: This module requires NumPy (``pip install numpy``).
+"""  # noqa: E501
+
+from __future__ import absolute_import, division, print_function
+from .commands.crc import SVM40_CRC
+import numpy as np
+
+import logging
+log = logging.getLogger(__name__)
+
+
+#: Number of bytes of a "read measured values" frame (including CRCs).
+MEASURED_VALUES_FRAME_LENGTH = 9
+
+#: Number of bytes of a "read measured values raw" frame (including CRCs).
+MEASURED_VALUES_RAW_FRAME_LENGTH = 18
+
+
+# Lookup table of the SVM40 CRC-8, the CRC of a word is
+# ``table[table[0xFF ^ msb] ^ lsb]``.
+_CRC_TABLE = np.frombuffer(SVM40_CRC.table, dtype=np.uint8)
+
+
+def _decode_words(data, frame_length):
+    """
+    Split a buffer of frames into 16-bit words and validate their CRCs.
+
+    :param bytes-like data: The concatenated frames.
+    :param int frame_length: Number of bytes per frame (including CRCs).
+    :return: The words as uint16 array of shape (frames, words) and a boolean
+             array which is True for every frame containing a wrong CRC.
+    :rtype: tuple
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if raw.size % frame_length != 0:
+        raise ValueError(
+            "Buffer length {} is not a multiple of the frame length {}."
+            .format(raw.size, frame_length))
+    words = raw.reshape(-1, frame_length // 3, 3)
+    msb = words[..., 0]
+    lsb = words[..., 1]
+    crc = _CRC_TABLE[_CRC_TABLE[msb ^ 0xFF] ^ lsb]
+    crc_error = np.any(crc != words[..., 2], axis=1)
+    values = (msb.astype(np.uint16) << 8) | lsb
+    return values, crc_error
+
+
+class MeasuredValuesBatch(object):
+    """
+    Decoded measured values of many frames.
+
+    All attributes are NumPy arrays with one element per frame. The converted
+    values are NaN for frames with a wrong CRC, the ticks are returned as
+    received.
+    """
+    def __init__(self, voc_index_ticks, humidity_ticks, temperature_ticks,
+                 crc_error):
+        """
+        Creates an instance from already decoded tick arrays.
+
+        :param numpy.ndarray voc_index_ticks: VOC index ticks (int16).
+        :param numpy.ndarray humidity_ticks: Humidity ticks (int16).
+        :param numpy.ndarray temperature_ticks: Temperature ticks (int16).
+        :param numpy.ndarray crc_error: True for frames with a wrong CRC.
+        """
+        super(MeasuredValuesBatch, self).__init__()
+
+        #: The VOC index ticks (int16) as received from the device.
+        self.voc_index_ticks = voc_index_ticks
+
+        #: The humidity ticks (int16) as received from the device.
+        self.humidity_ticks = humidity_ticks
+
+        #: The temperature ticks (int16) as received from the device.
+        self.temperature_ticks = temperature_ticks
+
+        #: Per-frame error mask (bool), True if a CRC of the frame was wrong.
+        self.crc_error = crc_error
+
+    def __len__(self):
+        return len(self.crc_error)
+
+    def _convert(self, ticks, scale_factor):
+        return np.where(self.crc_error, np.nan, ticks / scale_factor)
+
+    @property
+    def valid(self):
+        """
+        Per-frame mask (bool) which is True if all CRCs of the frame were ok.
+        """
+        return ~self.crc_error
+
+    @property
+    def voc_index(self):
+        """
+        The converted VOC index (float64).
+        """
+        return self._convert(self.voc_index_ticks, 10.)
+
+    @property
+    def percent_rh(self):
+        """
+        The converted humidity in %RH (float64).
+        """
+        return self._convert(self.humidity_ticks, 100.)
+
+    @property
+    def degrees_celsius(self):
+        """
+        The converted temperature in °C (float64).
+        """
+        return self._convert(self.temperature_ticks, 200.)
+
+
+class MeasuredValuesRawBatch(MeasuredValuesBatch):
+    """
+    Decoded measured values including the raw values of many frames.
+
+    In addition to the attributes of :py:class:`MeasuredValuesBatch`, the raw
+    values without algorithm compensation are available.
+    """
+    def __init__(self, voc_index_ticks, humidity_ticks, temperature_ticks,
+                 raw_voc_ticks, raw_humidity_ticks, raw_temperature_ticks,
+                 crc_error):
+        """
+        Creates an instance from already decoded tick arrays.
+
+        :param numpy.ndarray voc_index_ticks: VOC index ticks (int16).
+        :param numpy.ndarray humidity_ticks: Humidity ticks (int16).
+        :param numpy.ndarray temperature_ticks: Temperature ticks (int16).
+        :param numpy.ndarray raw_voc_ticks: Raw VOC ticks (uint16).
+        :param numpy.ndarray raw_humidity_ticks: Raw humidity ticks (int16).
+        :param numpy.ndarray raw_temperature_ticks:
+            Raw temperature ticks (int16).
+        :param numpy.ndarray crc_error: True for frames with a wrong CRC.
+        """
+        super(MeasuredValuesRawBatch, self).__init__(
+            voc_index_ticks, humidity_ticks, temperature_ticks, crc_error)
+
+        #: The raw VOC ticks (uint16) as read from the SGP sensor.
+        self.raw_voc_ticks = raw_voc_ticks
+
+        #: The uncompensated humidity ticks (int16) as read from the SHT40.
+        self.raw_humidity_ticks = raw_humidity_ticks
+
+        #: The uncompensated temperature ticks (int16) as read from the SHT40.
+        self.raw_temperature_ticks = raw_temperature_ticks
+
+    @property
+    def raw_percent_rh(self):
+        """
+        The converted uncompensated humidity in %RH (float64).
+        """
+        return self._convert(self.raw_humidity_ticks, 100.)
+
+    @property
+    def raw_degrees_celsius(self):
+        """
+        The converted uncompensated temperature in °C (float64).
+        """
+        return self._convert(self.raw_temperature_ticks, 200.)
+
+
+def decode_measured_values(data):
+    """
+    Decode concatenated responses of the "read measured values" command.
+
+    :param bytes-like data:
+        Buffer containing N frames of 9 bytes each, e.g. a ``bytes`` object,
+        a ``memoryview``, a memory-mapped file or a NumPy uint8 array.
+    :return: The decoded values of all frames.
+    :rtype: ~sensirion_i2c_svm40.batch_decoder.MeasuredValuesBatch
+    :raise ValueError:
+        If the buffer length is not a multiple of the frame length.
+    """
+    values, crc_error = _decode_words(data, MEASURED_VALUES_FRAME_LENGTH)
+    signed = values.view(np.int16)
+    return MeasuredValuesBatch(
+        voc_index_ticks=signed[:, 0],
+        humidity_ticks=signed[:, 1],
+        temperature_ticks=signed[:, 2],
+        crc_error=crc_error,
+    )
+
+
+def decode_measured_values_raw(data):
+    """
+    Decode concatenated responses of the "read measured values raw" command.
+
+    :param bytes-like data:
+        Buffer containing N frames of 18 bytes each, e.g. a ``bytes`` object,
+        a ``memoryview``, a memory-mapped file or a NumPy uint8 array.
+    :return: The decoded values of all frames.
+    :rtype: ~sensirion_i2c_svm40.batch_decoder.MeasuredValuesRawBatch
+    :raise ValueError:
+        If the buffer length is not a multiple of the frame length.
+    """
+    values, crc_error = _decode_words(data, MEASURED_VALUES_RAW_FRAME_LENGTH)
+    signed = values.view(np.int16)
+    return MeasuredValuesRawBatch(
+        voc_index_ticks=signed[:, 0],
+        humidity_ticks=signed[:, 1],
+        temperature_ticks=signed[:, 2],
+        raw_voc_ticks=values[:, 3],
+        raw_humidity_ticks=signed[:, 4],
+        raw_temperature_ticks=signed[:, 5],
+        crc_error=crc_error,
+    )
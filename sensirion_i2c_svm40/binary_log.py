@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+"""
+Append-only binary log of measurements with fixed-size records.
+
+A log file consists of a 16 byte header followed by records of 22 bytes
+each (all values little endian):
+
+=================== ======= ==================================================
+Field               Type    Description
+=================== ======= ==================================================
+``timestamp``       float64 System time of the measurement (seconds)
+``device_index``    uint16  Index of the device (application defined)
+``voc_index``       int16   VOC index ticks
+``humidity``        int16   Humidity ticks
+``temperature``     int16   Temperature ticks
+``raw_voc_ticks``   uint16  Raw VOC ticks
+``raw_humidity``    int16   Raw humidity ticks
+``raw_temperature`` int16   Raw temperature ticks
+=================== ======= ==================================================
+
+The fixed record size allows reading a log as NumPy structured array by
+memory-mapping the file, without parsing every record. A record which was
+only partially written (e.g. due to a crash) is ignored by the reader and
+removed when the file is opened for writing again.
+
+.. note:: :py:class:`BinaryLogReader` requires NumPy (``pip install numpy``).
+"""
+
+from __future__ import absolute_import, division, print_function
+from struct import Struct
+from ._clock import clock as _clock
+from .response_types import _values_to_ticks
+import os
+import time
+
+import logging
+log = logging.getLogger(__name__)
+
+#: Magic bytes at the beginning of every log file.
+MAGIC = b"SVM40LOG"
+
+#: Version of the file format.
+FORMAT_VERSION = 1
+
+_HEADER = Struct("<8sHH4x")
+_RECORD = Struct("<dHhhhHhh")
+
+#: Size of the file header in bytes.
+HEADER_SIZE = _HEADER.size
+
+#: Size of a record in bytes.
+RECORD_SIZE = _RECORD.size
+
+#: Names of the record fields.
+FIELDS = ('timestamp', 'device_index', 'voc_index', 'humidity',
+          'temperature', 'raw_voc_ticks', 'raw_humidity', 'raw_temperature')
+
+
+def record_dtype():
+    """
+    Get the NumPy dtype of a record.
+
+    :rtype: numpy.dtype
+    """
+    import numpy as np
+    return np.dtype([(name, '<' + code) for name, code in zip(
+        FIELDS, ('f8', 'u2', 'i2', 'i2', 'i2', 'u2', 'i2', 'i2'))])
+
+
+def _check_header(header, path):
+    magic, version, record_size = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("'{}' is not an SVM40 binary log.".format(path))
+    if version != FORMAT_VERSION or record_size != RECORD_SIZE:
+        raise ValueError("Unsupported format version {} of '{}'.".format(
+            version, path))
+
+
+class BinaryLogWriter(object):
+    """
+    Appends measurements to a binary log file.
+
+    Records are collected in memory and written to the file (followed by
+    ``fsync``) in batches, when ``batch_size`` records are pending or the
+    oldest pending record is older than ``flush_interval``. Call
+    :py:meth:`close` (or use the writer as context manager) to write the
+    pending records at the end.
+
+    .. note:: The ``flush_interval`` is only checked when a record is
+              appended, there is no background timer. If appending stops
+              (e.g. while the device is not responding), the pending records
+              stay in memory until the next append, :py:meth:`flush` or
+              :py:meth:`close`.
+
+    Example:
+
+    .. sourcecode:: python
+
+        with BinaryLogWriter('measurements.svm40log') as writer:
+            for values in device.iter_measurements(raw=True):
+                writer.append(values)
+    """
+
+    def __init__(self, path, batch_size=100, flush_interval=10.0):
+        """
+        Opens a log file for appending, or creates it if it does not exist
+        (or is empty). An incomplete record at the end of an existing file is
+        removed.
+
+        :param str path: Path to the log file.
+        :param int batch_size: Maximum number of pending records.
+        :param float flush_interval:
+            Maximum time in seconds a record stays pending, checked on
+            every append.
+        :raise ValueError:
+            If the file exists but is not a valid log file (including a file
+            shorter than the header).
+        """
+        super(BinaryLogWriter, self).__init__()
+        self._batch_size = max(int(batch_size), 1)
+        self._flush_interval = float(flush_interval)
+        self._buffer = bytearray()
+        self._pending = 0
+        self._first_pending = None
+        self._file = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+        try:
+            self._recover(path)
+        except Exception:
+            self._file.close()
+            raise
+
+    def _recover(self, path):
+        """
+        Check the header and truncate an incomplete last record, or write
+        the header to a new (or empty) file.
+        """
+        size = os.fstat(self._file.fileno()).st_size
+        if 0 < size < HEADER_SIZE:
+            raise ValueError("'{}' is not an SVM40 binary log (incomplete "
+                             "header).".format(path))
+        if size == 0:
+            self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, RECORD_SIZE))
+            self._sync()
+            return
+        _check_header(self._file.read(HEADER_SIZE), path)
+        torn = (size - HEADER_SIZE) % RECORD_SIZE
+        if torn:
+            log.warning("Removing incomplete last record ({} bytes) from "
+                        "'{}'.".format(torn, path))
+            self._file.truncate(size - torn)
+            self._sync()
+        self._file.seek(0, os.SEEK_END)
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    @property
+    def pending(self):
+        """
+        Number of records not written to the file yet.
+
+        :type: int
+        """
+        return self._pending
+
+    def append(self, values, device_index=0, timestamp=None):
+        """
+        Append a measurement as returned by a device.
+
+        :param tuple values:
+            The response of
+            :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.read_measured_values_raw`
+            or
+            :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.read_measured_values`
+            (raw fields are set to zero).
+        :param int device_index: Index of the device.
+        :param float timestamp:
+            Timestamp of the measurement. Defaults to the current time.
+        """  # noqa: E501
+        self.append_ticks(device_index=device_index, timestamp=timestamp,
+                          **_values_to_ticks(values))
+
+    def append_ticks(self, voc_index, humidity, temperature, raw_voc_ticks=0,
+                     raw_humidity=0, raw_temperature=0, device_index=0,
+                     timestamp=None):
+        """
+        Append a measurement given as ticks.
+
+        :param int voc_index: VOC index ticks.
+        :param int humidity: Humidity ticks.
+        :param int temperature: Temperature ticks.
+        :param int raw_voc_ticks: Raw VOC ticks.
+        :param int raw_humidity: Raw humidity ticks.
+        :param int raw_temperature: Raw temperature ticks.
+        :param int device_index: Index of the device.
+        :param float timestamp:
+            Timestamp of the measurement. Defaults to the current time.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self._buffer += _RECORD.pack(
+            timestamp, device_index, voc_index, humidity, temperature,
+            raw_voc_ticks, raw_humidity, raw_temperature)
+        self._pending += 1
+        if self._first_pending is None:
+            self._first_pending = _clock()
+        if self._pending >= self._batch_size or \
+                _clock() - self._first_pending >= self._flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all pending records to the file and sync it to the disk.
+        """
+        if self._pending:
+            self._file.write(self._buffer)
+            self._sync()
+            del self._buffer[:]
+            self._pending = 0
+            self._first_pending = None
+
+    def close(self):
+        """
+        Write the pending records and close the file.
+        """
+        if not self._file.closed:
+            try:
+                self.flush()
+            finally:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class BinaryLogReader(object):
+    """
+    Reads a binary log file by memory-mapping it.
+
+    Example:
+
+    .. sourcecode:: python
+
+        reader = BinaryLogReader('measurements.svm40log')
+        records = reader.records  # NumPy structured array
+        print(records['temperature'].mean() / 200.)
+
+    .. note:: The returned arrays reference the memory-mapped file, i.e.
+              their data is only read from the disk when accessed.
+    """
+
+    def __init__(self, path):
+        """
+        Opens a log file.
+
+        :param str path: Path to the log file.
+        :raise ValueError: If the file is not a valid log file.
+        """
+        super(BinaryLogReader, self).__init__()
+        import numpy as np
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError("'{}' is not an SVM40 binary log.".format(path))
+        _check_header(header, path)
+        size = os.path.getsize(path)
+        count = (size - HEADER_SIZE) // RECORD_SIZE
+        if count:
+            self._records = np.memmap(path, dtype=record_dtype(), mode='r',
+                                      offset=HEADER_SIZE, shape=(count,))
+        else:
+            self._records = np.zeros(0, dtype=record_dtype())
+
+    def __len__(self):
+        return len(self._records)
+
+    @property
+    def records(self):
+        """
+        All complete records of the file.
+
+        :type: numpy.ndarray
+        """
+        return self._records
+
+    def chunks(self, size):
+        """
+        Iterate over the records in chunks, e.g. to process a large log file
+        with bounded memory usage.
+
+        :param int size: Number of records per chunk.
+        :return: Generator yielding structured arrays of up to ``size``
+                 records.
+        :rtype: generator
+        """
+        for start in range(0, len(self._records), size):
+            yield self._records[start:start + size]
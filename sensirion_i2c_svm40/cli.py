@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+"""
+Command line interface ``svm40``, installed as console script with the
+package. Run ``svm40 --help`` for the available subcommands and options:
+
+.. sourcecode:: bash
+
+    svm40 config                            # print identity and configuration
+    svm40 stream --format csv --count 60    # print one measurement per second
+    svm40 log measurements.svm40log --raw   # append measurements to a log
+    svm40 benchmark --duration 10           # measure the read throughput
+    svm40 --sensorbridge COM7 stream        # connect through a SensorBridge
+    svm40 --simulate stream                 # use a simulated device
+
+To start quickly on small hosts, this module imports only the standard
+library at load time. The driver and the optional packages (e.g. the
+SensorBridge driver) are imported by the subcommands which need them.
+"""
+
+from __future__ import absolute_import, division, print_function
+from contextlib import contextmanager
+import argparse
+import sys
+
+import logging
+log = logging.getLogger(__name__)
+
+
+@contextmanager
+def _open_transceiver(args):
+    """
+    Open the I²C transceiver selected on the command line.
+    """
+    if args.simulate:
+        from .simulation import Svm40SimulatedTransceiver
+        yield Svm40SimulatedTransceiver()
+    elif args.sensorbridge:
+        from sensirion_shdlc_driver import ShdlcSerialPort, ShdlcConnection
+        from sensirion_shdlc_sensorbridge import SensorBridgePort, \
+            SensorBridgeShdlcDevice, SensorBridgeI2cProxy
+        with ShdlcSerialPort(port=args.sensorbridge, baudrate=460800) as port:
+            bridge = SensorBridgeShdlcDevice(ShdlcConnection(port),
+                                             slave_address=0)
+            bridge.set_i2c_frequency(SensorBridgePort.ONE, frequency=100e3)
+            bridge.set_supply_voltage(SensorBridgePort.ONE, voltage=3.3)
+            bridge.switch_supply_on(SensorBridgePort.ONE)
+            yield SensorBridgeI2cProxy(bridge, port=SensorBridgePort.ONE)
+    else:
+        from sensirion_i2c_driver import LinuxI2cTransceiver
+        with LinuxI2cTransceiver(args.port) as transceiver:
+            yield transceiver
+
+
+@contextmanager
+def _open_device(args, **kwargs):
+    """
+    Open the device selected on the command line.
+    """
+    from sensirion_i2c_driver import I2cConnection
+    from .device import Svm40I2cDevice
+    with _open_transceiver(args) as transceiver:
+        yield Svm40I2cDevice(I2cConnection(transceiver),
+                             slave_address=args.address, **kwargs)
+
+
+@contextmanager
+def _measuring(device):
+    """
+    Start the measurement, and stop it at the end.
+    """
+    device.start_measurement()
+    try:
+        yield device
+    finally:
+        device.stop_measurement()
+
+
+def _limit(iterable, count):
+    for index, item in enumerate(iterable):
+        if count is not None and index >= count:
+            break
+        yield item
+
+
+# Ticks per unit of the fields (raw VOC ticks are printed as ticks).
+_SCALE_FACTORS = {
+    'voc_index': 10.,
+    'humidity': 100.,
+    'temperature': 200.,
+    'raw_humidity': 100.,
+    'raw_temperature': 200.,
+}
+
+
+def _measurement_dict(values, timestamp):
+    from .response_types import _values_to_ticks
+    result = dict((name, ticks / _SCALE_FACTORS[name]
+                   if name in _SCALE_FACTORS else ticks)
+                  for name, ticks in _values_to_ticks(values).items())
+    result['timestamp'] = timestamp
+    return result
+
+
+def _stream(args):
+    import json
+    import time
+    columns = ['timestamp', 'voc_index', 'humidity', 'temperature']
+    if args.raw:
+        columns += ['raw_voc_ticks', 'raw_humidity', 'raw_temperature']
+    if args.format == 'csv':
+        print(','.join(columns))
+    with _open_device(args) as device, _measuring(device):
+        for values in _limit(device.iter_measurements(raw=args.raw),
+                             args.count):
+            timestamp = time.time()
+            if args.format == 'text':
+                print(', '.join(str(value) for value in values))
+            else:
+                measurement = _measurement_dict(values, timestamp)
+                if args.format == 'csv':
+                    print(','.join(str(measurement[column])
+                                   for column in columns))
+                else:
+                    print(json.dumps(measurement, sort_keys=True))
+            sys.stdout.flush()
+
+
+def _log(args):
+    from .binary_log import BinaryLogWriter
+    count = 0
+    with _open_device(args) as device, _measuring(device), \
+            BinaryLogWriter(args.path, batch_size=args.batch_size) as writer:
+        for values in _limit(device.iter_measurements(raw=args.raw),
+                             args.count):
+            writer.append(values, device_index=args.device_index)
+            count += 1
+    log.info("Logged {} measurements to '{}'.".format(count, args.path))
+
+
+def _config(args):
+    import json
+    with _open_device(args) as device:
+        metadata = device.refresh_metadata(configuration=True)
+    config = {
+        'serial_number': metadata.serial_number,
+        'version': str(metadata.version),
+        'temperature_offset': metadata.temperature_offset,
+        'voc_tuning_parameters': dict(zip(
+            ('voc_index_offset', 'learning_time_hours',
+             'gating_max_duration_minutes', 'std_initial'),
+            metadata.voc_tuning_parameters)),
+    }
+    if args.json:
+        print(json.dumps(config, indent=2, sort_keys=True))
+    else:
+        print("Serial Number: {}".format(config['serial_number']))
+        print("Version: {}".format(config['version']))
+        print("Temperature Offset: {} °C".format(
+            config['temperature_offset']))
+        for name, value in sorted(config['voc_tuning_parameters'].items()):
+            print("VOC Tuning Parameter {}: {}".format(name, value))
+
+
+def _benchmark(args):
+    from ._clock import clock
+    from .instrumentation import CommandStats
+    stats = CommandStats()
+    with _open_device(args, instrumentation=stats) as device, \
+            _measuring(device):
+        read = device.read_measured_values_raw if args.raw \
+            else device.read_measured_values
+        stats.reset()
+        count = 0
+        start = clock()
+        while clock() - start < args.duration:
+            read()
+            count += 1
+        elapsed = clock() - start
+        histograms = [(command, stats.get(command).total_time)
+                      for command in stats.commands]
+    print("{} reads in {:.3f} s: {:.1f} reads/s".format(
+        count, elapsed, count / elapsed))
+    for command, histogram in histograms:
+        if histogram.count:
+            print("{}: mean {:.3f} ms, p50 {:.3f} ms, p99 {:.3f} ms".format(
+                command, histogram.mean * 1e3,
+                histogram.percentile(50.) * 1e3,
+                histogram.percentile(99.) * 1e3))
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='svm40', description="Access a Sensirion SVM40 over I²C.")
+    connection = parser.add_mutually_exclusive_group()
+    connection.add_argument(
+        '--port', default='/dev/i2c-1',
+        help="Linux I²C bus device (default: %(default)s)")
+    connection.add_argument(
+        '--sensorbridge', metavar='SERIAL_PORT',
+        help="connect through a SensorBridge (port 1) on this serial port")
+    connection.add_argument(
+        '--simulate', action='store_true',
+        help="use a simulated device instead of hardware")
+    parser.add_argument(
+        '--address', type=lambda value: int(value, 0), default=0x6A,
+        help="I²C address of the device (default: 0x6A)")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="enable debug logging")
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    subparsers.required = True
+
+    stream = subparsers.add_parser('stream', help="print measurements")
+    stream.add_argument('--raw', action='store_true',
+                        help="include the raw values")
+    stream.add_argument('--format', choices=('text', 'csv', 'json'),
+                        default='text', help="output format")
+    stream.add_argument('--count', type=int,
+                        help="stop after this number of measurements")
+    stream.set_defaults(function=_stream)
+
+    log_ = subparsers.add_parser(
+        'log', help="append measurements to a binary log file")
+    log_.add_argument('path', help="path to the log file")
+    log_.add_argument('--raw', action='store_true',
+                      help="include the raw values")
+    log_.add_argument('--count', type=int,
+                      help="stop after this number of measurements")
+    log_.add_argument('--device-index', type=int, default=0,
+                      help="device index of the records")
+    log_.add_argument('--batch-size', type=int, default=100,
+                      help="number of records written at once")
+    log_.set_defaults(function=_log)
+
+    config = subparsers.add_parser(
+        'config', help="print identity and configuration")
+    config.add_argument('--json', action='store_true',
+                        help="print as JSON")
+    config.set_defaults(function=_config)
+
+    benchmark = subparsers.add_parser(
+        'benchmark', help="measure the read throughput and latency")
+    benchmark.add_argument('--duration', type=float, default=5.0,
+                           help="duration in seconds (default: %(default)s)")
+    benchmark.add_argument('--raw', action='store_true',
+                           help="read the raw values")
+    benchmark.set_defaults(function=_benchmark)
+    return parser
+
+
+def main(argv=None):
+    """
+    Entry point of the ``svm40`` command.
+
+    :param list(str) argv:
+        The command line arguments, defaults to ``sys.argv[1:]``.
+    :return: The exit code.
+    :rtype: int
+    """
+    args = _parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format="%(levelname)s: %(message)s")
+    try:
+        args.function(args)
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        log.debug("Command failed:", exc_info=True)
+        print("Error: {}".format(e), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from ._clock import clock as _clock
+import heapq
+import threading
+import time
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class Svm40Collector(object):
+    """
+    Periodically reads the measured values of many SVM40 devices.
+
+    The devices are grouped by their I²C bus (by default the
+    :py:attr:`~sensirion_i2c_driver.device.I2cDevice.connection` they use).
+    Every bus is served by its own worker thread, so devices on the same bus
+    are accessed strictly one after another while separate buses are read in
+    parallel. Within a bus, every device has its own deadline which is
+    advanced by ``interval`` after each readout, and the device with the
+    earliest deadline is read next. The deadlines of the devices on a bus
+    are initially spread over one interval to distribute the bus load.
+
+    If a bus cannot keep up with the interval, missed deadlines are skipped
+    (counted in :py:attr:`missed_deadlines`) instead of accumulating a
+    backlog.
+
+    Example:
+
+    .. sourcecode:: python
+
+        def on_values(device, timestamp, values):
+            print(device.slave_address, timestamp, values)
+
+        for device in devices:
+            device.start_measurement()
+        with Svm40Collector(devices, on_values, interval=1.0):
+            time.sleep(3600.)
+
+    .. note:: The callbacks are called from the worker threads, i.e. they
+              are called concurrently for devices on different buses and
+              should return quickly since they delay the bus.
+    """
+
+    def __init__(self, devices, callback, interval=1.0, raw=False,
+                 compact=False, error_callback=None, group_by=None):
+        """
+        Creates a collector. Call :py:meth:`start` to start it.
+
+        :param list devices:
+            The devices to read, e.g.
+            :py:class:`~sensirion_i2c_svm40.device.Svm40I2cDevice` objects.
+        :param callable callback:
+            Called with ``(device, timestamp, values)`` for every successful
+            readout, where ``values`` is the tuple returned by the read method
+            and ``timestamp`` is the system time of the readout.
+        :param float interval:
+            Readout interval of every device in seconds.
+        :param bool raw:
+            If True, the values are read with ``read_measured_values_raw()``,
+            otherwise with ``read_measured_values()``.
+        :param bool compact:
+            Passed to the read method to get the compact response types.
+        :param callable error_callback:
+            Called with ``(device, exception)`` if a readout failed. If None,
+            errors are logged.
+        :param callable group_by:
+            Called with a device to get the key of its bus. Devices with equal
+            keys are never accessed concurrently. Defaults to the connection
+            of the device. Pass a custom function if different connections
+            share the same physical interface (e.g. several ports of the same
+            SensorBridge).
+        """
+        super(Svm40Collector, self).__init__()
+        if group_by is None:
+            group_by = _get_connection
+        self._buses = []
+        keys = []
+        for device in devices:
+            key = group_by(device)
+            if key in keys:
+                self._buses[keys.index(key)].append(device)
+            else:
+                keys.append(key)
+                self._buses.append([device])
+        self._callback = callback
+        self._error_callback = error_callback
+        self._interval = float(interval)
+        self._raw = raw
+        self._compact = compact
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._missed_deadlines = 0
+
+    @property
+    def buses(self):
+        """
+        Get the devices grouped by bus.
+
+        :type: list(list)
+        """
+        return [list(devices) for devices in self._buses]
+
+    @property
+    def missed_deadlines(self):
+        """
+        Get the number of readouts which were skipped because a bus could not
+        keep up with the interval.
+
+        :type: int
+        """
+        return self._missed_deadlines
+
+    @property
+    def is_running(self):
+        """
+        Check whether the worker threads are running.
+
+        :type: bool
+        """
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self):
+        """
+        Start one worker thread per bus.
+        """
+        if self.is_running:
+            raise RuntimeError("The collector is already running.")
+        self._stop_event.clear()
+        start_time = _clock()
+        self._threads = [
+            threading.Thread(target=self._run_bus,
+                             args=(devices, start_time),
+                             name="Svm40Collector-bus{}".format(index))
+            for index, devices in enumerate(self._buses)]
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stop all worker threads and wait until they have finished.
+
+        :param float timeout:
+            Maximum time in seconds to wait for every thread, or None to wait
+            without limit.
+        """
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _read(self, device):
+        if self._raw:
+            return device.read_measured_values_raw(compact=self._compact)
+        else:
+            return device.read_measured_values(compact=self._compact)
+
+    def _run_bus(self, devices, start_time):
+        """
+        Worker thread function reading all devices of one bus.
+        """
+        interval = self._interval
+        offset = interval / len(devices)
+        queue = [(start_time + index * offset, index, device)
+                 for index, device in enumerate(devices)]
+        heapq.heapify(queue)
+        while True:
+            deadline, index, device = queue[0]
+            delay = deadline - _clock()
+            if delay > 0:
+                stopped = self._stop_event.wait(delay)
+            else:
+                stopped = self._stop_event.is_set()
+            if stopped:
+                break
+            try:
+                values = self._read(device)
+            except Exception as e:
+                if self._error_callback is not None:
+                    try:
+                        self._error_callback(device, e)
+                    except Exception:
+                        log.exception("Collector error callback failed.")
+                else:
+                    log.warning("Failed to read device {}: {}".format(
+                        device, e))
+            else:
+                try:
+                    self._callback(device, time.time(), values)
+                except Exception:
+                    log.exception("Collector callback failed.")
+            deadline += interval
+            now = _clock()
+            if deadline < now:
+                missed = int((now - deadline) // interval) + 1
+                with self._lock:
+                    self._missed_deadlines += missed
+                deadline += missed * interval
+            heapq.heapreplace(queue, (deadline, index, device))
+
+
+def _get_connection(device):
+    """
+    Default bus key of a device.
+    """
+    return device.connection
@@ -5,16 +5,16 @@
 
 from __future__ import absolute_import, division, print_function
 from .generated import \
-    Svm40I2cCmdGetSerialNumber, \
     Svm40I2cCmdDeviceReset, \
     Svm40I2cCmdStartContinuousMeasurement, \
     Svm40I2cCmdStopMeasurement, \
-    Svm40I2cCmdGetVocAlgorithmTuningParameters, \
     Svm40I2cCmdSetVocAlgorithmTuningParameters, \
-    Svm40I2cCmdGetVocAlgorithmState, \
     Svm40I2cCmdSetVocAlgorithmState, \
     Svm40I2cCmdStoreNvData
 from .wrapped import \
+    Svm40I2cCmdGetSerialNumber, \
+    Svm40I2cCmdGetVocAlgorithmTuningParameters, \
+    Svm40I2cCmdGetVocAlgorithmState, \
     Svm40I2cCmdGetVersion, \
     Svm40I2cCmdReadMeasuredValues, \
     Svm40I2cCmdReadMeasuredValuesRaw, \
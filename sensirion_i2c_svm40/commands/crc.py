@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_driver import CrcCalculator
+from sensirion_i2c_driver.errors import I2cChecksumError
+
+import logging
+log = logging.getLogger(__name__)
+
+# Indexing bytes returns integers on Python 3, but strings on Python 2.
+_BYTES_ARE_INTEGERS = isinstance(b"\x00"[0], int)
+
+
+class CrcTable8(object):
+    """
+    Table-driven CRC-8 calculator.
+
+    Instances can be used as drop-in replacement for an 8 bit
+    :py:class:`~sensirion_i2c_driver.crc_calculator.CrcCalculator`, but
+    process one byte per table lookup instead of bit by bit.
+    """
+    def __init__(self, polynomial, init_value=0, final_xor=0):
+        """
+        Constructs a calculator object with the given CRC parameters.
+
+        :param int polynomial:
+            The polynomial of the CRC, without leading '1' (e.g. 0x31 for the
+            polynomial x^8 + x^5 + x^4 + 1).
+        :param int init_value:
+            Initialization value of the CRC. Defaults to 0.
+        :param int final_xor:
+            Final XOR value of the CRC. Defaults to 0.
+        """
+        super(CrcTable8, self).__init__()
+        calculator = CrcCalculator(8, polynomial, 0x00, 0x00)
+        # bytearray items are integers also on Python 2
+        self._lookup = bytearray(calculator([i]) for i in range(256))
+        self._init_value = init_value
+        self._final_xor = final_xor
+
+    @property
+    def table(self):
+        """
+        The lookup table containing the CRC (with init value 0 and without
+        final XOR) of every byte value.
+
+        :type: bytes
+        """
+        return bytes(self._lookup)
+
+    def __call__(self, data):
+        """
+        Calculate the CRC of the given data.
+
+        :param bytes-like data:
+            The input data (bytes, bytearray or list of 8-bit integers).
+        :return:
+            The calculated CRC.
+        :rtype:
+            int
+        """
+        table = self._lookup
+        crc = self._init_value
+        for value in bytearray(data):
+            crc = table[crc ^ value]
+        return crc ^ self._final_xor
+
+    def verify(self, data):
+        """
+        Validates the CRCs of data received from a Sensirion device, i.e. the
+        CRC byte after every two data bytes. The data is not copied.
+
+        :param bytes data:
+            Received raw bytes from the read operation.
+        :raise ~sensirion_i2c_driver.errors.I2cChecksumError:
+            If a received CRC was wrong.
+        """
+        view = data if _BYTES_ARE_INTEGERS else bytearray(data)
+        table = self._lookup
+        init_value = self._init_value
+        final_xor = self._final_xor
+        for i in range(2, len(view), 3):
+            expected_crc = final_xor ^ \
+                table[table[init_value ^ view[i - 2]] ^ view[i - 1]]
+            if view[i] != expected_crc:
+                raise I2cChecksumError(view[i], expected_crc, bytearray(data))
+
+
+#: CRC calculator for all SVM40 commands (CRC-8, polynomial 0x31, init value
+#: 0xFF), shared by all prebuilt command instances.
+SVM40_CRC = CrcTable8(0x31, 0xFF, 0x00)
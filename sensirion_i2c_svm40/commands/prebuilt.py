@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+"""
+Prebuilt command instances.
+
+Commands are stateless after construction, so the same instance can be
+executed any number of times on any device. This module provides instances
+of all commands without parameters, and factory functions returning cached
+instances of the commands with parameters. All of them use the shared
+table-driven CRC :py:data:`~sensirion_i2c_svm40.commands.crc.SVM40_CRC`, and
+their TX data is built only once.
+
+.. note:: The instances are shared, do not modify their attributes.
+"""
+
+from __future__ import absolute_import, division, print_function
+from .crc import SVM40_CRC
+from .generated import Svm40I2cCmdDeviceReset, \
+    Svm40I2cCmdStartContinuousMeasurement, Svm40I2cCmdStopMeasurement, \
+    Svm40I2cCmdSetVocAlgorithmTuningParameters, \
+    Svm40I2cCmdSetVocAlgorithmState, Svm40I2cCmdStoreNvData
+from .wrapped import Svm40I2cCmdGetSerialNumber, \
+    Svm40I2cCmdGetVocAlgorithmTuningParameters, \
+    Svm40I2cCmdGetVocAlgorithmState, Svm40I2cCmdGetVersion, \
+    Svm40I2cCmdReadMeasuredValues, Svm40I2cCmdReadMeasuredValuesRaw, \
+    Svm40I2cCmdGetTemperatureOffsetForRhtMeasurements, \
+    Svm40I2cCmdSetTemperatureOffsetForRhtMeasurements
+
+import logging
+log = logging.getLogger(__name__)
+
+
+# Maximum number of cached instances per command with parameters.
+_CACHE_SIZE = 32
+
+
+def _prebuild(command):
+    """
+    Replace the CRC calculator of a command by the shared lookup table.
+    """
+    command._crc = SVM40_CRC
+    return command
+
+
+DEVICE_RESET = _prebuild(Svm40I2cCmdDeviceReset())
+GET_SERIAL_NUMBER = _prebuild(Svm40I2cCmdGetSerialNumber())
+GET_VERSION = _prebuild(Svm40I2cCmdGetVersion())
+GET_TEMPERATURE_OFFSET = _prebuild(
+    Svm40I2cCmdGetTemperatureOffsetForRhtMeasurements())
+GET_VOC_TUNING_PARAMETERS = _prebuild(
+    Svm40I2cCmdGetVocAlgorithmTuningParameters())
+GET_VOC_STATE = _prebuild(Svm40I2cCmdGetVocAlgorithmState())
+STORE_NV_DATA = _prebuild(Svm40I2cCmdStoreNvData())
+START_MEASUREMENT = _prebuild(Svm40I2cCmdStartContinuousMeasurement())
+STOP_MEASUREMENT = _prebuild(Svm40I2cCmdStopMeasurement())
+READ_MEASURED_VALUES = _prebuild(Svm40I2cCmdReadMeasuredValues())
+READ_MEASURED_VALUES_COMPACT = _prebuild(
+    Svm40I2cCmdReadMeasuredValues(compact=True))
+READ_MEASURED_VALUES_RAW = _prebuild(Svm40I2cCmdReadMeasuredValuesRaw())
+READ_MEASURED_VALUES_RAW_COMPACT = _prebuild(
+    Svm40I2cCmdReadMeasuredValuesRaw(compact=True))
+
+
+def _cached(cache, key, factory):
+    """
+    Get a command from a cache, or build and add it if not cached yet.
+    """
+    command = cache.get(key)
+    if command is None:
+        if len(cache) >= _CACHE_SIZE:
+            cache.clear()
+        command = cache[key] = _prebuild(factory())
+    return command
+
+
+_set_temperature_offset_cache = {}
+_set_voc_tuning_parameters_cache = {}
+_set_voc_state_cache = {}
+
+
+def read_measured_values(compact=False):
+    """
+    Get the prebuilt "read measured values" command.
+
+    :param bool compact: Whether the compact response types are returned.
+    :rtype: ~sensirion_i2c_svm40.commands.wrapped.Svm40I2cCmdReadMeasuredValues
+    """  # noqa: E501
+    return READ_MEASURED_VALUES_COMPACT if compact else READ_MEASURED_VALUES
+
+
+def read_measured_values_raw(compact=False):
+    """
+    Get the prebuilt "read measured values raw" command.
+
+    :param bool compact: Whether the compact response types are returned.
+    :rtype: ~sensirion_i2c_svm40.commands.wrapped.Svm40I2cCmdReadMeasuredValuesRaw
+    """  # noqa: E501
+    return READ_MEASURED_VALUES_RAW_COMPACT if compact \
+        else READ_MEASURED_VALUES_RAW
+
+
+def set_temperature_offset(t_offset):
+    """
+    Get a cached "set temperature offset" command.
+
+    :param float t_offset: Temperature offset in degrees celsius.
+    :rtype: ~sensirion_i2c_svm40.commands.wrapped.Svm40I2cCmdSetTemperatureOffsetForRhtMeasurements
+    """  # noqa: E501
+    return _cached(
+        _set_temperature_offset_cache, int(round(t_offset * 200)),
+        lambda: Svm40I2cCmdSetTemperatureOffsetForRhtMeasurements(t_offset))
+
+
+def set_voc_tuning_parameters(voc_index_offset, learning_time_hours,
+                              gating_max_duration_minutes, std_initial):
+    """
+    Get a cached "set VOC algorithm tuning parameters" command.
+
+    :param int voc_index_offset: VOC index offset.
+    :param int learning_time_hours: Learning time in hours.
+    :param int gating_max_duration_minutes: Maximum gating duration.
+    :param int std_initial: Initial standard deviation.
+    :rtype: ~sensirion_i2c_svm40.commands.generated.Svm40I2cCmdSetVocAlgorithmTuningParameters
+    """  # noqa: E501
+    key = (voc_index_offset, learning_time_hours, gating_max_duration_minutes,
+           std_initial)
+    return _cached(_set_voc_tuning_parameters_cache, key,
+                   lambda: Svm40I2cCmdSetVocAlgorithmTuningParameters(*key))
+
+
+def set_voc_state(state):
+    """
+    Get a cached "set VOC algorithm state" command.
+
+    :param list(int) state: VOC algorithm state.
+    :rtype: ~sensirion_i2c_svm40.commands.generated.Svm40I2cCmdSetVocAlgorithmState
+    """  # noqa: E501
+    key = tuple(state)
+    return _cached(_set_voc_state_cache, key,
+                   lambda: Svm40I2cCmdSetVocAlgorithmState(key))
@@ -2,6 +2,9 @@
 # (c) Copyright 2020 Sensirion AG, Switzerland
 
 from __future__ import absolute_import, division, print_function
+from .crc import SVM40_CRC
+from .generated import Svm40I2cCmdGetSerialNumber as \
+    GetSerialNumberGenerated
 from .generated import Svm40I2cCmdGetVersion as GetVersionGenerated
 from .generated import Svm40I2cCmdReadMeasuredValuesAsIntegers as \
     ReadMeasuredValuesAsIntGenerated
@@ -12,14 +15,61 @@ from .generated import Svm40I2cCmdGetTemperatureOffsetForRhtMeasurements as \
     GetTOffsetGenerated
 from .generated import Svm40I2cCmdSetTemperatureOffsetForRhtMeasurements as \
     SetTOffsetGenerated
+from .generated import Svm40I2cCmdGetVocAlgorithmTuningParameters as \
+    GetVocTuningParametersGenerated
+from .generated import Svm40I2cCmdGetVocAlgorithmState as \
+    GetVocStateGenerated
 from ..version_types import FirmwareVersion, HardwareVersion, \
     ProtocolVersion, Version
-from ..response_types import AirQuality, Humidity, Temperature
+from ..response_types import AirQuality, Humidity, Temperature, \
+    CompactAirQuality, CompactHumidity, CompactTemperature
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
 
+# Precompiled layouts of the received data. The CRC after every two data
+# bytes is skipped with a pad byte, so the fields can be unpacked directly
+# from the received data after verifying the CRCs.
+_VERSION = Struct(">BBx?BxBBxBBx")
+_T_OFFSET = Struct(">hx")
+_MEASURED_VALUES = Struct(">hxhxhx")
+_MEASURED_VALUES_RAW = Struct(">hxhxhxHxhxhx")
+_SERIAL_NUMBER = Struct(">" + "2sx" * 13)
+_VOC_TUNING_PARAMETERS = Struct(">hxhxhxhx")
+_VOC_STATE = Struct(">BBxBBxBBxBBx")
+
+
+class Svm40I2cCmdGetSerialNumber(GetSerialNumberGenerated):
+    """
+    Get Serial Number I²C Command
+
+    Gets the serial number from the device.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        super(Svm40I2cCmdGetSerialNumber, self).__init__()
+
+    def interpret_response(self, data):
+        """
+        Validates the CRCs of the received data from the device and returns
+        the interpreted data.
+
+        :param bytes data: Received raw bytes from the read operation.
+        :return: Ascii string containing the serial number.
+        :rtype: str
+        :raise ~sensirion_i2c_driver.errors.I2cChecksumError:
+            If a received CRC was wrong.
+        """
+        SVM40_CRC.verify(data)
+        return str(b"".join(_SERIAL_NUMBER.unpack_from(data))
+                   .decode('utf-8').rstrip('\0'))
+
+
 class Svm40I2cCmdGetVersion(GetVersionGenerated):
     """
     Get Version I²C Command
@@ -44,9 +94,10 @@ class Svm40I2cCmdGetVersion(GetVersionGenerated):
         :raise ~sensirion_i2c_driver.errors.I2cChecksumError:
             If a received CRC was wrong.
         """
+        SVM40_CRC.verify(data)
         firmware_major, firmware_minor, firmware_debug, hardware_major, \
             hardware_minor, protocol_major, protocol_minor, _ = \
-            GetVersionGenerated.interpret_response(self, data)
+            _VERSION.unpack_from(data)
         return Version(
             firmware=FirmwareVersion(
                 major=firmware_major,
@@ -90,7 +141,8 @@ class Svm40I2cCmdGetTemperatureOffsetForRhtMeasurements(GetTOffsetGenerated):
         :raise ~sensirion_i2c_driver.errors.I2cChecksumError:
             If a received CRC was wrong.
         """
-        result = GetTOffsetGenerated.interpret_response(self, data)
+        SVM40_CRC.verify(data)
+        result, = _T_OFFSET.unpack_from(data)
         return float(result) / 200.  # scaled int16
 
 
@@ -111,6 +163,64 @@ class Svm40I2cCmdSetTemperatureOffsetForRhtMeasurements(SetTOffsetGenerated):
             .__init__(int(round(t_offset * 200)))  # scaled int16
 
 
+class Svm40I2cCmdGetVocAlgorithmTuningParameters(
+        GetVocTuningParametersGenerated):
+    """
+    Get Voc Algorithm Tuning Parameters I²C Command
+
+    Gets the currently set parameters for customizing the VOC algorithm
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        super(Svm40I2cCmdGetVocAlgorithmTuningParameters, self).__init__()
+
+    def interpret_response(self, data):
+        """
+        Validates the CRCs of the received data from the device and returns
+        the interpreted data.
+
+        :param bytes data: Received raw bytes from the read operation.
+        :return: voc_index_offset, learning_time_hours,
+                 gating_max_duration_minutes, std_initial
+        :rtype: tuple
+        :raise ~sensirion_i2c_driver.errors.I2cChecksumError:
+            If a received CRC was wrong.
+        """
+        SVM40_CRC.verify(data)
+        return _VOC_TUNING_PARAMETERS.unpack_from(data)
+
+
+class Svm40I2cCmdGetVocAlgorithmState(GetVocStateGenerated):
+    """
+    Get Voc Algorithm State I²C Command
+
+    Gets the current VOC algorithm state.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        super(Svm40I2cCmdGetVocAlgorithmState, self).__init__()
+
+    def interpret_response(self, data):
+        """
+        Validates the CRCs of the received data from the device and returns
+        the interpreted data.
+
+        :param bytes data: Received raw bytes from the read operation.
+        :return: Current VOC algorithm state.
+        :rtype: list(int)
+        :raise ~sensirion_i2c_driver.errors.I2cChecksumError:
+            If a received CRC was wrong.
+        """
+        SVM40_CRC.verify(data)
+        return list(_VOC_STATE.unpack_from(data))
+
+
 class Svm40I2cCmdReadMeasuredValues(ReadMeasuredValuesAsIntGenerated):
     """
     Returns the new measurement results.
@@ -123,11 +233,24 @@ class Svm40I2cCmdReadMeasuredValues(ReadMeasuredValuesAsIntGenerated):
               initialized values.
     """
 
-    def __init__(self):
+    def __init__(self, compact=False):
         """
         Constructor.
+
+        :param bool compact:
+            If True, the compact response types
+            :py:class:`~sensirion_i2c_svm40.response_types.CompactAirQuality`,
+            :py:class:`~sensirion_i2c_svm40.response_types.CompactHumidity`
+            and
+            :py:class:`~sensirion_i2c_svm40.response_types.CompactTemperature`
+            are returned instead of the default response types.
         """
         super(Svm40I2cCmdReadMeasuredValues, self).__init__()
+        if compact:
+            self._types = CompactAirQuality, CompactHumidity, \
+                CompactTemperature
+        else:
+            self._types = AirQuality, Humidity, Temperature
 
     def interpret_response(self, data):
         """
@@ -150,10 +273,11 @@ class Svm40I2cCmdReadMeasuredValues(ReadMeasuredValuesAsIntGenerated):
         :raise ~sensirion_i2c_driver.errors.I2cChecksumError:
             If a received CRC was wrong.
         """  # noqa: E501
-        voc_index, humidity, temperature = \
-            ReadMeasuredValuesAsIntGenerated.interpret_response(self, data)
-        return AirQuality(voc_index), Humidity(humidity), \
-            Temperature(temperature)
+        SVM40_CRC.verify(data)
+        voc_index, humidity, temperature = _MEASURED_VALUES.unpack_from(data)
+        air_quality_type, humidity_type, temperature_type = self._types
+        return air_quality_type(voc_index), humidity_type(humidity), \
+            temperature_type(temperature)
 
 
 class Svm40I2cCmdReadMeasuredValuesRaw(ReadMeasuredValuesAsIntRawGenerated):
@@ -168,11 +292,24 @@ class Svm40I2cCmdReadMeasuredValuesRaw(ReadMeasuredValuesAsIntRawGenerated):
               initialized values.
     """
 
-    def __init__(self):
+    def __init__(self, compact=False):
         """
         Constructor.
+
+        :param bool compact:
+            If True, the compact response types
+            :py:class:`~sensirion_i2c_svm40.response_types.CompactAirQuality`,
+            :py:class:`~sensirion_i2c_svm40.response_types.CompactHumidity`
+            and
+            :py:class:`~sensirion_i2c_svm40.response_types.CompactTemperature`
+            are returned instead of the default response types.
         """
         super(Svm40I2cCmdReadMeasuredValuesRaw, self).__init__()
+        if compact:
+            self._types = CompactAirQuality, CompactHumidity, \
+                CompactTemperature
+        else:
+            self._types = AirQuality, Humidity, Temperature
 
     def interpret_response(self, data):
         """
@@ -203,9 +340,11 @@ class Svm40I2cCmdReadMeasuredValuesRaw(ReadMeasuredValuesAsIntRawGenerated):
             If a received CRC was wrong.
         """  # noqa: E501
 
+        SVM40_CRC.verify(data)
         voc_index, humidity, temperature, \
             raw_voc_ticks, raw_humidity, raw_temperature = \
-            ReadMeasuredValuesAsIntRawGenerated.interpret_response(self, data)
-        return AirQuality(voc_index), Humidity(humidity), \
-            Temperature(temperature), raw_voc_ticks, Humidity(raw_humidity), \
-            Temperature(raw_temperature)
+            _MEASURED_VALUES_RAW.unpack_from(data)
+        air_quality_type, humidity_type, temperature_type = self._types
+        return air_quality_type(voc_index), humidity_type(humidity), \
+            temperature_type(temperature), raw_voc_ticks, \
+            humidity_type(raw_humidity), temperature_type(raw_temperature)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from .response_types import _values_to_ticks
+import time
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class DeadbandFilter(object):
+    """
+    Change-only filter for a stream of measurements.
+
+    A measurement is published only if at least one field differs from the
+    last published measurement by more than its deadband, or if nothing was
+    published for ``max_silence`` seconds. The comparison works on the ticks
+    as received from the device, i.e. without any conversion to floating
+    point. Since the values are compared with the last *published* (not the
+    last received) measurement, slow drifts are published as well.
+
+    Example:
+
+    .. sourcecode:: python
+
+        deadband = DeadbandFilter({'voc_index': 10, 'humidity': 50,
+                                   'temperature': 20}, max_silence=300.)
+        for values in deadband.filter(device.iter_measurements()):
+            publish(values)
+
+    .. note:: Use one filter per device.
+    """
+
+    #: Default deadbands in ticks: 1 VOC index point, 0.5 %RH and 0.1 °C.
+    DEFAULT_DEADBANDS = {
+        'voc_index': 10,
+        'humidity': 50,
+        'temperature': 20,
+    }
+
+    def __init__(self, deadbands=None, max_silence=60.0):
+        """
+        Creates a filter.
+
+        :param dict deadbands:
+            Deadband in ticks per field name (``'voc_index'``,
+            ``'humidity'``, ``'temperature'``, ``'raw_voc_ticks'``,
+            ``'raw_humidity'`` or ``'raw_temperature'``). Fields which are not
+            contained are ignored. Defaults to
+            :py:attr:`DEFAULT_DEADBANDS`.
+        :param float max_silence:
+            Maximum time in seconds between two published measurements, or
+            None to publish only changes.
+        """
+        super(DeadbandFilter, self).__init__()
+        if deadbands is None:
+            deadbands = self.DEFAULT_DEADBANDS
+        self._deadbands = sorted(deadbands.items())
+        self._max_silence = max_silence
+        self._published = 0
+        self._suppressed = 0
+        self.reset()
+
+    @property
+    def published(self):
+        """
+        Number of published measurements.
+
+        :type: int
+        """
+        return self._published
+
+    @property
+    def suppressed(self):
+        """
+        Number of suppressed measurements.
+
+        :type: int
+        """
+        return self._suppressed
+
+    def reset(self):
+        """
+        Forget the last published measurement, so the next one is published
+        in any case. The counters are not reset.
+        """
+        self._last_ticks = None
+        self._last_time = None
+
+    def update(self, values, timestamp=None):
+        """
+        Check whether a measurement as returned by a device is published.
+
+        :param tuple values:
+            The response of
+            :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.read_measured_values`
+            or
+            :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.read_measured_values_raw`.
+        :param float timestamp:
+            Timestamp of the measurement. Defaults to the current time.
+        :return: True if the measurement is published.
+        :rtype: bool
+        """  # noqa: E501
+        return self.update_ticks(timestamp=timestamp,
+                                 **_values_to_ticks(values))
+
+    def update_ticks(self, timestamp=None, **ticks):
+        """
+        Check whether a measurement given as ticks is published.
+
+        :param float timestamp:
+            Timestamp of the measurement. Defaults to the current time.
+        :param ticks:
+            The ticks of (at least) all fields with a deadband as keyword
+            arguments, e.g. ``voc_index=1000, humidity=4500,
+            temperature=5000``.
+        :return: True if the measurement is published.
+        :rtype: bool
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        current = [ticks[field] for field, _ in self._deadbands]
+        last = self._last_ticks
+        publish = last is None or \
+            (self._max_silence is not None and
+             timestamp - self._last_time >= self._max_silence) or \
+            any(abs(value - last_value) > deadband for value, last_value,
+                (_, deadband) in zip(current, last, self._deadbands))
+        if publish:
+            self._last_ticks = current
+            self._last_time = timestamp
+            self._published += 1
+        else:
+            self._suppressed += 1
+        return publish
+
+    def filter(self, stream):
+        """
+        Filter a stream of measurements, timestamped with the current time.
+
+        :param iterable stream:
+            Measurements as returned by a device, e.g.
+            :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.iter_measurements`.
+        :return: Generator yielding the published measurements.
+        :rtype: generator
+        """  # noqa: E501
+        for values in stream:
+            if self.update(values):
+                yield values
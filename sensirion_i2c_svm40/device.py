@@ -2,17 +2,150 @@
 # (c) Copyright 2020 Sensirion AG, Switzerland
 
 from __future__ import absolute_import, division, print_function
-from sensirion_i2c_driver import I2cDevice
-from .commands import Svm40I2cCmdGetSerialNumber, Svm40I2cCmdDeviceReset, \
-    Svm40I2cCmdGetVersion, Svm40I2cCmdStartContinuousMeasurement, \
-    Svm40I2cCmdStopMeasurement, Svm40I2cCmdReadMeasuredValues, \
-    Svm40I2cCmdReadMeasuredValuesRaw, \
-    Svm40I2cCmdGetTemperatureOffsetForRhtMeasurements, \
-    Svm40I2cCmdSetTemperatureOffsetForRhtMeasurements, \
-    Svm40I2cCmdGetVocAlgorithmTuningParameters, \
-    Svm40I2cCmdSetVocAlgorithmTuningParameters, \
-    Svm40I2cCmdGetVocAlgorithmState, Svm40I2cCmdSetVocAlgorithmState, \
-    Svm40I2cCmdStoreNvData
+from sensirion_i2c_driver import I2cDevice, I2cCommand
+from sensirion_i2c_driver.errors import I2cNackError
+from .commands import prebuilt
+from .instrumentation import execute_instrumented
+from ._clock import clock as _clock
+import time
+
+import logging
+log = logging.getLogger(__name__)
+
+
+def _frame_key(values):
+    """
+    Get the ticks of a read measurement to detect updated values.
+    """
+    return tuple(getattr(value, 'ticks', value) for value in values)
+
+
+class _PollScheduler(object):
+    """
+    Poll schedule of :py:meth:`Svm40I2cDevice.iter_measurements`, locked to
+    the update phase of the device. Shared with the asynchronous device.
+    """
+    def __init__(self, period, retry_interval, phase_step):
+        super(_PollScheduler, self).__init__()
+        self._period = period
+        self._retry_interval = retry_interval
+        self._phase_step = phase_step
+        self._last_key = None
+        self._last_update = None
+        self._locked = False
+        self._early = False
+        self._probe = False
+
+        #: Clock time of the next poll.
+        self.next_poll = _clock()
+
+    def update(self, poll_time, values):
+        """
+        Update the schedule with the values read at ``poll_time``.
+
+        :return: True if the values are new and shall be yielded, False if
+                 they must be polled again at :py:attr:`next_poll`.
+        :rtype: bool
+        """
+        period = self._period
+        key = _frame_key(values)
+        if key == self._last_key:
+            if self._locked and not self._probe:
+                # Unchanged at the expected update time, i.e. the values
+                # are stable. Count as update and keep the phase.
+                self._last_update += period
+                self.next_poll = self._last_update + period
+            elif self._locked or poll_time - self._last_update < 1.5 * period:
+                # Values not updated yet, poll again shortly.
+                self._early = True
+                self._probe = False
+                self.next_poll = poll_time + self._retry_interval
+                return False
+            else:
+                # No change for a whole period, so the device has updated
+                # the values but they are equal. Any phase is fine.
+                self._locked = True
+                self._last_update += period
+                self.next_poll = self._last_update + period
+        elif self._early:
+            # Update happened since the last (early) poll -> phase locked.
+            self._locked = True
+            self._last_update = poll_time
+            self.next_poll = poll_time + period
+        elif self._locked:
+            # Update happened an unknown time ago -> probe slightly
+            # earlier next time.
+            self._probe = True
+            self._last_update = poll_time
+            self.next_poll = poll_time + period - self._phase_step
+        else:
+            # Phase not known yet, poll until the next update is seen.
+            self._last_update = poll_time
+            self.next_poll = poll_time + self._retry_interval
+        self._last_key = key
+        self._early = False
+        return True
+
+
+# Write header without data, acknowledged by the device as soon as it is
+# ready to receive the next command.
+_READINESS_PROBE = I2cCommand(tx_data=b"", rx_length=None, read_delay=0.0,
+                              timeout=0.0)
+
+
+class ConfigurationResult(object):
+    """
+    Result of :py:meth:`Svm40I2cDevice.apply_configuration`.
+    """
+    def __init__(self):
+        super(ConfigurationResult, self).__init__()
+
+        #: Names of the changed parameters (list of str), i.e.
+        #: ``'temperature_offset'`` and/or ``'voc_tuning_parameters'``.
+        self.changed = []
+
+        #: Whether the configuration was stored to the non-volatile memory
+        #: (bool).
+        self.stored = False
+
+        #: Whether the measurement was stopped and restarted (bool).
+        self.restarted = False
+
+        #: Time in seconds between stopping and restarting the measurement
+        #: (float), zero if the measurement was not interrupted. Note that
+        #: the first new measurement values are available one second after
+        #: the restart.
+        self.measurement_gap = 0.0
+
+    def __repr__(self):
+        return "ConfigurationResult(changed={!r}, stored={!r}, " \
+            "restarted={!r}, measurement_gap={:.3f})".format(
+                self.changed, self.stored, self.restarted,
+                self.measurement_gap)
+
+
+class DeviceMetadata(object):
+    """
+    Cached identity and configuration of a device, see
+    :py:attr:`Svm40I2cDevice.metadata`.
+    """
+    def __init__(self, serial_number, version, temperature_offset,
+                 voc_tuning_parameters):
+        super(DeviceMetadata, self).__init__()
+
+        #: The serial number (str).
+        self.serial_number = serial_number
+
+        #: The version
+        #: (:py:class:`~sensirion_i2c_svm40.version_types.Version`).
+        self.version = version
+
+        #: The last read temperature offset in degrees celsius (float), or
+        #: None if not known.
+        self.temperature_offset = temperature_offset
+
+        #: The last read VOC tuning parameters (tuple), or None if not known.
+        self.voc_tuning_parameters = voc_tuning_parameters
 
 
 class Svm40I2cDevice(I2cDevice):
@@ -20,7 +153,16 @@ class Svm40I2cDevice(I2cDevice):
     SVM40 I²C device class to allow executing I²C commands.
     """
 
-    def __init__(self, connection, slave_address=0x6A):
+    #: Initial interval in seconds between readiness probes, see
+    #: :py:attr:`readiness_polling`.
+    READINESS_POLL_INTERVAL = 0.002
+
+    #: Maximum interval in seconds between readiness probes.
+    READINESS_POLL_MAX_INTERVAL = 0.02
+
+    def __init__(self, connection, slave_address=0x6A,
+                 instrumentation=None, readiness_polling=False,
+                 resilience=None):
         """
         Constructs a new SVM40 I²C device.
 
@@ -28,14 +170,236 @@ class Svm40I2cDevice(I2cDevice):
             The I²C connection to use for communication.
         :param byte slave_address:
             The I²C slave address, defaults to 0x6A.
+        :param callable instrumentation:
+            Optional callable which gets a
+            :py:class:`~sensirion_i2c_svm40.instrumentation.CommandRecord`
+            after every executed command, e.g. a
+            :py:class:`~sensirion_i2c_svm40.instrumentation.CommandStats`
+            object. See :py:attr:`instrumentation`.
+        :param bool readiness_polling:
+            Whether to poll the device for readiness after commands with a
+            post processing time, see :py:attr:`readiness_polling`.
+        :param ~sensirion_i2c_svm40.resilience.ResiliencePolicy resilience:
+            Optional policy for retries and circuit breaking, see
+            :py:attr:`resilience`.
         """
         super(Svm40I2cDevice, self).__init__(connection, slave_address)
+        self._instrumentation = instrumentation
+        self._readiness_polling = readiness_polling
+        self._resilience = resilience
+        self._serial_number = None
+        self._version = None
+        self._temperature_offset = None
+        self._voc_tuning_parameters = None
+
+    @property
+    def instrumentation(self):
+        """
+        The instrumentation callback (or None if disabled). Can be changed at
+        any time.
+
+        :type: callable
+        """
+        return self._instrumentation
+
+    @instrumentation.setter
+    def instrumentation(self, instrumentation):
+        self._instrumentation = instrumentation
+
+    @property
+    def readiness_polling(self):
+        """
+        Whether readiness polling is enabled. Can be changed at any time.
+
+        By default, commands which need post processing in the device (device
+        reset, stop measurement, store NV data) wait for the worst-case post
+        processing time. With readiness polling, the device is probed with
+        empty write transfers (with exponentially increasing intervals)
+        after such a command, and the command returns as soon as the device
+        acknowledges. The worst-case post processing time is still the upper
+        bound of the waiting time.
+
+        :type: bool
+        """
+        return self._readiness_polling
+
+    @readiness_polling.setter
+    def readiness_polling(self, readiness_polling):
+        self._readiness_polling = readiness_polling
+
+    @property
+    def resilience(self):
+        """
+        The policy for retries and circuit breaking (or None if disabled),
+        see :py:class:`~sensirion_i2c_svm40.resilience.ResiliencePolicy`.
+        Can be changed at any time.
+
+        :type: ~sensirion_i2c_svm40.resilience.ResiliencePolicy
+        """
+        return self._resilience
+
+    @resilience.setter
+    def resilience(self, resilience):
+        self._resilience = resilience
+
+    @property
+    def serial_number(self):
+        """
+        The serial number of the device, read only on first access and then
+        cached until :py:meth:`device_reset` or
+        :py:meth:`invalidate_metadata` is called.
+
+        :type: str
+        """
+        if self._serial_number is None:
+            self.get_serial_number()
+        return self._serial_number
+
+    @property
+    def version(self):
+        """
+        The version of the device, read only on first access and then cached
+        until :py:meth:`device_reset` or :py:meth:`invalidate_metadata` is
+        called.
+
+        :type: ~sensirion_i2c_svm40.version_types.Version
+        """
+        if self._version is None:
+            self.get_version()
+        return self._version
+
+    @property
+    def metadata(self):
+        """
+        The cached metadata of the device. Serial number and version are read
+        from the device if not cached yet. The configuration is the one last
+        read with :py:meth:`get_compensation_temperature_offset` and
+        :py:meth:`get_voc_tuning_parameters` (None if not read yet or changed
+        since then with the corresponding setter or a device reset).
+
+        .. note:: Commands passed directly to :py:meth:`execute` do not
+                  update the cache, call :py:meth:`refresh_metadata` after
+                  changing the device configuration that way.
+
+        :type: ~sensirion_i2c_svm40.device.DeviceMetadata
+        """
+        return DeviceMetadata(self.serial_number, self.version,
+                              self._temperature_offset,
+                              self._voc_tuning_parameters)
+
+    def refresh_metadata(self, configuration=False):
+        """
+        Reads the serial number and version (and optionally the
+        configuration) from the device to update the metadata cache.
+
+        :param bool configuration:
+            Whether the temperature offset and the VOC tuning parameters are
+            read as well.
+        :return: The updated metadata.
+        :rtype: ~sensirion_i2c_svm40.device.DeviceMetadata
+        """
+        self.get_serial_number()
+        self.get_version()
+        if configuration:
+            self.get_compensation_temperature_offset()
+            self.get_voc_tuning_parameters()
+        return self.metadata
+
+    def invalidate_metadata(self):
+        """
+        Clears the metadata cache, so it is read again from the device on the
+        next access.
+        """
+        self._serial_number = None
+        self._version = None
+        self._temperature_offset = None
+        self._voc_tuning_parameters = None
+
+    def execute(self, command):
+        """
+        Execute an I²C command on this device.
+
+        :param ~sensirion_i2c_driver.command.I2cCommand command:
+            The command to be executed.
+        :return:
+            The interpreted response of the executed command.
+        :rtype:
+            Depends on the executed command.
+        """
+        return self._execute(command)
+
+    def _execute(self, command, expected_errors=()):
+        """
+        Execute an I²C command on this device, passing the expected errors
+        to the resilience policy.
+        """
+        if self._resilience is not None:
+            return self._resilience.execute(self._execute_once, command,
+                                            self._instrumentation,
+                                            expected_errors)
+        return self._execute_once(command)
+
+    def _execute_once(self, command):
+        """
+        Execute an I²C command on this device without retries.
+        """
+        if self._instrumentation is not None:
+            return execute_instrumented(
+                self._connection, self._slave_address, command,
+                self._instrumentation, self._wait_post_process)
+        if self._readiness_polling and command.post_processing_time > 0.0:
+            result = self._connection.execute(self._slave_address, command,
+                                              wait_post_process=False)
+            self._wait_post_process(command)
+            return result
+        return self._connection.execute(self._slave_address, command)
+
+    def _wait_post_process(self, command):
+        """
+        Wait until the device has finished the post processing of a command.
+        """
+        if not self._readiness_polling:
+            time.sleep(command.post_processing_time)
+            return
+        deadline = _clock() + command.post_processing_time
+        interval = self.READINESS_POLL_INTERVAL
+        while True:
+            remaining = deadline - _clock()
+            if remaining <= interval:
+                # Probing makes no sense anymore, wait for the upper bound.
+                if remaining > 0.0:
+                    time.sleep(remaining)
+                return
+            time.sleep(interval)
+            try:
+                result = self._connection.execute(self._slave_address,
+                                                  _READINESS_PROBE)
+                if isinstance(result, list):
+                    # Multi-channel response: Errors are returned instead of
+                    # raised, and the device is ready only if it is ready on
+                    # all channels.
+                    errors = [r for r in result if isinstance(r, Exception)]
+                    nacks = [e for e in errors if isinstance(e, I2cNackError)]
+                    if nacks and len(nacks) == len(errors):
+                        raise nacks[0]
+                    elif errors:
+                        raise errors[0]
+                return
+            except I2cNackError:
+                interval = min(2 * interval, self.READINESS_POLL_MAX_INTERVAL)
+            except Exception as e:
+                # Probing not supported by the transceiver (or bus problem),
+                # so fall back to the fixed post processing time.
+                log.debug("Readiness probe failed: {}".format(e))
+                time.sleep(max(deadline - _clock(), 0.0))
+                return
 
     def device_reset(self):
         """
         Execute a device reset (reboot firmware, similar to power cycle).
         """
-        return self.execute(Svm40I2cCmdDeviceReset())
+        self.invalidate_metadata()
+        return self.execute(prebuilt.DEVICE_RESET)
 
     def get_serial_number(self):
         """
@@ -44,7 +408,8 @@ class Svm40I2cDevice(I2cDevice):
         :return: The serial number as a hex formatted ASCII string.
         :rtype: string
         """
-        return self.execute(Svm40I2cCmdGetSerialNumber())
+        self._serial_number = self.execute(prebuilt.GET_SERIAL_NUMBER)
+        return self._serial_number
 
     def get_version(self):
         """
@@ -53,7 +418,8 @@ class Svm40I2cDevice(I2cDevice):
         :return: The device version.
         :rtype: ~sensirion_i2c_svm40.response_types.Version
         """
-        return self.execute(Svm40I2cCmdGetVersion())
+        self._version = self.execute(prebuilt.GET_VERSION)
+        return self._version
 
     def get_compensation_temperature_offset(self):
         """
@@ -62,8 +428,9 @@ class Svm40I2cDevice(I2cDevice):
         :return: Temperature offset in degrees celsius.
         :rtype: float
         """
-        return self.execute(
-            Svm40I2cCmdGetTemperatureOffsetForRhtMeasurements())
+        self._temperature_offset = self.execute(
+            prebuilt.GET_TEMPERATURE_OFFSET)
+        return self._temperature_offset
 
     def set_compensation_temperature_offset(self, t_offset):
         """
@@ -77,8 +444,8 @@ class Svm40I2cDevice(I2cDevice):
 
         :param float t_offset: Temperature offset in degrees celsius.
         """
-        return self.execute(
-            Svm40I2cCmdSetTemperatureOffsetForRhtMeasurements(t_offset))
+        self._temperature_offset = None
+        return self.execute(prebuilt.set_temperature_offset(t_offset))
 
     def get_voc_tuning_parameters(self):
         """
@@ -102,7 +469,9 @@ class Svm40I2cDevice(I2cDevice):
               device-to-device variations. The default value is 50.
         :rtype: tuple
         """
-        return self.execute(Svm40I2cCmdGetVocAlgorithmTuningParameters())
+        self._voc_tuning_parameters = self.execute(
+            prebuilt.GET_VOC_TUNING_PARAMETERS)
+        return self._voc_tuning_parameters
 
     def set_voc_tuning_parameters(self, voc_index_offset, learning_time_hours,
                                   gating_max_duration_minutes, std_initial):
@@ -132,7 +501,8 @@ class Svm40I2cDevice(I2cDevice):
             during initial learning period, but may result in larger
             device-to-device variations. The default value is 50.
         """
-        return self.execute(Svm40I2cCmdSetVocAlgorithmTuningParameters(
+        self._voc_tuning_parameters = None
+        return self.execute(prebuilt.set_voc_tuning_parameters(
             voc_index_offset, learning_time_hours, gating_max_duration_minutes,
             std_initial))
 
@@ -140,7 +510,89 @@ class Svm40I2cDevice(I2cDevice):
         """
         Stores all customer engine parameters to the non-volatile memory.
         """
-        return self.execute(Svm40I2cCmdStoreNvData())
+        return self.execute(prebuilt.STORE_NV_DATA)
+
+    def apply_configuration(self, temperature_offset=None,
+                            voc_tuning_parameters=None, store_nv=True):
+        """
+        Applies a configuration, accessing the device only as much as needed.
+
+        The current parameters are read from the device and only the
+        parameters which differ are written. Since the VOC tuning parameters
+        can only be set in idle mode, a running measurement is stopped and
+        restarted for that, and the VOC algorithm state is restored before
+        the restart. The data is stored to the non-volatile memory at most
+        once, and only if something has changed. If a write fails, a stopped
+        measurement is restarted anyway before the exception is raised.
+
+        .. note:: The measurement mode is detected by reading the VOC
+                  algorithm state, which is only available in measurement
+                  mode (i.e. the device does not acknowledge it in idle
+                  mode). Parameters which were changed before but not stored
+                  to the non-volatile memory are not detected.
+
+        :param float temperature_offset:
+            Temperature offset in degrees celsius, or None to keep the
+            current value.
+        :param tuple voc_tuning_parameters:
+            VOC tuning parameters ``(voc_index_offset, learning_time_hours,
+            gating_max_duration_minutes, std_initial)``, see
+            :py:meth:`set_voc_tuning_parameters`, or None to keep the
+            current values.
+        :param bool store_nv:
+            Whether changed parameters are stored to the non-volatile memory.
+        :return: Information about the applied changes.
+        :rtype: ~sensirion_i2c_svm40.device.ConfigurationResult
+        """
+        result = ConfigurationResult()
+        if temperature_offset is not None:
+            current = self.get_compensation_temperature_offset()
+            if int(round(temperature_offset * 200)) != \
+                    int(round(current * 200)):
+                self.set_compensation_temperature_offset(temperature_offset)
+                result.changed.append('temperature_offset')
+        if voc_tuning_parameters is not None:
+            tuning = tuple(int(p) for p in voc_tuning_parameters)
+            if tuning != tuple(self.get_voc_tuning_parameters()):
+                self._apply_voc_tuning_parameters(tuning, result)
+                result.changed.append('voc_tuning_parameters')
+        if store_nv and result.changed:
+            self.store_nv_data()
+            result.stored = True
+        return result
+
+    def _apply_voc_tuning_parameters(self, tuning, result):
+        """
+        Sets the VOC tuning parameters, temporarily stopping the measurement
+        if needed.
+        """
+        try:
+            # Probe the operating mode, an expected NACK is neither retried
+            # nor counted as failure by the resilience policy.
+            state = self._execute(prebuilt.GET_VOC_STATE,
+                                  expected_errors=(I2cNackError,))
+        except I2cNackError:
+            # Idle mode, parameters can be set immediately.
+            self.set_voc_tuning_parameters(*tuning)
+            return
+        stopped = _clock()
+        self.stop_measurement()
+        failed = True
+        try:
+            self.set_voc_tuning_parameters(*tuning)
+            self.set_voc_state(state)
+            failed = False
+        finally:
+            try:
+                self.start_measurement()
+            except Exception as e:
+                if not failed:
+                    raise
+                # Do not hide the original error.
+                log.error("Failed to restart the measurement: {}".format(e))
+            else:
+                result.restarted = True
+                result.measurement_gap = _clock() - stopped
 
     def get_voc_state(self):
         """
@@ -155,7 +607,7 @@ class Svm40I2cDevice(I2cDevice):
         :return: Current VOC algorithm state.
         :rtype: list(int)
         """
-        return self.execute(Svm40I2cCmdGetVocAlgorithmState())
+        return self.execute(prebuilt.GET_VOC_STATE)
 
     def set_voc_state(self, state):
         """
@@ -168,7 +620,7 @@ class Svm40I2cDevice(I2cDevice):
 
         :param list(int) state: Current VOC algorithm state.
         """
-        return self.execute(Svm40I2cCmdSetVocAlgorithmState(state))
+        return self.execute(prebuilt.set_voc_state(state))
 
     def start_measurement(self):
         """
@@ -176,7 +628,7 @@ class Svm40I2cDevice(I2cDevice):
 
         .. note:: This command is only available in idle mode.
         """
-        return self.execute(Svm40I2cCmdStartContinuousMeasurement())
+        return self.execute(prebuilt.START_MEASUREMENT)
 
     def stop_measurement(self):
         """
@@ -184,9 +636,9 @@ class Svm40I2cDevice(I2cDevice):
 
         .. note:: This command is only available in measurement mode.
         """
-        return self.execute(Svm40I2cCmdStopMeasurement())
+        return self.execute(prebuilt.STOP_MEASUREMENT)
 
-    def read_measured_values(self):
+    def read_measured_values(self, compact=False):
         """
         Returns the new measurement results.
 
@@ -197,6 +649,13 @@ class Svm40I2cDevice(I2cDevice):
                   measurement command is issued. Any readout prior to this will
                   return zero initialized values.
 
+        :param bool compact:
+            If True, the compact response types
+            :py:class:`~sensirion_i2c_svm40.response_types.CompactAirQuality`,
+            :py:class:`~sensirion_i2c_svm40.response_types.CompactHumidity`
+            and
+            :py:class:`~sensirion_i2c_svm40.response_types.CompactTemperature`
+            are returned, which have the same attributes but use less memory.
         :return:
             The measured air quality, humidity and temperature.
 
@@ -209,9 +668,9 @@ class Svm40I2cDevice(I2cDevice):
         :rtype:
             tuple
         """  # noqa: E501
-        return self.execute(Svm40I2cCmdReadMeasuredValues())
+        return self.execute(prebuilt.read_measured_values(compact))
 
-    def read_measured_values_raw(self):
+    def read_measured_values_raw(self, compact=False):
         """
         Returns the new measurement results with raw values added.
 
@@ -222,6 +681,13 @@ class Svm40I2cDevice(I2cDevice):
                   measurement command is issued. Any readout prior to this will
                   return zero initialized values.
 
+        :param bool compact:
+            If True, the compact response types
+            :py:class:`~sensirion_i2c_svm40.response_types.CompactAirQuality`,
+            :py:class:`~sensirion_i2c_svm40.response_types.CompactHumidity`
+            and
+            :py:class:`~sensirion_i2c_svm40.response_types.CompactTemperature`
+            are returned, which have the same attributes but use less memory.
         :return:
             The measured air quality, humidity and temperature including the
             raw values without algorithm compensation.
@@ -241,4 +707,66 @@ class Svm40I2cDevice(I2cDevice):
         :rtype:
             tuple
         """  # noqa: E501
-        return self.execute(Svm40I2cCmdReadMeasuredValuesRaw())
+        return self.execute(prebuilt.read_measured_values_raw(compact))
+
+    def iter_measurements(self, raw=False, compact=False, period=1.0,
+                          retry_interval=0.05, phase_step=0.01):
+        """
+        Generator which yields every new measurement exactly once.
+
+        The firmware updates the measurement values once per second. Instead
+        of polling faster than that, this generator locks the poll phase to
+        the update of the device: After a new frame was received, the next
+        poll is scheduled one period later. If a new frame was received
+        without a preceding early poll, the next poll is scheduled slightly
+        earlier by ``phase_step`` to follow clock drift between host and
+        device, and retried once after ``retry_interval`` if the values are
+        not updated yet. Thus the yielded values are at most about
+        ``retry_interval`` old and only slightly more than one I²C
+        transaction per period is needed.
+
+        .. note:: Measurement must be started before iterating. Once the
+                  phase is locked, values which did not change at the
+                  expected update time are yielded anyway, so the generator
+                  yields one sample per period also in very stable
+                  conditions. Until the phase is locked, unchanged values are
+                  only yielded after 1.5 periods. Reading the raw values
+                  makes detecting updates more reliable since the raw VOC
+                  ticks change with almost every update.
+
+        Example:
+
+        .. sourcecode:: python
+
+            device.start_measurement()
+            for values in device.iter_measurements():
+                print("{}, {}, {}".format(*values))
+
+        :param bool raw:
+            If True, the values are read with
+            :py:meth:`read_measured_values_raw`, otherwise with
+            :py:meth:`read_measured_values`.
+        :param bool compact:
+            Passed to the read method, see :py:meth:`read_measured_values`.
+        :param float period:
+            Update period of the device in seconds.
+        :param float retry_interval:
+            Interval in seconds to poll again if the values were not updated
+            yet. Also used to find the update phase of the device initially.
+        :param float phase_step:
+            Time in seconds by which the poll schedule is advanced after every
+            update which was received without a preceding early poll.
+        :return: Generator yielding the same tuples as the read method.
+        :rtype: generator
+        """
+        read = self.read_measured_values_raw if raw \
+            else self.read_measured_values
+        scheduler = _PollScheduler(period, retry_interval, phase_step)
+        while True:
+            delay = scheduler.next_poll - _clock()
+            if delay > 0:
+                time.sleep(delay)
+            poll_time = _clock()
+            values = read(compact)
+            if scheduler.update(poll_time, values):
+                yield values
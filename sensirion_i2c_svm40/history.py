@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from array import array
+from .response_types import _values_to_ticks
+import sys
+import time
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class MeasurementHistory(object):
+    """
+    Fixed-size columnar ring buffer for the measurement history of a device.
+
+    Every column is stored in a typed :py:class:`array.array` which is
+    allocated once at construction, so the memory usage does not grow no
+    matter how many measurements are appended. Every sample is written twice
+    (at its ring position and one capacity later), which makes sure the most
+    recent samples are always contiguous in memory and can be returned as a
+    zero-copy window without reordering.
+
+    Example:
+
+    .. sourcecode:: python
+
+        history = MeasurementHistory(capacity=3600)
+        while True:
+            history.append(device.read_measured_values())
+            time.sleep(1.)
+            temperature_ticks = history.window('temperature', 60)
+    """
+
+    #: Names of the available columns and their array type codes.
+    COLUMNS = (
+        ('timestamp', 'd'),
+        ('voc_index', 'h'),
+        ('humidity', 'h'),
+        ('temperature', 'h'),
+        ('raw_voc_ticks', 'H'),
+        ('raw_humidity', 'h'),
+        ('raw_temperature', 'h'),
+    )
+
+    def __init__(self, capacity):
+        """
+        Creates an empty history.
+
+        :param int capacity:
+            Maximum number of samples to keep. When the history is full, the
+            oldest sample gets overwritten.
+        """
+        super(MeasurementHistory, self).__init__()
+        if capacity < 1:
+            raise ValueError("The capacity must be at least 1.")
+        self._capacity = int(capacity)
+        self._columns = dict(
+            (name, array(typecode, [0]) * (2 * self._capacity))
+            for name, typecode in self.COLUMNS)
+        self._ordered_columns = [self._columns[name]
+                                 for name, _ in self.COLUMNS]
+        self._index = 0  # position of the next sample
+        self._length = 0
+
+    @property
+    def capacity(self):
+        """
+        Get the maximum number of samples.
+
+        :type: int
+        """
+        return self._capacity
+
+    def __len__(self):
+        return self._length
+
+    def append(self, values, timestamp=None):
+        """
+        Append a measurement as returned by a device.
+
+        :param tuple values:
+            The response of
+            :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.read_measured_values`
+            or
+            :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.read_measured_values_raw`.
+            For the non-raw response, the raw columns are set to zero.
+        :param float timestamp:
+            Timestamp of the measurement. Defaults to the current time.
+        """  # noqa: E501
+        self.append_ticks(timestamp=timestamp, **_values_to_ticks(values))
+
+    def append_ticks(self, voc_index, humidity, temperature, raw_voc_ticks=0,
+                     raw_humidity=0, raw_temperature=0, timestamp=None):
+        """
+        Append a measurement given as ticks.
+
+        :param int voc_index: VOC index ticks.
+        :param int humidity: Humidity ticks.
+        :param int temperature: Temperature ticks.
+        :param int raw_voc_ticks: Raw VOC ticks.
+        :param int raw_humidity: Raw humidity ticks.
+        :param int raw_temperature: Raw temperature ticks.
+        :param float timestamp:
+            Timestamp of the measurement. Defaults to the current time.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        sample = (timestamp, voc_index, humidity, temperature, raw_voc_ticks,
+                  raw_humidity, raw_temperature)
+        first = self._index
+        second = first + self._capacity
+        for column, value in zip(self._ordered_columns, sample):
+            column[first] = value
+            column[second] = value
+        self._index = (first + 1) % self._capacity
+        if self._length < self._capacity:
+            self._length += 1
+
+    def clear(self):
+        """
+        Remove all samples. The allocated memory is kept.
+        """
+        self._index = 0
+        self._length = 0
+
+    def window(self, column, count=None):
+        """
+        Get the most recent samples of a column without copying them.
+
+        .. note:: The returned memoryview references the internal storage, so
+                  its content changes when further samples are appended. Copy
+                  it if you need a snapshot. On Python 2, arrays do not
+                  support memoryviews, so a copy of the samples is returned
+                  as :py:class:`array.array` instead (use :py:meth:`ndarray`
+                  to avoid the copy).
+
+        :param str column: Name of the column, see :py:attr:`COLUMNS`.
+        :param int count:
+            Number of samples to return. Defaults to all available samples.
+            Larger values are limited to the available samples.
+        :return: The samples in chronological order (oldest first).
+        :rtype: memoryview
+        """
+        start, end = self._window_range(count)
+        if sys.version_info[0] < 3:
+            return self._columns[column][start:end]
+        return memoryview(self._columns[column])[start:end]
+
+    def ndarray(self, column, count=None):
+        """
+        Same as :py:meth:`window`, but returns a NumPy array referencing the
+        internal storage (also on Python 2).
+
+        .. note:: This method requires NumPy (``pip install numpy``).
+
+        :param str column: Name of the column, see :py:attr:`COLUMNS`.
+        :param int count:
+            Number of samples to return. Defaults to all available samples.
+        :return: The samples in chronological order (oldest first).
+        :rtype: numpy.ndarray
+        """
+        import numpy as np
+        start, end = self._window_range(count)
+        samples = self._columns[column]
+        return np.frombuffer(samples, dtype=samples.typecode)[start:end]
+
+    def _window_range(self, count):
+        if count is None or count > self._length:
+            count = self._length
+        end = self._index + self._capacity
+        return end - count, end
@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+"""
+Optional instrumentation of the command execution.
+
+Pass a callable as ``instrumentation`` to
+:py:class:`~sensirion_i2c_svm40.device.Svm40I2cDevice` to get a
+:py:class:`CommandRecord` after every executed command. The callable can be a
+simple function, or a :py:class:`CommandStats` object which aggregates the
+records into per-command latency histograms and error counters:
+
+.. sourcecode:: python
+
+    stats = CommandStats()
+    device = Svm40I2cDevice(connection, instrumentation=stats)
+    device.start_measurement()
+    device.read_measured_values()
+    print(stats.as_dict())
+
+Without instrumentation, the command execution is not affected at all.
+"""
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_driver.errors import I2cChecksumError, I2cNackError, \
+    I2cTimeoutError
+from ._clock import clock as _clock
+import bisect
+import threading
+import time
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class CommandRecord(object):
+    """
+    Timing and result of a single command execution.
+    """
+    __slots__ = ('command', 'bus_time', 'sleep_time', 'decode_time', 'error')
+
+    def __init__(self, command, bus_time, sleep_time, decode_time, error):
+        """
+        Creates a record.
+
+        :param str command: Name of the command class.
+        :param float bus_time:
+            Time in seconds spent for the I²C transfers, without the read
+            delay.
+        :param float sleep_time:
+            Time in seconds spent waiting for the device, i.e. the read delay
+            and the post processing time of the command.
+        :param float decode_time:
+            Time in seconds spent interpreting the response (CRC check and
+            conversion).
+        :param Exception error:
+            The exception raised by the command execution, or None if it was
+            successful.
+        """
+        super(CommandRecord, self).__init__()
+        self.command = command
+        self.bus_time = bus_time
+        self.sleep_time = sleep_time
+        self.decode_time = decode_time
+        self.error = error
+
+    @property
+    def total_time(self):
+        """
+        Total execution time in seconds.
+
+        :type: float
+        """
+        return self.bus_time + self.sleep_time + self.decode_time
+
+    def __repr__(self):
+        return "CommandRecord({!r}, bus_time={:.6f}, sleep_time={:.6f}, " \
+            "decode_time={:.6f}, error={!r})".format(
+                self.command, self.bus_time, self.sleep_time,
+                self.decode_time, self.error)
+
+
+class LatencyHistogram(object):
+    """
+    Histogram of latencies with logarithmic buckets.
+
+    The upper bounds of the buckets are doubled from bucket to bucket,
+    starting at 1µs. Latencies above the largest bound (about 67s) are
+    counted in an overflow bucket.
+    """
+
+    #: Upper bounds of the buckets in seconds.
+    BOUNDS = tuple(1e-6 * 2 ** i for i in range(27))
+
+    def __init__(self):
+        """
+        Creates an empty histogram.
+        """
+        super(LatencyHistogram, self).__init__()
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, latency):
+        """
+        Adds a latency to the histogram.
+
+        :param float latency: The latency in seconds.
+        """
+        self.counts[bisect.bisect_left(self.BOUNDS, latency)] += 1
+        self.count += 1
+        self.total += latency
+        if self.min is None or latency < self.min:
+            self.min = latency
+        if self.max is None or latency > self.max:
+            self.max = latency
+
+    @property
+    def mean(self):
+        """
+        Mean latency in seconds, or None if the histogram is empty.
+
+        :type: float
+        """
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent):
+        """
+        Estimates a percentile of the latencies.
+
+        :param float percent: The percentile to get, e.g. 99.0.
+        :return:
+            The upper bound of the bucket containing the percentile (limited
+            to the maximum latency), or None if the histogram is empty.
+        :rtype: float
+        """
+        if not self.count:
+            return None
+        rank = percent / 100. * self.count
+        cumulative = 0
+        for bound, count in zip(self.BOUNDS, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self):
+        """
+        Gets the histogram as dict (e.g. to serialize it as JSON), containing
+        the summary values and the non-empty buckets as list of
+        ``[upper_bound, count]`` pairs (upper bound None for the overflow
+        bucket).
+
+        :rtype: dict
+        """
+        bounds = self.BOUNDS + (None,)
+        return {
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            'p50': self.percentile(50.),
+            'p99': self.percentile(99.),
+            'buckets': [[bound, count] for bound, count
+                        in zip(bounds, self.counts) if count],
+        }
+
+
+class CommandStatistics(object):
+    """
+    Aggregated statistics of one command.
+    """
+    def __init__(self):
+        super(CommandStatistics, self).__init__()
+
+        #: Histogram of the bus time.
+        self.bus_time = LatencyHistogram()
+
+        #: Histogram of the sleep time.
+        self.sleep_time = LatencyHistogram()
+
+        #: Histogram of the decode time.
+        self.decode_time = LatencyHistogram()
+
+        #: Histogram of the total execution time.
+        self.total_time = LatencyHistogram()
+
+        #: Number of executions.
+        self.executions = 0
+
+        #: Number of retries reported with
+        #: :py:meth:`CommandStats.record_retry`.
+        self.retries = 0
+
+        #: Number of executions which failed with
+        #: :py:class:`~sensirion_i2c_driver.errors.I2cChecksumError`.
+        self.checksum_errors = 0
+
+        #: Number of executions which failed with
+        #: :py:class:`~sensirion_i2c_driver.errors.I2cTimeoutError`.
+        self.timeouts = 0
+
+        #: Number of executions which failed with
+        #: :py:class:`~sensirion_i2c_driver.errors.I2cNackError`.
+        self.nacks = 0
+
+        #: Number of executions which failed with any other exception.
+        self.other_errors = 0
+
+    def as_dict(self):
+        """
+        Gets the statistics as dict (e.g. to serialize it as JSON).
+
+        :rtype: dict
+        """
+        return {
+            'executions': self.executions,
+            'retries': self.retries,
+            'checksum_errors': self.checksum_errors,
+            'timeouts': self.timeouts,
+            'nacks': self.nacks,
+            'other_errors': self.other_errors,
+            'bus_time': self.bus_time.as_dict(),
+            'sleep_time': self.sleep_time.as_dict(),
+            'decode_time': self.decode_time.as_dict(),
+            'total_time': self.total_time.as_dict(),
+        }
+
+
+class CommandStats(object):
+    """
+    Instrumentation callback which aggregates the command records into
+    :py:class:`CommandStatistics` per command. It is thread-safe, so a single
+    object can be shared by many devices, also across threads.
+    """
+
+    def __init__(self):
+        """
+        Creates an empty statistics object.
+        """
+        super(CommandStats, self).__init__()
+        self._lock = threading.Lock()
+        self._commands = {}
+
+    def _get(self, command):
+        statistics = self._commands.get(command)
+        if statistics is None:
+            statistics = self._commands[command] = CommandStatistics()
+        return statistics
+
+    def __call__(self, record):
+        """
+        Adds a command record.
+
+        :param CommandRecord record: The record to add.
+        """
+        with self._lock:
+            statistics = self._get(record.command)
+            statistics.executions += 1
+            statistics.bus_time.add(record.bus_time)
+            statistics.sleep_time.add(record.sleep_time)
+            statistics.decode_time.add(record.decode_time)
+            statistics.total_time.add(record.total_time)
+            error = record.error
+            if error is None:
+                pass
+            elif isinstance(error, I2cChecksumError):
+                statistics.checksum_errors += 1
+            elif isinstance(error, I2cTimeoutError):
+                statistics.timeouts += 1
+            elif isinstance(error, I2cNackError):
+                statistics.nacks += 1
+            else:
+                statistics.other_errors += 1
+
+    def record_retry(self, command):
+        """
+        Counts a retry of a command. To be called by code which repeats
+        failed commands.
+
+        :param str command: Name of the command class.
+        """
+        with self._lock:
+            self._get(command).retries += 1
+
+    def get(self, command):
+        """
+        Gets the statistics of a command.
+
+        :param str command: Name of the command class.
+        :return: The statistics, or None if the command was not executed yet.
+        :rtype: CommandStatistics
+        """
+        with self._lock:
+            return self._commands.get(command)
+
+    @property
+    def commands(self):
+        """
+        Names of all recorded commands.
+
+        :type: list(str)
+        """
+        with self._lock:
+            return sorted(self._commands)
+
+    def as_dict(self):
+        """
+        Gets all statistics as dict of command name to
+        :py:meth:`CommandStatistics.as_dict`.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {command: statistics.as_dict()
+                    for command, statistics in self._commands.items()}
+
+    def reset(self):
+        """
+        Removes all statistics.
+        """
+        with self._lock:
+            self._commands.clear()
+
+
+class _TimedCommand(object):
+    """
+    Proxy of a command which measures the time spent in
+    ``interpret_response()``.
+    """
+    __slots__ = ('_command', 'tx_data', 'rx_length', 'read_delay', 'timeout',
+                 'post_processing_time', 'decode_time')
+
+    def __init__(self, command):
+        self._command = command
+        self.tx_data = command.tx_data
+        self.rx_length = command.rx_length
+        self.read_delay = command.read_delay
+        self.timeout = command.timeout
+        self.post_processing_time = command.post_processing_time
+        self.decode_time = 0.0
+
+    def interpret_response(self, data):
+        start = _clock()
+        try:
+            return self._command.interpret_response(data)
+        finally:
+            self.decode_time += _clock() - start
+
+
+def execute_instrumented(connection, slave_address, command,
+                         instrumentation, wait_post_process=None):
+    """
+    Executes a command like
+    :py:meth:`~sensirion_i2c_driver.connection.I2cConnection.execute` and
+    passes a :py:class:`CommandRecord` to the instrumentation callback.
+
+    :param ~sensirion_i2c_driver.connection.I2cConnection connection:
+        The connection to execute the command on.
+    :param byte slave_address: The I²C slave address.
+    :param ~sensirion_i2c_driver.command.I2cCommand command:
+        The command to execute.
+    :param callable instrumentation:
+        Called with the :py:class:`CommandRecord` of the execution.
+    :param callable wait_post_process:
+        Called with the command to wait until the device has finished its
+        post processing (counted as sleep time). Defaults to sleeping for
+        the post processing time of the command.
+    :return: The interpreted response of the command.
+    """
+    timed = _TimedCommand(command)
+    error = None
+    sleep_time = 0.0
+    transfer_end = None
+    start = _clock()
+    try:
+        result = connection.execute(slave_address, timed,
+                                    wait_post_process=False)
+        transfer_end = _clock()
+        if command.post_processing_time > 0.0:
+            if wait_post_process is None:
+                time.sleep(command.post_processing_time)
+            else:
+                wait_post_process(command)
+            sleep_time = _clock() - transfer_end
+        return result
+    except Exception as e:
+        error = e
+        if transfer_end is None:
+            transfer_end = _clock()  # the transfer failed
+        else:
+            sleep_time = _clock() - transfer_end  # waiting failed
+        raise
+    finally:
+        # The read delay is slept by the transceiver within the transfer.
+        read_delay = command.read_delay if command.rx_length else 0.0
+        transfer_time = transfer_end - start - timed.decode_time
+        try:
+            instrumentation(CommandRecord(
+                type(command).__name__,
+                bus_time=max(transfer_time - read_delay, 0.0),
+                sleep_time=sleep_time + min(read_delay, transfer_time),
+                decode_time=timed.decode_time,
+                error=error,
+            ))
+        except Exception as e:
+            log.exception("Instrumentation callback failed: {}".format(e))
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+"""
+Optional retries and circuit breaking of the command execution.
+
+Pass a :py:class:`ResiliencePolicy` as ``resilience`` to
+:py:class:`~sensirion_i2c_svm40.device.Svm40I2cDevice` to retry read
+commands which failed with a transient bus error, and to stop accessing a
+device which keeps failing:
+
+.. sourcecode:: python
+
+    devices = [Svm40I2cDevice(connection, address,
+                              resilience=ResiliencePolicy())
+               for address in addresses]
+    with Svm40Collector(devices, on_values):
+        ...
+
+After ``failure_threshold`` consecutive failed commands, the circuit of the
+device opens: All commands fail immediately with :py:class:`CircuitOpenError`
+without accessing the bus, so a broken device does not slow down the other
+devices on the same bus. After ``open_timeout``, the next command is let
+through as a probe. If it succeeds, the circuit closes again, otherwise it
+stays open for twice as long (up to ``max_open_timeout``).
+
+.. note:: Use one policy object per device, since it holds the state of the
+          device.
+"""
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_driver.errors import I2cChecksumError, I2cNackError, \
+    I2cTimeoutError
+from ._clock import clock as _clock
+from .commands.generated import Svm40I2cCmdGetSerialNumber, \
+    Svm40I2cCmdGetVersion, Svm40I2cCmdGetTemperatureOffsetForRhtMeasurements, \
+    Svm40I2cCmdGetVocAlgorithmTuningParameters, \
+    Svm40I2cCmdGetVocAlgorithmState, Svm40I2cCmdReadMeasuredValuesAsIntegers, \
+    Svm40I2cCmdReadMeasuredValuesAsIntegersWithRawParameters
+import threading
+import time
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class CircuitOpenError(IOError):
+    """
+    Command not executed because the circuit breaker of the device is open.
+    """
+    def __init__(self, retry_in):
+        super(CircuitOpenError, self).__init__(
+            "Circuit breaker open after repeated failures, next attempt in "
+            "{:.1f} s.".format(retry_in))
+
+        #: Time in seconds until the next command is let through (float).
+        self.retry_in = retry_in
+
+
+#: Commands retried by default: Only the commands which just read data, since
+#: a command which changes the state of the device might have been executed
+#: even though it failed (e.g. if only the acknowledge got lost).
+READ_COMMANDS = (
+    Svm40I2cCmdGetSerialNumber,
+    Svm40I2cCmdGetVersion,
+    Svm40I2cCmdGetTemperatureOffsetForRhtMeasurements,
+    Svm40I2cCmdGetVocAlgorithmTuningParameters,
+    Svm40I2cCmdGetVocAlgorithmState,
+    Svm40I2cCmdReadMeasuredValuesAsIntegers,
+    Svm40I2cCmdReadMeasuredValuesAsIntegersWithRawParameters,
+)
+
+
+class ResiliencePolicy(object):
+    """
+    Retry budget, exponential backoff and circuit breaker for the commands
+    of a single device.
+
+    A failed command is retried (at most ``max_retries`` times) only if it
+    is one of the ``retry_commands`` and the retry budget allows it: Every
+    successful command adds ``retry_ratio`` tokens to the budget (up to
+    ``max_retry_tokens``), and every retry takes one token. Thus the retries
+    are limited to a fraction of the commands, and a device which fails
+    permanently quickly stops being retried.
+    """
+
+    #: Circuit state: Commands are executed.
+    CLOSED = 'closed'
+
+    #: Circuit state: Commands fail immediately.
+    OPEN = 'open'
+
+    #: Circuit state: A single probe command is being executed.
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, max_retries=2, backoff=0.005, max_backoff=0.05,
+                 retry_ratio=0.2, max_retry_tokens=10.0, failure_threshold=5,
+                 open_timeout=5.0, max_open_timeout=300.0,
+                 retry_on=(I2cNackError, I2cChecksumError, I2cTimeoutError),
+                 retry_commands=READ_COMMANDS):
+        """
+        Creates a policy with a closed circuit and a full retry budget.
+
+        :param int max_retries: Maximum number of retries per command.
+        :param float backoff:
+            Delay in seconds before the first retry, doubled for every
+            further retry.
+        :param float max_backoff: Maximum delay in seconds before a retry.
+        :param float retry_ratio:
+            Retry tokens added to the budget by every successful command.
+        :param float max_retry_tokens: Maximum size of the retry budget.
+        :param int failure_threshold:
+            Number of consecutive failed commands which open the circuit.
+        :param float open_timeout:
+            Time in seconds until the first probe after opening the circuit.
+        :param float max_open_timeout:
+            Maximum time in seconds between probes.
+        :param tuple retry_on:
+            Exception types which are retried and counted as failures. Other
+            exceptions are raised immediately and do not affect the circuit.
+        :param tuple retry_commands:
+            Command types which are retried, defaults to
+            :py:data:`READ_COMMANDS`. Errors of other commands are raised
+            immediately, but still counted as failures.
+        """
+        super(ResiliencePolicy, self).__init__()
+        self._max_retries = max_retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._retry_ratio = retry_ratio
+        self._max_retry_tokens = max_retry_tokens
+        self._failure_threshold = failure_threshold
+        self._initial_open_timeout = open_timeout
+        self._max_open_timeout = max_open_timeout
+        self._retry_on = tuple(retry_on)
+        self._retry_commands = tuple(retry_commands)
+        self._lock = threading.Lock()
+        self._retries = 0
+        self._rejected = 0
+        self.reset()
+
+    def reset(self):
+        """
+        Close the circuit and refill the retry budget. The counters are not
+        reset.
+        """
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._open_timeout = self._initial_open_timeout
+            self._opened_at = None
+            self._retry_tokens = self._max_retry_tokens
+
+    @property
+    def state(self):
+        """
+        The circuit state, :py:attr:`CLOSED`, :py:attr:`OPEN` or
+        :py:attr:`HALF_OPEN`.
+
+        :type: str
+        """
+        return self._state
+
+    @property
+    def consecutive_failures(self):
+        """
+        Number of consecutive failed commands.
+
+        :type: int
+        """
+        return self._consecutive_failures
+
+    @property
+    def retries(self):
+        """
+        Total number of retries.
+
+        :type: int
+        """
+        return self._retries
+
+    @property
+    def rejected(self):
+        """
+        Total number of commands rejected with :py:class:`CircuitOpenError`.
+
+        :type: int
+        """
+        return self._rejected
+
+    def execute(self, function, command, instrumentation=None,
+                expected_errors=()):
+        """
+        Execute a command according to the policy.
+
+        :param callable function: Called with ``command`` to execute it once.
+        :param ~sensirion_i2c_driver.command.I2cCommand command:
+            The command to be executed.
+        :param callable instrumentation:
+            Instrumentation of the device. Retries are reported to its
+            ``record_retry()`` method, if it has one (e.g.
+            :py:class:`~sensirion_i2c_svm40.instrumentation.CommandStats`).
+        :param tuple expected_errors:
+            Exception types which are an expected result of the command, e.g.
+            the NACK of a command used to probe the operating mode. They are
+            raised immediately and do not affect the circuit.
+        :return: The return value of ``function``.
+        :raise CircuitOpenError: If the circuit is open.
+        """
+        probe = self._begin()
+        retry = isinstance(command, self._retry_commands)
+        attempt = 0
+        while True:
+            try:
+                result = function(command)
+            except tuple(expected_errors):
+                self._finished(probe)
+                raise
+            except self._retry_on as e:
+                if probe or not retry or attempt >= self._max_retries or \
+                        not self._take_retry_token():
+                    self._failed(probe)
+                    raise
+                attempt += 1
+                log.debug("Retrying {} ({}): {}".format(
+                    type(command).__name__, attempt, e))
+                record_retry = getattr(instrumentation, 'record_retry', None)
+                if record_retry is not None:
+                    record_retry(type(command).__name__)
+                time.sleep(min(self._backoff * 2 ** (attempt - 1),
+                               self._max_backoff))
+            except BaseException:
+                self._finished(probe)
+                raise
+            else:
+                self._succeeded()
+                return result
+
+    def _begin(self):
+        """
+        Check the circuit before executing a command.
+
+        :return: True if the command is a probe of an open circuit.
+        :raise CircuitOpenError: If the circuit is open.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return False
+            if self._state == self.OPEN:
+                retry_in = self._opened_at + self._open_timeout - _clock()
+                if retry_in <= 0.0:
+                    self._state = self.HALF_OPEN
+                    return True
+            else:
+                retry_in = 0.0  # another probe is running
+            self._rejected += 1
+        raise CircuitOpenError(retry_in)
+
+    def _take_retry_token(self):
+        with self._lock:
+            if self._retry_tokens < 1.0:
+                return False
+            self._retry_tokens -= 1.0
+            self._retries += 1
+            return True
+
+    def _succeeded(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                log.info("Circuit closed after successful probe.")
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._open_timeout = self._initial_open_timeout
+            self._retry_tokens = min(self._retry_tokens + self._retry_ratio,
+                                     self._max_retry_tokens)
+
+    def _failed(self, probe):
+        with self._lock:
+            self._consecutive_failures += 1
+            if probe:
+                self._open_timeout = min(2. * self._open_timeout,
+                                         self._max_open_timeout)
+            elif self._state != self.CLOSED or \
+                    self._consecutive_failures < self._failure_threshold:
+                return
+            log.warning("Circuit opened after {} consecutive failures, next "
+                        "probe in {:.1f} s.".format(
+                            self._consecutive_failures, self._open_timeout))
+            self._state = self.OPEN
+            self._opened_at = _clock()
+
+    def _finished(self, probe):
+        """
+        A command failed with an error which does not affect the circuit.
+        """
+        if probe:
+            with self._lock:
+                self._state = self.OPEN  # probe again after the timeout
+                self._opened_at = _clock()
@@ -2,6 +2,7 @@
 # (c) Copyright 2020 Sensirion AG, Switzerland
 
 from __future__ import absolute_import, division, print_function
+from operator import itemgetter
 
 import logging
 log = logging.getLogger(__name__)
@@ -89,3 +90,131 @@ class Temperature(object):
 
     def __str__(self):
         return '{:0.1f} °C'.format(self.degrees_celsius)
+
+
+class _CompactResponse(tuple):
+    """
+    Base class for the compact, immutable response types.
+
+    The instances are tuples containing only the ticks, thus they have no
+    ``__dict__``, are hashable and are pickled as the ticks only. Converted
+    values are calculated on access instead of being stored.
+    """
+    __slots__ = ()
+
+    def __new__(cls, ticks):
+        """
+        Creates an instance from the received raw data.
+
+        :param int ticks:
+            The read ticks as received from the device.
+        """
+        return tuple.__new__(cls, (ticks,))
+
+    #: The ticks (int) as received from the device.
+    ticks = property(itemgetter(0))
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((type(self).__name__, self[0]))
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self[0])
+
+
+class CompactAirQuality(_CompactResponse):
+    """
+    Compact, immutable variant of :py:class:`AirQuality`.
+
+    It provides the same attributes, but stores only the ticks and calculates
+    the converted :py:attr:`voc_index` on access.
+    """
+    __slots__ = ()
+
+    @property
+    def voc_index(self):
+        """
+        The converted VOC index.
+        """
+        return self[0] / 10.
+
+    def __str__(self):
+        return 'VOC index = {:.1f}'.format(self.voc_index)
+
+
+class CompactHumidity(_CompactResponse):
+    """
+    Compact, immutable variant of :py:class:`Humidity`.
+
+    It provides the same attributes, but stores only the ticks and calculates
+    the converted :py:attr:`percent_rh` on access.
+    """
+    __slots__ = ()
+
+    @property
+    def percent_rh(self):
+        """
+        The converted humidity in %RH.
+        """
+        return self[0] / 100.
+
+    def __str__(self):
+        return '{:0.1f} %RH'.format(self.percent_rh)
+
+
+class CompactTemperature(_CompactResponse):
+    """
+    Compact, immutable variant of :py:class:`Temperature`.
+
+    It provides the same attributes, but stores only the ticks and calculates
+    the converted :py:attr:`degrees_celsius` and :py:attr:`degrees_fahrenheit`
+    on access.
+    """
+    __slots__ = ()
+
+    @property
+    def degrees_celsius(self):
+        """
+        The converted temperature in °C.
+        """
+        return self[0] / 200.
+
+    @property
+    def degrees_fahrenheit(self):
+        """
+        The converted temperature in °F.
+        """
+        return self.degrees_celsius * 9. / 5. + 32.
+
+    def __str__(self):
+        return '{:0.1f} °C'.format(self.degrees_celsius)
+
+
+def _values_to_ticks(values):
+    """
+    Get the ticks of a measurement as returned by
+    :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.read_measured_values`
+    or
+    :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.read_measured_values_raw`
+    (regular or compact response types).
+
+    :param tuple values: The measurement.
+    :return: The ticks by field name (``voc_index``, ``humidity``,
+             ``temperature`` and, for raw measurements, ``raw_voc_ticks``,
+             ``raw_humidity`` and ``raw_temperature``).
+    :rtype: dict
+    """  # noqa: E501
+    ticks = dict(voc_index=values[0].ticks, humidity=values[1].ticks,
+                 temperature=values[2].ticks)
+    if len(values) == 6:
+        ticks.update(raw_voc_ticks=values[3], raw_humidity=values[4].ticks,
+                     raw_temperature=values[5].ticks)
+    return ticks
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+"""
+Host-side humidity and temperature compensation.
+
+The SVM40 compensates the measured (raw) humidity and temperature by the
+temperature offset set with
+:py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.set_compensation_temperature_offset`:
+The temperature is reduced by the offset, and the relative humidity is
+converted to the compensated temperature at constant absolute humidity
+(Magnus formula). This module does the same for stored raw values (see
+:py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.read_measured_values_raw`),
+to evaluate candidate offsets on historical data.
+
+Example:
+
+.. sourcecode:: python
+
+    reader = BinaryLogReader('measurements.svm40log')
+    offsets = np.array([0., 1., 2., 3.])[:, np.newaxis]
+    humidity, temperature = compensate(reader.records['raw_humidity'],
+                                       reader.records['raw_temperature'],
+                                       offsets)  # shape (4, len(reader))
+
+.. note:: This module requires NumPy (``pip install numpy``).
+"""  # noqa: E501
+
+from __future__ import absolute_import, division, print_function
+import numpy as np
+
+import logging
+log = logging.getLogger(__name__)
+
+
+#: Magnus coefficient beta (over water).
+MAGNUS_BETA = 17.62
+
+#: Magnus coefficient lambda in °C (over water).
+MAGNUS_LAMBDA = 243.12
+
+
+def temperature_offset_ticks(t_offset):
+    """
+    Quantize temperature offsets like the device does.
+
+    :param t_offset: Temperature offset(s) in degrees celsius.
+    :return: Temperature offset(s) in ticks (scaling of 200).
+    :rtype: numpy.ndarray
+    """
+    return np.round(np.asarray(t_offset, dtype=np.float64) * 200.).astype(
+        np.int32)
+
+
+def compensate_ticks(raw_humidity, raw_temperature, t_offset):
+    """
+    Compensate raw humidity and temperature ticks with a temperature offset.
+
+    All arguments are broadcast against each other, so e.g. an offset array
+    of shape (n, 1) evaluates n offsets for a series of samples at once.
+
+    :param raw_humidity: Raw humidity ticks (scaling of 100).
+    :param raw_temperature: Raw temperature ticks (scaling of 200).
+    :param t_offset: Temperature offset(s) in degrees celsius.
+    :return: Compensated humidity (scaling of 100, clamped to 0..100 %RH)
+             and temperature ticks (scaling of 200), like reported by
+             :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.read_measured_values_raw`.
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+    """  # noqa: E501
+    raw_temperature = np.asarray(raw_temperature, dtype=np.int32)
+    temperature = raw_temperature - temperature_offset_ticks(t_offset)
+    humidity = _compensate_humidity(raw_humidity, raw_temperature / 200.,
+                                    temperature / 200.)
+    humidity = np.round(humidity * 100.).astype(np.int16)
+    return humidity, temperature.astype(np.int16)
+
+
+def compensate(raw_humidity, raw_temperature, t_offset):
+    """
+    Compensate raw humidity and temperature ticks with a temperature offset,
+    and convert them like :py:class:`~sensirion_i2c_svm40.response_types.Humidity`
+    and :py:class:`~sensirion_i2c_svm40.response_types.Temperature`.
+
+    All arguments are broadcast against each other, so e.g. an offset array
+    of shape (n, 1) evaluates n offsets for a series of samples at once.
+
+    :param raw_humidity: Raw humidity ticks (scaling of 100).
+    :param raw_temperature: Raw temperature ticks (scaling of 200).
+    :param t_offset: Temperature offset(s) in degrees celsius.
+    :return: Compensated humidity in %RH (clamped to 0..100 %RH) and
+             temperature in degrees celsius.
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+    """  # noqa: E501
+    raw_temperature = np.asarray(raw_temperature, dtype=np.int32)
+    temperature = (raw_temperature - temperature_offset_ticks(t_offset)) / 200.
+    humidity = _compensate_humidity(raw_humidity, raw_temperature / 200.,
+                                    temperature)
+    return humidity, temperature
+
+
+def _compensate_humidity(raw_humidity, raw_temperature, temperature):
+    """
+    Convert the relative humidity from the raw to the compensated
+    temperature (in degrees celsius) at constant absolute humidity.
+
+    :return: Compensated humidity in %RH, clamped to 0..100 %RH.
+    :rtype: numpy.ndarray
+    """
+    # ratio of the saturation vapor pressures, with a single exp() call
+    exponent = MAGNUS_BETA * (
+        raw_temperature / (MAGNUS_LAMBDA + raw_temperature) -
+        temperature / (MAGNUS_LAMBDA + temperature))
+    humidity = np.asarray(raw_humidity, dtype=np.float64) / 100. * \
+        np.exp(exponent)
+    return np.clip(humidity, 0., 100.)
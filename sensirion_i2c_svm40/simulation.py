@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_driver.transceiver_v1 import I2cTransceiverV1
+from .commands.crc import SVM40_CRC
+from struct import pack, unpack
+from ._clock import clock as _clock
+import math
+import random
+import time
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class Svm40SimulatorNackError(IOError):
+    """
+    Error reported by :py:class:`Svm40SimulatedTransceiver` as transceiver
+    error of a not acknowledged transfer.
+    """
+    def __init__(self, reason):
+        super(Svm40SimulatorNackError, self).__init__(
+            "Simulated SVM40 NACK: {}".format(reason))
+
+
+class Svm40SimulatedTransceiver(I2cTransceiverV1):
+    """
+    Software stand-in for an I²C bus with one SVM40 connected.
+
+    It implements the complete I²C command set of the SVM40 including CRCs,
+    idle and measurement mode, measurement values updated once per second
+    and the processing times of the commands. Every rejected transfer is
+    reported as NACK, like the real device does:
+
+    - Wrong slave address or wrong CRC in the received data
+    - Commands which are not available in the current mode
+    - Commands received while the device is still busy processing the
+      previous command (reset, storing data to non-volatile memory, stopping
+      the measurement)
+    - Read without a preceding command which provides data
+
+    The measured values are synthetic: Slowly varying temperature, humidity
+    and raw VOC ticks with some noise, which are reproducible for a given
+    ``seed``.
+
+    Example:
+
+    .. sourcecode:: python
+
+        from sensirion_i2c_driver import I2cConnection
+        from sensirion_i2c_svm40 import Svm40I2cDevice
+        from sensirion_i2c_svm40.simulation import Svm40SimulatedTransceiver
+
+        device = Svm40I2cDevice(I2cConnection(Svm40SimulatedTransceiver()))
+        device.start_measurement()
+    """
+
+    #: Actual time in seconds until the device is ready after a reset.
+    RESET_TIME = 0.05
+
+    #: Actual time in seconds to store data to the non-volatile memory.
+    STORE_NV_DATA_TIME = 0.2
+
+    #: Actual time in seconds to stop the measurement.
+    STOP_MEASUREMENT_TIME = 0.02
+
+    #: Measurement values update interval in seconds.
+    UPDATE_INTERVAL = 1.0
+
+    def __init__(self, slave_address=0x6A, serial_number=None, seed=0,
+                 realtime=True, bus_frequency=None, speed=1.0):
+        """
+        Creates a simulated SVM40 in idle mode.
+
+        :param byte slave_address:
+            The I²C slave address of the simulated device.
+        :param str serial_number:
+            Serial number of the simulated device. Defaults to a value
+            derived from ``seed``.
+        :param int seed:
+            Seed for the synthetic measurement values.
+        :param bool realtime:
+            If True, the transceiver sleeps for the read delay of the
+            commands (and the bus transfer time, if ``bus_frequency`` is
+            given) like a real transceiver. Set to False to run as fast as
+            possible, e.g. for benchmarks of the host software.
+        :param float bus_frequency:
+            I²C clock frequency in Hz to simulate the bus transfer time. None
+            means the transfer takes no time.
+        :param float speed:
+            Speed factor of the simulated time: With 10.0, the values are
+            updated 10 times per second and all processing times (including
+            the read delays slept in realtime mode) are 10 times shorter.
+            The bus transfer time is not scaled.
+        """
+        super(Svm40SimulatedTransceiver, self).__init__()
+        self._slave_address = slave_address
+        self._serial_number = serial_number or \
+            "{:016X}".format(random.Random(seed).getrandbits(64))
+        self._seed = seed
+        self._realtime = realtime
+        self._bus_frequency = bus_frequency
+        self._speed = float(speed)
+        self._nv_t_offset = 0
+        self._nv_tuning_parameters = (100, 12, 180, 50)
+        self._transceive_count = 0
+        self._commands = {
+            0x0010: self._start_measurement,
+            0x0104: self._stop_measurement,
+            0x03A6: self._read_measured_values,
+            0x03B0: self._read_measured_values_raw,
+            0x6014: self._temperature_offset,
+            0x6083: self._voc_tuning_parameters,
+            0x6181: self._voc_algorithm_state,
+            0x6002: self._store_nv_data,
+            0xD100: self._get_version,
+            0xD033: self._get_serial_number,
+            0xD304: self._device_reset,
+        }
+        self._reset(self._now())
+        self._busy_until = 0.0
+
+    @property
+    def description(self):
+        return "Simulated SVM40 (address 0x{:02X})".format(self._slave_address)
+
+    @property
+    def channel_count(self):
+        return None  # single channel transceiver
+
+    @property
+    def transceive_count(self):
+        """
+        Number of transceive operations executed so far.
+
+        :type: int
+        """
+        return self._transceive_count
+
+    @property
+    def is_measuring(self):
+        """
+        Whether the simulated device is in measurement mode.
+
+        :type: bool
+        """
+        return self._measurement_start is not None
+
+    def transceive(self, slave_address, tx_data, rx_length, read_delay,
+                   timeout):
+        """
+        Transceive an I²C frame with the simulated device, see
+        :py:meth:`~sensirion_i2c_driver.transceiver_v1.I2cTransceiverV1.transceive`.
+        """  # noqa: E501
+        self._transceive_count += 1
+        if self._realtime and self._bus_frequency:
+            frame_bytes = len(tx_data or b"") + (rx_length or 0) + 2
+            time.sleep(frame_bytes * 9. / self._bus_frequency)
+        try:
+            if slave_address != self._slave_address:
+                raise Svm40SimulatorNackError("no device at this address")
+            if tx_data is not None:
+                self._write(bytearray(tx_data))
+            if rx_length is not None:
+                if self._realtime and read_delay > 0.0:
+                    time.sleep(read_delay / self._speed)
+                return self.STATUS_OK, None, self._read(rx_length)
+            return self.STATUS_OK, None, b""
+        except Svm40SimulatorNackError as e:
+            return self.STATUS_NACK, e, b""
+
+    def _now(self):
+        return _clock() * self._speed
+
+    def _write(self, data):
+        now = self._now()
+        if now < self._busy_until:
+            raise Svm40SimulatorNackError("device busy")
+        self._response = None
+        if len(data) == 0:
+            return  # only write header, e.g. to probe the device
+        if len(data) < 2 or (len(data) - 2) % 3 != 0:
+            raise Svm40SimulatorNackError("invalid frame length")
+        command = unpack(">H", bytes(data[0:2]))[0]
+        if command not in self._commands:
+            raise Svm40SimulatorNackError("unknown command")
+        payload = bytearray()
+        for i in range(2, len(data), 3):
+            if SVM40_CRC(data[i:i + 2]) != data[i + 2]:
+                raise Svm40SimulatorNackError("wrong CRC")
+            payload += data[i:i + 2]
+        self._response = self._commands[command](now, bytes(payload))
+
+    def _read(self, rx_length):
+        if self._response is None:
+            raise Svm40SimulatorNackError("no data available")
+        data = bytearray(self._response)
+        data += bytearray(2 * ((len(data) + 1) // 2) - len(data))
+        frame = bytearray()
+        for i in range(0, len(data), 2):
+            frame += data[i:i + 2] + bytearray([SVM40_CRC(data[i:i + 2])])
+        return bytes(frame[:rx_length])
+
+    def _reset(self, now):
+        self._measurement_start = None
+        self._t_offset = self._nv_t_offset
+        self._tuning_parameters = self._nv_tuning_parameters
+        self._voc_state = bytes(bytearray(8))
+        self._values_cache = (None, None)
+        self._response = None
+
+    def _require_mode(self, measuring):
+        if self.is_measuring != measuring:
+            raise Svm40SimulatorNackError("command not available in {} mode"
+                                          .format("measurement" if
+                                                  self.is_measuring else
+                                                  "idle"))
+
+    def _start_measurement(self, now, payload):
+        self._require_mode(measuring=False)
+        self._measurement_start = now
+
+    def _stop_measurement(self, now, payload):
+        self._require_mode(measuring=True)
+        self._measurement_start = None
+        self._busy_until = now + self.STOP_MEASUREMENT_TIME
+
+    def _store_nv_data(self, now, payload):
+        self._nv_t_offset = self._t_offset
+        self._nv_tuning_parameters = self._tuning_parameters
+        self._busy_until = now + self.STORE_NV_DATA_TIME
+
+    def _device_reset(self, now, payload):
+        self._reset(now)
+        self._busy_until = now + self.RESET_TIME
+
+    def _get_version(self, now, payload):
+        # firmware 2.2, hardware 1.0, protocol 1.0
+        return bytes(bytearray([2, 2, 0, 1, 0, 1, 0, 0]))
+
+    def _get_serial_number(self, now, payload):
+        return self._serial_number.encode('ascii')[:25].ljust(26, b"\0")
+
+    @staticmethod
+    def _require_length(payload, length):
+        if len(payload) != length:
+            raise Svm40SimulatorNackError(
+                "invalid payload length {}, expected {}".format(
+                    len(payload), length))
+
+    def _temperature_offset(self, now, payload):
+        if payload:
+            self._require_length(payload, 2)
+            self._t_offset = unpack(">h", payload)[0]
+        else:
+            return pack(">h", self._t_offset)
+
+    def _voc_tuning_parameters(self, now, payload):
+        if payload:
+            self._require_length(payload, 8)
+            self._require_mode(measuring=False)
+            self._tuning_parameters = unpack(">4h", payload)
+        else:
+            return pack(">4h", *self._tuning_parameters)
+
+    def _voc_algorithm_state(self, now, payload):
+        if payload:
+            self._require_length(payload, 8)
+            self._require_mode(measuring=False)
+            self._voc_state = payload
+        else:
+            self._require_mode(measuring=True)
+            index = self._update_index(now)
+            if index > 0:
+                # synthetic, but changing state (mean and std in Q16.16)
+                mean, std = self._values(index)[3] - 20000, 50
+                self._voc_state = pack(">ii", int(mean * 65536),
+                                       int(std * 65536))
+            return self._voc_state
+
+    def _read_measured_values(self, now, payload):
+        self._require_mode(measuring=True)
+        return pack(">3h", *self._values(self._update_index(now))[0:3])
+
+    def _read_measured_values_raw(self, now, payload):
+        self._require_mode(measuring=True)
+        return pack(">3hH2h", *self._values(self._update_index(now)))
+
+    def _update_index(self, now):
+        return int((now - self._measurement_start) // self.UPDATE_INTERVAL)
+
+    def _values(self, index):
+        """
+        Get the measured values (as ticks) of a given update.
+        """
+        if index < 1:
+            return 0, 0, 0, 0, 0, 0  # no measurement available yet
+        if self._values_cache[0] == index:
+            return self._values_cache[1]
+        rnd = random.Random(self._seed * 1000003 + index)
+        phase = 2. * math.pi * index / 3600.
+        raw_temperature = 25. + 2. * math.sin(phase) + rnd.gauss(0., 0.02)
+        raw_humidity = 40. + 5. * math.cos(phase) + rnd.gauss(0., 0.1)
+        raw_voc_ticks = 30000 + 800. * math.sin(3. * phase) + \
+            rnd.gauss(0., 5.)
+        temperature = raw_temperature - self._t_offset / 200.
+        humidity = min(100., raw_humidity * _magnus_ratio(raw_temperature,
+                                                          temperature))
+        voc_index = min(500., max(1., 100. + (30000. - raw_voc_ticks) / 4.))
+        values = (
+            int(round(voc_index * 10.)),
+            int(round(humidity * 100.)),
+            int(round(temperature * 200.)),
+            int(round(raw_voc_ticks)),
+            int(round(raw_humidity * 100.)),
+            int(round(raw_temperature * 200.)),
+        )
+        self._values_cache = (index, values)
+        return values
+
+
+def _magnus_ratio(raw_temperature, temperature):
+    """
+    Factor to convert the relative humidity from one temperature to another
+    at constant absolute humidity (Magnus formula).
+    """
+    def saturation(t):
+        return math.exp(17.62 * t / (243.12 + t))
+    return saturation(raw_temperature) / saturation(temperature)
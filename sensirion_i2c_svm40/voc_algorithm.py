@@ -0,0 +1,596 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+"""
+Host-side implementation of the Sensirion VOC index algorithm.
+
+This is a floating point port of the VOC algorithm running on the SVM40
+(Sensirion VOC algorithm version 1), to compute the VOC index from stored
+raw VOC ticks (see
+:py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.read_measured_values_raw`)
+with any tuning parameters, e.g. to evaluate different parameters for
+:py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.set_voc_tuning_parameters`
+without re-running the sensors.
+
+The algorithm is a recursive filter, so the samples of a series have to be
+processed one after another. Small batches (less than 16 series) are
+processed series by series with scalar arithmetic, which takes about 7 to 14
+seconds per series for a month of 1 Hz data (2.6 million samples, measured on
+a desktop CPU). Larger batches of independent series (e.g. many sensors, or
+the same sensor with many tuning parameter combinations) are processed with
+NumPy operations on all series at once instead. Their cost per sample has a
+high constant part, so a month of 1 Hz data takes about 2 to 4 minutes for a
+batch of 16 to a few hundred series, and about 4 to 8 minutes for a thousand
+series.
+
+.. note:: The firmware uses fixed point arithmetic, so the VOC index computed
+          by this module can slightly differ from the one reported by the
+          device. Like on the device, the VOC index is rounded to integers.
+
+.. note:: This module requires NumPy (``pip install numpy``).
+"""  # noqa: E501
+
+from __future__ import absolute_import, division, print_function
+import math
+import numpy as np
+
+import logging
+log = logging.getLogger(__name__)
+
+
+SAMPLING_INTERVAL = 1.0
+INITIAL_BLACKOUT = 45.0
+VOC_INDEX_GAIN = 230.0
+SRAW_STD_INITIAL = 50.0
+SRAW_STD_BONUS = 220.0
+TAU_MEAN_VARIANCE_HOURS = 12.0
+TAU_INITIAL_MEAN = 20.0
+INIT_DURATION_MEAN = 3600.0 * 0.75
+INIT_TRANSITION_MEAN = 0.01
+TAU_INITIAL_VARIANCE = 2500.0
+INIT_DURATION_VARIANCE = 3600.0 * 1.45
+INIT_TRANSITION_VARIANCE = 0.01
+GATING_THRESHOLD = 340.0
+GATING_THRESHOLD_INITIAL = 510.0
+GATING_THRESHOLD_TRANSITION = 0.09
+GATING_MAX_DURATION_MINUTES = 60.0 * 3.0
+GATING_MAX_RATIO = 0.3
+SIGMOID_L = 500.0
+SIGMOID_K = -0.0065
+SIGMOID_X0 = 213.0
+VOC_INDEX_OFFSET_DEFAULT = 100.0
+LP_TAU_FAST = 20.0
+LP_TAU_SLOW = 500.0
+LP_ALPHA = -0.2
+PERSISTENCE_UPTIME_GAMMA = 3.0 * 3600.0
+MEAN_VARIANCE_ESTIMATOR_GAMMA_SCALING = 64.0
+MEAN_VARIANCE_ESTIMATOR_FIX16_MAX = 32767.0
+
+# Offset of the raw VOC ticks processed by the algorithm.
+_SRAW_OFFSET = 20000.0
+
+# Smallest batch processed with NumPy operations by VocAlgorithm.run(),
+# smaller batches are processed instance by instance with scalar arithmetic.
+_SCALAR_BATCH_LIMIT = 16
+
+
+def _sigmoid(sample, k, x0):
+    """
+    Logistic function 1 / (1 + exp(k * (sample - x0))). The exponent is
+    saturated at +/-50 like in the fixed point implementation.
+    """
+    x = np.clip(k * (sample - x0), -50., 50.)
+    return 1. / (1. + np.exp(x))
+
+
+_uptime_tables = None
+
+
+def _get_uptime_tables():
+    """
+    Get the uptime dependent values of the mean and variance estimator for
+    every possible uptime (the uptimes are integer multiples of the sampling
+    interval, saturated at the maximum fixed point value), to replace four
+    sigmoid evaluations per sample by table lookups.
+
+    :return: Sigmoids of the mean and variance adaption rates, and gating
+             thresholds of the mean and variance, indexed by the uptime in
+             sampling intervals.
+    :rtype: tuple(numpy.ndarray)
+    """
+    global _uptime_tables
+    if _uptime_tables is None:
+        uptime = np.arange(int(MEAN_VARIANCE_ESTIMATOR_FIX16_MAX) + 1) * \
+            SAMPLING_INTERVAL
+        sigmoid_mean = _sigmoid(uptime, INIT_TRANSITION_MEAN,
+                                INIT_DURATION_MEAN)
+        sigmoid_variance = _sigmoid(uptime, INIT_TRANSITION_VARIANCE,
+                                    INIT_DURATION_VARIANCE)
+        threshold_range = GATING_THRESHOLD_INITIAL - GATING_THRESHOLD
+        _uptime_tables = (
+            sigmoid_mean,
+            sigmoid_variance,
+            GATING_THRESHOLD + threshold_range * sigmoid_mean,
+            GATING_THRESHOLD + threshold_range * sigmoid_variance,
+        )
+    return _uptime_tables
+
+
+def decode_voc_state(state):
+    """
+    Convert a VOC algorithm state as returned by
+    :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.get_voc_state` into
+    the state used by :py:class:`VocAlgorithm`.
+
+    The state consists of the mean and the standard deviation of the
+    (offset) raw VOC signal as big endian Q16.16 fixed point numbers.
+
+    :param list(int) state: The 8 state bytes.
+    :return: Mean and standard deviation.
+    :rtype: tuple(float, float)
+    """
+    data = bytearray(state)
+    if len(data) != 8:
+        raise ValueError("The VOC state must consist of 8 bytes.")
+    mean, std = np.frombuffer(bytes(data), dtype='>i4') / 65536.
+    return float(mean), float(std)
+
+
+def encode_voc_state(mean, std):
+    """
+    Convert a state of :py:class:`VocAlgorithm` into the format used by
+    :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.set_voc_state`.
+
+    :param float mean: Mean of the (offset) raw VOC signal.
+    :param float std: Standard deviation of the raw VOC signal.
+    :return: The 8 state bytes.
+    :rtype: list(int)
+    """
+    values = np.round(np.array([mean, std]) * 65536.).astype('>i4')
+    return list(bytearray(values.tobytes()))
+
+
+class VocAlgorithm(object):
+    """
+    Batch of independent VOC algorithm instances.
+
+    Every instance has its own tuning parameters and state. All instances
+    are fed with one sample per call of :py:meth:`process`, which is
+    supposed to be called once per second (the sampling interval of the
+    SVM40).
+
+    Example:
+
+    .. sourcecode:: python
+
+        # Same raw data, evaluated with three different learning times
+        algorithm = VocAlgorithm(count=3, learning_time_hours=[6, 12, 24])
+        voc_index = algorithm.run(raw_voc_ticks)  # shape (samples, 3)
+    """
+
+    def __init__(self, count=1, voc_index_offset=100,
+                 learning_time_hours=12, gating_max_duration_minutes=180,
+                 std_initial=50):
+        """
+        Creates a batch of algorithm instances in initial state.
+
+        All tuning parameters (see
+        :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.set_voc_tuning_parameters`)
+        are either a scalar applied to all instances, or an array with one
+        value per instance.
+
+        :param int count: Number of instances.
+        :param voc_index_offset: VOC index representing typical conditions.
+        :param learning_time_hours:
+            Time constant of the long-term estimator in hours.
+        :param gating_max_duration_minutes:
+            Maximum duration of gating in minutes.
+        :param std_initial: Initial estimate for the standard deviation.
+        """  # noqa: E501
+        super(VocAlgorithm, self).__init__()
+        shape = (int(count),)
+
+        def parameter(value):
+            return np.broadcast_to(np.asarray(value, dtype=np.float64),
+                                   shape).copy()
+
+        self._count = shape[0]
+        self._voc_index_offset = parameter(voc_index_offset)
+        self._tau_mean_variance_hours = parameter(learning_time_hours)
+        self._gating_max_duration_minutes = parameter(
+            gating_max_duration_minutes)
+        self._sraw_std_initial = parameter(std_initial)
+
+        # constants derived from the tuning parameters
+        scaling = MEAN_VARIANCE_ESTIMATOR_GAMMA_SCALING
+        interval_hours = SAMPLING_INTERVAL / 3600.
+        self._gamma = (scaling * interval_hours) / \
+            (self._tau_mean_variance_hours + interval_hours)
+        self._gamma_mean_range = (scaling * SAMPLING_INTERVAL) / \
+            (TAU_INITIAL_MEAN + SAMPLING_INTERVAL) - self._gamma
+        self._gamma_variance_range = (scaling * SAMPLING_INTERVAL) / \
+            (TAU_INITIAL_VARIANCE + SAMPLING_INTERVAL) - self._gamma
+        self._sigmoid_shift = (SIGMOID_L - 5. * self._voc_index_offset) / 4.
+        self._sigmoid_high = SIGMOID_L + self._sigmoid_shift
+        self._sigmoid_low = SIGMOID_L * self._voc_index_offset / \
+            VOC_INDEX_OFFSET_DEFAULT
+        self._lp_a1 = SAMPLING_INTERVAL / (LP_TAU_FAST + SAMPLING_INTERVAL)
+        self._lp_a2 = SAMPLING_INTERVAL / (LP_TAU_SLOW + SAMPLING_INTERVAL)
+
+        # state (uptimes in sampling intervals)
+        self._uptime = 0.0
+        self._sraw = np.zeros(shape)
+        self._voc_index = np.zeros(shape)
+        self._ready = False  # all estimators initialized and updating
+        self._mve_initialized = np.zeros(shape, dtype=bool)
+        self._mve_mean = np.zeros(shape)
+        self._mve_std = self._sraw_std_initial.copy()
+        self._mve_uptime_gamma = np.zeros(shape, dtype=np.intp)
+        self._mve_uptime_gating = np.zeros(shape, dtype=np.intp)
+        self._mve_gating_duration_minutes = np.zeros(shape)
+        self._mox_mean = self._mve_mean
+        self._mox_gain = -VOC_INDEX_GAIN / (self._mve_std + SRAW_STD_BONUS)
+        self._lp_initialized = False
+        self._lp_x1 = None
+        self._lp_x2 = None
+        self._lp_x3 = None
+
+    @property
+    def count(self):
+        """
+        Number of instances.
+
+        :type: int
+        """
+        return self._count
+
+    def get_states(self):
+        """
+        Get the learned state of all instances, e.g. to continue processing
+        later, or to encode it with :py:func:`encode_voc_state`.
+
+        :return: Array of shape (count, 2) containing mean and standard
+                 deviation of every instance.
+        :rtype: numpy.ndarray
+        """
+        return np.stack([self._mve_mean, self._mve_std], axis=1)
+
+    def set_states(self, states):
+        """
+        Set the learned state of all instances to skip the initial learning
+        phase, like
+        :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.set_voc_state`.
+
+        :param states:
+            Array of shape (count, 2) (or (2,) for all instances) containing
+            mean and standard deviation, e.g. from :py:meth:`get_states` or
+            :py:func:`decode_voc_state`.
+        """
+        states = np.broadcast_to(np.asarray(states, dtype=np.float64),
+                                 (self._count, 2))
+        self._mve_mean = states[:, 0].copy()
+        self._mve_std = states[:, 1].copy()
+        self._mve_uptime_gamma = np.full(
+            self._count, int(PERSISTENCE_UPTIME_GAMMA / SAMPLING_INTERVAL),
+            dtype=np.intp)
+        self._mve_initialized = np.ones(self._count, dtype=bool)
+        self._sraw = self._mve_mean.copy()
+        self._ready = False
+
+    def process(self, sraw):
+        """
+        Process one sample of every instance.
+
+        :param sraw:
+            Raw VOC ticks, a scalar or an array with one value per instance.
+            Values of 0 or above 65000 are treated as invalid and ignored.
+        :return: The VOC index of every instance, rounded to an integer like
+                 by the device. Zero during the initial blackout of 45
+                 samples.
+        :rtype: numpy.ndarray
+        """
+        sraw = np.broadcast_to(np.asarray(sraw, dtype=np.float64),
+                               (self._count,))
+        valid = (sraw > 0.) & (sraw < 65000.)
+        return np.floor(self._process(
+            np.clip(sraw, 20001., 52767.) - _SRAW_OFFSET,
+            None if valid.all() else valid) + 0.5)
+
+    def run(self, sraw):
+        """
+        Process a series of samples.
+
+        :param sraw:
+            Raw VOC ticks, an array of shape (samples,) fed to all instances,
+            or of shape (samples, count) with one column per instance.
+            Values of 0 or above 65000 are treated as invalid and ignored.
+        :return: The VOC index of shape (samples, count), rounded to integers
+                 like by the device.
+        :rtype: numpy.ndarray
+        """
+        sraw = np.asarray(sraw, dtype=np.float64)
+        if sraw.ndim == 1:
+            sraw = sraw[:, np.newaxis]
+        sraw = np.broadcast_to(sraw, (len(sraw), self._count))
+        valid = (sraw > 0.) & (sraw < 65000.)
+        sraw = np.clip(sraw, 20001., 52767.) - _SRAW_OFFSET
+        if self._count < _SCALAR_BATCH_LIMIT:
+            # NumPy operations on a few values are slower than plain Python,
+            # so process the instances one after another. They all share
+            # the uptime.
+            uptime = self._uptime
+            lp_initialized = self._lp_initialized
+            result = np.empty((len(sraw), self._count))
+            for index in range(self._count):
+                self._uptime = uptime
+                self._lp_initialized = lp_initialized
+                result[:, index] = self._run_single(
+                    index, sraw[:, index], valid[:, index])
+            return np.floor(result + 0.5)
+        all_valid = valid.all(axis=1)
+        result = np.empty((len(sraw), self._count))
+        for i in range(len(sraw)):
+            result[i] = self._process(sraw[i],
+                                      None if all_valid[i] else valid[i])
+        return np.floor(result + 0.5)
+
+    def _run_single(self, index, sraw, valid):
+        """
+        Same as :py:meth:`_process` for a series of samples of a single
+        instance, with scalar arithmetic.
+
+        :param int index: Index of the instance.
+        :param numpy.ndarray sraw: Clipped and offset raw VOC ticks.
+        :param numpy.ndarray valid: Which samples are valid.
+        :return: The VOC index (not rounded).
+        :rtype: numpy.ndarray
+        """
+        exp = math.exp
+        sqrt = math.sqrt
+        sigmoid_mean_table, sigmoid_variance_table, threshold_mean_table, \
+            threshold_variance_table = (
+                table.tolist() for table in _get_uptime_tables())
+        uptime_limit = len(sigmoid_mean_table) - 2
+        scaling = MEAN_VARIANCE_ESTIMATOR_GAMMA_SCALING
+        gating_minutes = SAMPLING_INTERVAL / 60.
+        lp_tau_range = LP_TAU_SLOW - LP_TAU_FAST
+        lp_a1 = self._lp_a1
+        lp_a2 = self._lp_a2
+        gamma = float(self._gamma[index])
+        gamma_mean_range = float(self._gamma_mean_range[index])
+        gamma_variance_range = float(self._gamma_variance_range[index])
+        sigmoid_shift = float(self._sigmoid_shift[index])
+        sigmoid_high = float(self._sigmoid_high[index])
+        sigmoid_low = float(self._sigmoid_low[index])
+        gating_max_duration = float(self._gating_max_duration_minutes[index])
+
+        uptime = self._uptime
+        current = float(self._sraw[index])
+        voc_index = float(self._voc_index[index])
+        initialized = bool(self._mve_initialized[index])
+        mean = float(self._mve_mean[index])
+        std = float(self._mve_std[index])
+        uptime_gamma = int(self._mve_uptime_gamma[index])
+        uptime_gating = int(self._mve_uptime_gating[index])
+        duration = float(self._mve_gating_duration_minutes[index])
+        mox_mean = float(self._mox_mean[index])
+        mox_gain = float(self._mox_gain[index])
+        lp_initialized = self._lp_initialized
+        if lp_initialized:
+            x1 = float(self._lp_x1[index])
+            x2 = float(self._lp_x2[index])
+            x3 = float(self._lp_x3[index])
+
+        result = []
+        append = result.append
+        for sample, is_valid in zip(sraw.tolist(), valid.tolist()):
+            if uptime <= INITIAL_BLACKOUT:
+                uptime += SAMPLING_INTERVAL
+                append(voc_index)
+                continue
+            if is_valid:
+                current = sample
+
+            # MOX model and scaled sigmoid
+            value = (current - mox_mean) * mox_gain
+            x = min(max(SIGMOID_K * (value - SIGMOID_X0), -50.), 50.)
+            sigmoid = 1. / (1. + exp(x))
+            if value >= 0.:
+                value = sigmoid_high * sigmoid - sigmoid_shift
+            else:
+                value = sigmoid_low * sigmoid
+
+            # adaptive lowpass
+            if not lp_initialized:
+                x1 = x2 = x3 = value
+                lp_initialized = True
+            x1 += lp_a1 * (value - x1)
+            x2 += lp_a2 * (value - x2)
+            tau_a = lp_tau_range * exp(LP_ALPHA * abs(x1 - x2)) + LP_TAU_FAST
+            x3 += (value - x3) * (SAMPLING_INTERVAL /
+                                  (SAMPLING_INTERVAL + tau_a))
+            voc_index = max(x3, 0.5)
+            append(voc_index)
+
+            # mean and variance estimator
+            if not current > 0.:
+                pass
+            elif not initialized:
+                initialized = True
+                mean = current
+            else:
+                uptime_gamma = min(uptime_gamma + 1, uptime_limit)
+                uptime_gating = min(uptime_gating + 1, uptime_limit)
+                sigmoid_gamma_mean = sigmoid_mean_table[uptime_gamma]
+                x = GATING_THRESHOLD_TRANSITION * \
+                    (voc_index - threshold_mean_table[uptime_gating])
+                sigmoid_gating_mean = 1. / (1. + exp(min(max(x, -50.), 50.)))
+                gamma_mean = sigmoid_gating_mean * (
+                    gamma + gamma_mean_range * sigmoid_gamma_mean)
+                x = GATING_THRESHOLD_TRANSITION * \
+                    (voc_index - threshold_variance_table[uptime_gating])
+                sigmoid_gating_variance = \
+                    1. / (1. + exp(min(max(x, -50.), 50.)))
+                gamma_variance = sigmoid_gating_variance * (
+                    gamma + gamma_variance_range *
+                    (sigmoid_variance_table[uptime_gamma] -
+                     sigmoid_gamma_mean))
+                duration = max(duration + gating_minutes * (
+                    (1. - sigmoid_gating_mean) * (1. + GATING_MAX_RATIO) -
+                    GATING_MAX_RATIO), 0.)
+                if duration > gating_max_duration:
+                    uptime_gating = 0
+                delta = (current - mean) / scaling
+                std = sqrt((scaling - gamma_variance) * (
+                    std * std / scaling + gamma_variance * delta * delta))
+                mean += gamma_mean * delta
+            mox_mean = mean
+            mox_gain = -VOC_INDEX_GAIN / (std + SRAW_STD_BONUS)
+
+        self._uptime = uptime
+        self._lp_initialized = lp_initialized
+        self._update_instance(index, (
+            ('_sraw', current),
+            ('_voc_index', voc_index),
+            ('_mve_initialized', initialized),
+            ('_mve_mean', mean),
+            ('_mve_std', std),
+            ('_mve_uptime_gamma', uptime_gamma),
+            ('_mve_uptime_gating', uptime_gating),
+            ('_mve_gating_duration_minutes', duration),
+            ('_mox_mean', mean),
+            ('_mox_gain', mox_gain),
+        ) + ((
+            ('_lp_x1', x1),
+            ('_lp_x2', x2),
+            ('_lp_x3', x3),
+        ) if lp_initialized else ()))
+        self._ready = False  # checked again by the next _process() call
+        return np.array(result)
+
+    def _update_instance(self, index, values):
+        """
+        Set the state of a single instance.
+
+        :param int index: Index of the instance.
+        :param values: Pairs of attribute name and value.
+        """
+        for name, value in values:
+            # copy, since the state arrays may be views of other arrays
+            array = getattr(self, name)
+            array = np.zeros(self._count) if array is None else array.copy()
+            array[index] = value
+            setattr(self, name, array)
+
+    def _process(self, sraw, valid):
+        """
+        Process one sample of every instance.
+
+        :param numpy.ndarray sraw: Clipped and offset raw VOC ticks.
+        :param numpy.ndarray valid:
+            Which samples are valid, or None if all of them are.
+        :return: The VOC index of every instance (not to be modified).
+        :rtype: numpy.ndarray
+        """
+        if self._uptime <= INITIAL_BLACKOUT:
+            self._uptime += SAMPLING_INTERVAL
+            return self._voc_index
+        if valid is None:
+            self._sraw = sraw
+        else:
+            self._sraw = np.where(valid, sraw, self._sraw)
+
+        # MOX model and scaled sigmoid; an exponent beyond +/-50 saturates the
+        # result at SIGMOID_L or zero respectively
+        voc_index = (self._sraw - self._mox_mean) * self._mox_gain
+        sigmoid = 1. / (1. + np.exp(np.clip(
+            SIGMOID_K * (voc_index - SIGMOID_X0), -50., 50.)))
+        voc_index = np.where(
+            voc_index >= 0.,
+            self._sigmoid_high * sigmoid - self._sigmoid_shift,
+            self._sigmoid_low * sigmoid)
+
+        # adaptive lowpass
+        if not self._lp_initialized:
+            self._lp_x1 = voc_index.copy()
+            self._lp_x2 = voc_index.copy()
+            self._lp_x3 = voc_index.copy()
+            self._lp_initialized = True
+        self._lp_x1 += self._lp_a1 * (voc_index - self._lp_x1)
+        self._lp_x2 += self._lp_a2 * (voc_index - self._lp_x2)
+        tau_a = (LP_TAU_SLOW - LP_TAU_FAST) * \
+            np.exp(LP_ALPHA * np.abs(self._lp_x1 - self._lp_x2)) + LP_TAU_FAST
+        self._lp_x3 += (voc_index - self._lp_x3) * \
+            (SAMPLING_INTERVAL / (SAMPLING_INTERVAL + tau_a))
+        self._voc_index = np.maximum(self._lp_x3, 0.5)
+
+        # update the estimator and the MOX model with the new sample
+        if self._ready:
+            self._process_mean_variance_estimator(self._voc_index)
+        else:
+            self._process_mean_variance_estimator_masked(self._voc_index)
+        self._mox_mean = self._mve_mean
+        self._mox_gain = -VOC_INDEX_GAIN / (self._mve_std + SRAW_STD_BONUS)
+        return self._voc_index
+
+    def _process_mean_variance_estimator_masked(self, voc_index_from_prior):
+        """
+        Update the mean and variance estimator of the instances with a
+        positive sample, and initialize the ones not initialized yet.
+        """
+        update = self._sraw > 0.
+        initialize = update & ~self._mve_initialized
+        self._mve_initialized |= initialize
+        update &= ~initialize
+        self._ready = bool(update.all())
+        state = (self._mve_mean, self._mve_std, self._mve_uptime_gamma,
+                 self._mve_uptime_gating, self._mve_gating_duration_minutes)
+        self._process_mean_variance_estimator(voc_index_from_prior)
+        (self._mve_mean, self._mve_std, self._mve_uptime_gamma,
+         self._mve_uptime_gating, self._mve_gating_duration_minutes) = (
+            np.where(update, new, old) for new, old in zip(
+                (self._mve_mean, self._mve_std, self._mve_uptime_gamma,
+                 self._mve_uptime_gating, self._mve_gating_duration_minutes),
+                state))
+        self._mve_mean = np.where(initialize, self._sraw, self._mve_mean)
+
+    def _process_mean_variance_estimator(self, voc_index_from_prior):
+        """
+        Update the mean and variance estimator of all instances.
+        """
+        sigmoid_mean_table, sigmoid_variance_table, threshold_mean_table, \
+            threshold_variance_table = _get_uptime_tables()
+        uptime_limit = len(sigmoid_mean_table) - 2
+        uptime_gamma = np.minimum(self._mve_uptime_gamma + 1, uptime_limit)
+        uptime_gating = np.minimum(self._mve_uptime_gating + 1, uptime_limit)
+
+        # adaption rates, gated by the VOC index
+        sigmoid_gamma_mean = sigmoid_mean_table[uptime_gamma]
+        sigmoid_gating_mean = _sigmoid(
+            voc_index_from_prior, GATING_THRESHOLD_TRANSITION,
+            threshold_mean_table[uptime_gating])
+        gamma_mean = sigmoid_gating_mean * (
+            self._gamma + self._gamma_mean_range * sigmoid_gamma_mean)
+        sigmoid_gating_variance = _sigmoid(
+            voc_index_from_prior, GATING_THRESHOLD_TRANSITION,
+            threshold_variance_table[uptime_gating])
+        gamma_variance = sigmoid_gating_variance * (
+            self._gamma + self._gamma_variance_range *
+            (sigmoid_variance_table[uptime_gamma] - sigmoid_gamma_mean))
+
+        # limit the gating duration
+        duration = np.maximum(
+            self._mve_gating_duration_minutes + (SAMPLING_INTERVAL / 60.) *
+            ((1. - sigmoid_gating_mean) * (1. + GATING_MAX_RATIO) -
+             GATING_MAX_RATIO), 0.)
+        self._mve_gating_duration_minutes = duration
+        self._mve_uptime_gating = np.where(
+            duration > self._gating_max_duration_minutes, 0, uptime_gating)
+        self._mve_uptime_gamma = uptime_gamma
+
+        scaling = MEAN_VARIANCE_ESTIMATOR_GAMMA_SCALING
+        delta = (self._sraw - self._mve_mean) / scaling
+        self._mve_std = np.sqrt((scaling - gamma_variance) * (
+            self._mve_std * self._mve_std / scaling +
+            gamma_variance * delta * delta))
+        self._mve_mean = self._mve_mean + gamma_mean * delta
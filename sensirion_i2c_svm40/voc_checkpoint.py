@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from ._clock import clock as _clock
+import glob
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+import logging
+log = logging.getLogger(__name__)
+
+# Function to atomically replace a file (os.replace is not available on
+# Python 2, but os.rename does the same on POSIX systems).
+_replace = getattr(os, 'replace', os.rename)
+
+
+class VocStateCheckpointer(object):
+    """
+    Periodically saves the VOC algorithm state of a device to disk and
+    restores it after a restart, to skip the initial learning phase of the
+    VOC algorithm.
+
+    Every checkpoint is written to a new JSON file named after the serial
+    number of the device and the time of the checkpoint. The files are
+    written atomically (temporary file, fsync, rename), so a crash never
+    leaves a corrupt snapshot behind. Temporary files left behind by a crash
+    are removed on the next checkpoint. Only the newest ``keep`` snapshots
+    are kept.
+
+    Example:
+
+    .. sourcecode:: python
+
+        checkpointer = VocStateCheckpointer(device, '/var/lib/svm40')
+        checkpointer.restore()  # device must be in idle mode
+        device.start_measurement()
+        for values in device.iter_measurements():
+            print(values)
+            checkpointer.maybe_checkpoint()  # every minute
+
+    Alternatively, :py:meth:`start` takes the checkpoints in a background
+    thread (or use the checkpointer as context manager).
+
+    .. note:: The device does not synchronize concurrent access, so the
+              background thread must not be used while another thread
+              accesses the device (or another device on the same bus),
+              e.g. with :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.iter_measurements`.
+              In that case, call :py:meth:`maybe_checkpoint` from the thread
+              reading the device instead, or pass a ``lock`` and acquire it
+              around every access of the other threads as well.
+    """  # noqa: E501
+
+    #: Version of the snapshot file format.
+    FORMAT_VERSION = 1
+
+    def __init__(self, device, directory, interval=60.0, max_age=600.0,
+                 keep=3, lock=None):
+        """
+        Creates a checkpointer. Call :py:meth:`start` to start periodic
+        checkpoints.
+
+        :param ~sensirion_i2c_svm40.device.Svm40I2cDevice device:
+            The device to checkpoint.
+        :param str directory:
+            Directory where the snapshots are stored. Created if it does not
+            exist.
+        :param float interval:
+            Interval of the periodic checkpoints in seconds.
+        :param float max_age:
+            Maximum age of a snapshot in seconds to be restored. Older states
+            are ignored and the VOC algorithm learns from scratch. The default
+            of 10 minutes is the maximum interruption recommended for
+            restoring the VOC algorithm state.
+        :param int keep:
+            Number of snapshots to keep per device.
+        :param lock:
+            Optional lock (e.g. :py:class:`threading.Lock`) acquired while
+            accessing the device.
+        """
+        super(VocStateCheckpointer, self).__init__()
+        self._device = device
+        self._directory = directory
+        self._interval = float(interval)
+        self._max_age = float(max_age)
+        self._keep = max(int(keep), 1)
+        self._lock = lock
+        self._serial_number = None
+        self._last_checkpoint = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def is_running(self):
+        """
+        Check whether the background thread is running.
+
+        :type: bool
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Start periodic checkpoints in a background thread. The first
+        checkpoint is taken after one interval.
+        """
+        if self.is_running:
+            raise RuntimeError("The checkpointer is already running.")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name="VocStateCheckpointer")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stop the background thread and wait until it has finished.
+
+        :param float timeout:
+            Maximum time in seconds to wait, or None to wait without limit.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def maybe_checkpoint(self):
+        """
+        Take a checkpoint if the last one is at least one interval ago, to be
+        called regularly from the thread reading the device (e.g. after
+        every measurement). The first checkpoint is taken one interval after
+        the first call. Errors are logged, not raised.
+
+        :return: Path of the written snapshot file, or None if no checkpoint
+                 was taken.
+        :rtype: str
+        """
+        now = _clock()
+        if self._last_checkpoint is None:
+            self._last_checkpoint = now
+        if now - self._last_checkpoint < self._interval:
+            return None
+        self._last_checkpoint = now
+        try:
+            return self.checkpoint()
+        except Exception as e:
+            log.warning("Failed to checkpoint VOC state: {}".format(e))
+            return None
+
+    def checkpoint(self):
+        """
+        Read the VOC algorithm state from the device and save it as new
+        snapshot. The device must be in measurement mode.
+
+        :return: Path of the written snapshot file.
+        :rtype: str
+        """
+        with self._device_lock():
+            serial_number = self._get_serial_number()
+            state = self._device.get_voc_state()
+        self._remove_temporary_files(serial_number)
+        timestamp = time.time()
+        snapshot = {
+            'format': self.FORMAT_VERSION,
+            'serial_number': serial_number,
+            'timestamp': timestamp,
+            'state': list(state),
+        }
+        path = os.path.join(self._directory, "{}.{:013d}.json".format(
+            self._file_prefix(serial_number), int(timestamp * 1000)))
+        self._write_atomic(path, json.dumps(snapshot, sort_keys=True))
+        for old_path in self._snapshot_paths(serial_number)[self._keep:]:
+            try:
+                os.remove(old_path)
+            except OSError as e:
+                log.warning("Failed to remove old snapshot '{}': {}".format(
+                    old_path, e))
+        return path
+
+    def load(self):
+        """
+        Get the newest valid snapshot of the device, without accessing the
+        device except reading its serial number.
+
+        :return: The VOC algorithm state and its age in seconds, or None if
+                 there is no valid snapshot which is not older than
+                 ``max_age``.
+        :rtype: tuple
+        """
+        with self._device_lock():
+            serial_number = self._get_serial_number()
+        for path in self._snapshot_paths(serial_number):
+            snapshot = self._read_snapshot(path, serial_number)
+            if snapshot is None:
+                continue  # try older snapshots
+            age = time.time() - snapshot['timestamp']
+            if 0.0 <= age <= self._max_age:
+                return snapshot['state'], age
+            log.info("Newest VOC state snapshot of {} is too old ({:.0f}s)."
+                     .format(serial_number, age))
+            return None
+        return None
+
+    def restore(self):
+        """
+        Restore the newest valid snapshot to the device. Must be called while
+        the device is in idle mode, i.e. before starting the measurement.
+
+        :return: True if a state was restored, False if there was no valid
+                 snapshot (i.e. the VOC algorithm learns from scratch).
+        :rtype: bool
+        """
+        snapshot = self.load()
+        if snapshot is None:
+            return False
+        state, age = snapshot
+        with self._device_lock():
+            self._device.set_voc_state(state)
+        log.info("Restored VOC state snapshot of {} (age {:.0f}s).".format(
+            self._serial_number, age))
+        return True
+
+    def _device_lock(self):
+        return self._lock if self._lock is not None else _NoLock()
+
+    def _get_serial_number(self):
+        if self._serial_number is None:
+            self._serial_number = self._device.get_serial_number()
+        return self._serial_number
+
+    @staticmethod
+    def _file_prefix(serial_number):
+        return re.sub(r'[^0-9A-Za-z_-]', '_', serial_number)
+
+    def _remove_temporary_files(self, serial_number):
+        """
+        Remove temporary files of the device left behind by a crash during
+        writing a snapshot.
+        """
+        pattern = os.path.join(glob.escape(self._directory)
+                               if hasattr(glob, 'escape') else
+                               self._directory,
+                               self._file_prefix(serial_number) + ".*.tmp")
+        for path in glob.glob(pattern):
+            log.info("Removing orphaned temporary file '{}'.".format(path))
+            try:
+                os.remove(path)
+            except OSError as e:
+                log.warning("Failed to remove '{}': {}".format(path, e))
+
+    def _snapshot_paths(self, serial_number):
+        """
+        Get the paths of all snapshots of a device, newest first.
+        """
+        pattern = os.path.join(glob.escape(self._directory)
+                               if hasattr(glob, 'escape') else
+                               self._directory,
+                               self._file_prefix(serial_number) + ".*.json")
+        return sorted(glob.glob(pattern), reverse=True)
+
+    def _read_snapshot(self, path, serial_number):
+        """
+        Read and validate a snapshot file, returns None if it is invalid.
+        """
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+            state = snapshot['state']
+            if snapshot['format'] != self.FORMAT_VERSION or \
+                    snapshot['serial_number'] != serial_number or \
+                    len(state) != 8 or \
+                    not all(0 <= int(value) <= 255 for value in state):
+                raise ValueError("Invalid content")
+            snapshot['timestamp'] = float(snapshot['timestamp'])
+            return snapshot
+        except Exception as e:
+            log.warning("Ignoring invalid snapshot '{}': {}".format(path, e))
+            return None
+
+    def _write_atomic(self, path, content):
+        """
+        Write a file atomically, i.e. the file contains either the complete
+        new content or does not exist, even after a crash or power loss.
+        """
+        if not os.path.isdir(self._directory):
+            os.makedirs(self._directory)
+        prefix = os.path.basename(path).split('.')[0] + '.'
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, prefix=prefix,
+                                        suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            _replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        try:
+            # Make the rename itself durable (not supported on Windows).
+            dir_fd = os.open(self._directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+    def _run(self):
+        """
+        Background thread function.
+        """
+        while not self._stop_event.wait(self._interval):
+            try:
+                self.checkpoint()
+            except Exception as e:
+                log.warning("Failed to checkpoint VOC state: {}".format(e))
+
+
+class _NoLock(object):
+    """
+    Context manager doing nothing, used if no lock is configured.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+"""
+Parameter sweeps of the VOC algorithm over recorded raw VOC ticks.
+
+A sweep evaluates every combination of a grid of VOC tuning parameters (see
+:py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.set_voc_tuning_parameters`)
+on the raw VOC ticks recorded in binary logs
+(:py:mod:`~sensirion_i2c_svm40.binary_log`) or archives
+(:py:mod:`~sensirion_i2c_svm40.archive`), using
+:py:class:`~sensirion_i2c_svm40.voc_algorithm.VocAlgorithm`.
+
+The work is split into shards of one device each. The shards of the same
+file are processed together, so every file is read only once, and the files
+are processed in parallel by a pool of worker processes. Every worker
+processes all combinations of a shard at once, and reads the records chunk
+by chunk from the disk, so the memory usage does not depend on the recorded
+duration.
+
+The cost of a shard is its number of samples times the cost per sample of
+:py:class:`~sensirion_i2c_svm40.voc_algorithm.VocAlgorithm` for a batch of
+the size of the grid, e.g. about 10 seconds per combination and month of
+1 Hz data for a grid of less than 16 combinations, or a few minutes per month
+for a grid of 16 up to a thousand combinations (see
+:py:mod:`~sensirion_i2c_svm40.voc_algorithm`). Since the files are
+distributed to the workers, a file containing many devices is processed by
+a single worker.
+
+Example:
+
+.. sourcecode:: python
+
+    grid = parameter_grid(learning_time_hours=[6, 12, 24],
+                          gating_max_duration_minutes=[60, 180, 300])
+    results = sweep(['sensor1.svm40log', 'sensor2.svm40arc'], grid)
+    for row in results:
+        print(row['learning_time_hours'], row['mean'], row['above'])
+
+.. note:: This module requires NumPy (``pip install numpy``).
+"""  # noqa: E501
+
+from __future__ import absolute_import, division, print_function
+from collections import OrderedDict
+from multiprocessing import Pool
+import itertools
+import numpy as np
+
+from .archive import ArchiveReader, MAGIC as ARCHIVE_MAGIC
+from .binary_log import BinaryLogReader
+from .voc_algorithm import VocAlgorithm
+
+import logging
+log = logging.getLogger(__name__)
+
+
+#: Names of the tuning parameters, in the order of
+#: :py:meth:`~sensirion_i2c_svm40.device.Svm40I2cDevice.set_voc_tuning_parameters`.  # noqa: E501
+PARAMETERS = ('voc_index_offset', 'learning_time_hours',
+              'gating_max_duration_minutes', 'std_initial')
+
+#: Names of the summary metrics of a sweep result.
+METRICS = ('samples', 'mean', 'std', 'min', 'max', 'above')
+
+
+def parameter_grid(voc_index_offset=(100,), learning_time_hours=(12,),
+                   gating_max_duration_minutes=(180,), std_initial=(50,)):
+    """
+    Create all combinations of the given tuning parameter values. The
+    defaults are the default values of the device.
+
+    :param list(int) voc_index_offset: VOC index offsets.
+    :param list(int) learning_time_hours: Learning times in hours.
+    :param list(int) gating_max_duration_minutes:
+        Maximum gating durations in minutes.
+    :param list(int) std_initial: Initial standard deviation estimates.
+    :return: Structured array with one row per combination.
+    :rtype: numpy.ndarray
+    """
+    combinations = list(itertools.product(
+        voc_index_offset, learning_time_hours, gating_max_duration_minutes,
+        std_initial))
+    return np.array(combinations,
+                    dtype=[(name, np.int32) for name in PARAMETERS])
+
+
+def result_dtype():
+    """
+    Get the NumPy dtype of a sweep result: The tuning parameters, followed by
+    the metrics :py:data:`METRICS` (number of evaluated samples, and mean,
+    standard deviation, minimum and maximum of the VOC index, and the
+    fraction of samples above the threshold).
+
+    :rtype: numpy.dtype
+    """
+    return np.dtype([(name, np.int32) for name in PARAMETERS] +
+                    [('samples', np.int64)] +
+                    [(name, np.float64) for name in METRICS[1:]])
+
+
+def find_shards(paths):
+    """
+    Split binary logs containing several devices into one shard per device.
+
+    :param list(str) paths: Paths to binary logs or archives.
+    :return: Shards as (path, device_index) tuples, with a device index of
+             None for archives (i.e. all records).
+    :rtype: list(tuple)
+    """
+    shards = []
+    for path in paths:
+        if _is_archive(path):
+            shards.append((path, None))
+        else:
+            records = BinaryLogReader(path).records
+            shards.extend((path, int(index))
+                          for index in np.unique(records['device_index']))
+    return shards
+
+
+def _is_archive(path):
+    with open(path, 'rb') as f:
+        return f.read(len(ARCHIVE_MAGIC)) == ARCHIVE_MAGIC
+
+
+def _iter_raw_voc_ticks(path, device_indices, chunk_size):
+    """
+    Read the raw VOC ticks of several shards of the same file chunk by
+    chunk, reading the file only once.
+
+    :return: Generator yielding (position in ``device_indices``, raw VOC
+             ticks) tuples.
+    """
+    if _is_archive(path):
+        reader = ArchiveReader(path)
+        chunks = (reader.read_chunk(i) for i in range(len(reader.chunks)))
+    else:
+        chunks = BinaryLogReader(path).chunks(chunk_size)
+    for records in chunks:
+        for position, device_index in enumerate(device_indices):
+            ticks = records['raw_voc_ticks'] if device_index is None else \
+                records['raw_voc_ticks'][
+                    records['device_index'] == device_index]
+            for start in range(0, len(ticks), chunk_size):
+                yield position, ticks[start:start + chunk_size]
+
+
+class _ShardMetrics(object):
+    """
+    Algorithm instances and metrics of all combinations on a single shard.
+    """
+    def __init__(self, grid, warmup, threshold):
+        super(_ShardMetrics, self).__init__()
+        self._algorithm = VocAlgorithm(
+            len(grid), *(grid[name] for name in PARAMETERS))
+        self._skip = warmup
+        self._threshold = threshold
+        self.count = 0
+        self.total = np.zeros(len(grid))
+        self.squares = np.zeros(len(grid))
+        self.minimum = np.full(len(grid), np.inf)
+        self.maximum = np.full(len(grid), -np.inf)
+        self.above = np.zeros(len(grid), dtype=np.int64)
+
+    def update(self, sraw):
+        voc_index = self._algorithm.run(sraw)[self._skip:]
+        self._skip = max(self._skip - len(sraw), 0)
+        if len(voc_index):
+            self.count += len(voc_index)
+            self.total += voc_index.sum(axis=0)
+            self.squares += (voc_index * voc_index).sum(axis=0)
+            self.minimum = np.minimum(self.minimum, voc_index.min(axis=0))
+            self.maximum = np.maximum(self.maximum, voc_index.max(axis=0))
+            self.above += (voc_index > self._threshold).sum(axis=0)
+
+    def result(self):
+        return (self.count, self.total, self.squares, self.minimum,
+                self.maximum, self.above)
+
+
+def _sweep_file(args):
+    """
+    Evaluate all combinations on the shards of a single file (runs in a
+    worker process).
+
+    :return: Per shard the number of samples, sum, sum of squares, minimum,
+             maximum and number of samples above the threshold per
+             combination.
+    :rtype: list(tuple)
+    """
+    path, device_indices, grid, warmup, threshold, chunk_size = args
+    metrics = [_ShardMetrics(grid, warmup, threshold) for _ in device_indices]
+    for position, sraw in _iter_raw_voc_ticks(path, device_indices,
+                                              chunk_size):
+        metrics[position].update(sraw)
+    for device_index, shard in zip(device_indices, metrics):
+        log.debug("Evaluated {} samples of '{}' (device {}).".format(
+            shard.count, path, device_index))
+    return [shard.result() for shard in metrics]
+
+
+def sweep(shards, grid, processes=None, warmup=3600, threshold=250.,
+          chunk_size=3600):
+    """
+    Evaluate a grid of tuning parameters on recorded raw VOC ticks.
+
+    The samples are expected to be recorded at the sampling interval of the
+    device (1 second); gaps are not taken into account.
+
+    :param list shards:
+        Shards to evaluate, as paths to binary logs or archives (containing a
+        single device each), or as (path, device_index) tuples (see
+        :py:func:`find_shards`).
+    :param numpy.ndarray grid:
+        Combinations to evaluate, see :py:func:`parameter_grid`.
+    :param int processes:
+        Number of worker processes, None for the number of CPUs, or 0 to
+        evaluate all shards in the calling process.
+    :param int warmup:
+        Number of samples at the beginning of every shard which are excluded
+        from the metrics (the learning phase of the algorithm).
+    :param float threshold: VOC index threshold for the ``above`` metric.
+    :param int chunk_size: Number of records to read at once.
+    :return: Structured array (see :py:func:`result_dtype`) with the metrics
+             over all shards, one row per combination. The metrics of
+             combinations without any samples are NaN.
+    :rtype: numpy.ndarray
+    """
+    files = OrderedDict()
+    for shard in shards:
+        path, device_index = shard if isinstance(shard, tuple) \
+            else (shard, None)
+        files.setdefault(path, []).append(device_index)
+    tasks = [(path, device_indices, grid, warmup, threshold, chunk_size)
+             for path, device_indices in files.items()]
+    if processes == 0:
+        file_results = [_sweep_file(task) for task in tasks]
+    else:
+        pool = Pool(processes)
+        try:
+            file_results = list(pool.imap_unordered(_sweep_file, tasks))
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+    shard_results = [result for results in file_results for result in results]
+    zeros = np.zeros(len(grid))
+    count = sum(result[0] for result in shard_results)
+    total = sum((result[1] for result in shard_results), zeros)
+    squares = sum((result[2] for result in shard_results), zeros)
+    above = sum((result[5] for result in shard_results), zeros)
+    results = np.zeros(len(grid), dtype=result_dtype())
+    for name in PARAMETERS:
+        results[name] = grid[name]
+    results['samples'] = count
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        results['mean'] = mean
+        results['std'] = np.sqrt(np.maximum(squares / count - mean * mean, 0.))
+        results['above'] = above / count
+    results['min'] = np.min([result[3] for result in shard_results] +
+                            [np.full(len(grid), np.inf)], axis=0)
+    results['max'] = np.max([result[4] for result in shard_results] +
+                            [np.full(len(grid), -np.inf)], axis=0)
+    if count == 0:
+        results['min'] = np.nan
+        results['max'] = np.nan
+    return results
@@ -38,10 +38,19 @@ setup(
     install_requires=[
         'sensirion-i2c-driver~=1.0.0',
     ],
+    entry_points={
+        'console_scripts': [
+            'svm40=sensirion_i2c_svm40.cli:main',
+        ],
+    },
     extras_require={
+        'numpy': [
+            'numpy',
+        ],
         'test': [
             'flake8~=3.6.0',
             'mock~=3.0.0',
+            'numpy',
             'pytest~=3.10.0',
             'pytest-cov~=2.6.0',
             'sensirion-shdlc-sensorbridge~=0.1.1',
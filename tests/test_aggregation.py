@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_svm40.aggregation import WindowedAggregator
+from sensirion_i2c_svm40.response_types import AirQuality, Humidity, \
+    Temperature
+import math
+import pytest
+import random
+
+
+def test_against_recomputation():
+    """
+    Test if the incremental statistics match statistics recomputed from the
+    samples within the window.
+    """
+    rnd = random.Random(0)
+    aggregator = WindowedAggregator(windows=(10., 60.))
+    samples = []
+    timestamp = 0.0
+    for _ in range(500):
+        timestamp += rnd.choice([0.5, 1.0, 1.0, 3.0])
+        sample = (rnd.randint(10, 5000), rnd.randint(0, 10000),
+                  rnd.randint(-8000, 10000))
+        samples.append((timestamp,) + sample)
+        aggregator.add((AirQuality(sample[0]), Humidity(sample[1]),
+                        Temperature(sample[2])), timestamp=timestamp)
+        for window in aggregator.windows:
+            values = [s[3] / 200. for s in samples
+                      if s[0] > timestamp - window]
+            mean = sum(values) / len(values)
+            stddev = math.sqrt(sum((v - mean) ** 2 for v in values) /
+                               len(values))
+            stats = aggregator.statistics(window, 'temperature')
+            assert stats.count == len(values)
+            assert stats.min == min(values)
+            assert stats.max == max(values)
+            assert stats.mean == pytest.approx(mean)
+            assert stats.stddev == pytest.approx(stddev, abs=1e-9)
+
+
+def test_summary_and_raw_fields():
+    """
+    Test the summary of all windows and the aggregation of raw fields.
+    """
+    aggregator = WindowedAggregator(
+        windows=(60.,), fields=('humidity', 'raw_voc_ticks'))
+    assert aggregator.summary()[60.]['humidity'].count == 0
+    with pytest.raises(KeyError):
+        aggregator.add((AirQuality(1), Humidity(2), Temperature(3)))
+    aggregator.add_ticks(humidity=4000, raw_voc_ticks=30000, timestamp=1.)
+    aggregator.add_ticks(humidity=5000, raw_voc_ticks=31000, timestamp=2.)
+    summary = aggregator.summary()
+    assert summary[60.]['humidity'].mean == 45.0
+    assert summary[60.]['raw_voc_ticks'].stddev == 500.0
+    with pytest.raises(ValueError):
+        aggregator.add_ticks(humidity=1, raw_voc_ticks=1, timestamp=0.)
+    with pytest.raises(ValueError):
+        WindowedAggregator(fields=('pressure',))
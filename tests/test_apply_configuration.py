@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_driver import I2cConnection
+from sensirion_i2c_svm40 import Svm40I2cDevice
+from sensirion_i2c_svm40.instrumentation import CommandStats
+from sensirion_i2c_svm40.simulation import Svm40SimulatedTransceiver
+import mock
+import pytest
+
+
+@pytest.fixture
+def transceiver():
+    return Svm40SimulatedTransceiver()
+
+
+@pytest.fixture
+def device(transceiver):
+    return Svm40I2cDevice(I2cConnection(transceiver),
+                          instrumentation=CommandStats(),
+                          readiness_polling=True)
+
+
+def _executions(device, command):
+    statistics = device.instrumentation.get(command)
+    return statistics.executions if statistics else 0
+
+
+def test_unchanged(device):
+    """
+    Test if nothing is written if the configuration is already applied.
+    """
+    result = device.apply_configuration(
+        temperature_offset=0.0, voc_tuning_parameters=(100, 12, 180, 50))
+    assert result.changed == []
+    assert result.stored is False
+    assert result.restarted is False
+    assert device.instrumentation.commands == [
+        'Svm40I2cCmdGetTemperatureOffsetForRhtMeasurements',
+        'Svm40I2cCmdGetVocAlgorithmTuningParameters',
+    ]
+
+
+def test_idle(device, transceiver):
+    """
+    Test if changed parameters are written and stored once in idle mode.
+    """
+    result = device.apply_configuration(
+        temperature_offset=1.5, voc_tuning_parameters=[120, 24, 60, 40])
+    assert result.changed == ['temperature_offset', 'voc_tuning_parameters']
+    assert result.stored is True
+    assert result.restarted is False
+    assert result.measurement_gap == 0.0
+    assert _executions(device, 'Svm40I2cCmdStoreNvData') == 1
+    assert not transceiver.is_measuring
+
+    device.device_reset()
+    assert device.get_compensation_temperature_offset() == 1.5
+    assert device.get_voc_tuning_parameters() == (120, 24, 60, 40)
+
+
+def test_measuring(device, transceiver):
+    """
+    Test if the measurement is restarted with the VOC algorithm state
+    preserved if the tuning parameters are changed.
+    """
+    device.set_voc_state([1, 2, 3, 4, 5, 6, 7, 8])
+    device.start_measurement()
+    result = device.apply_configuration(temperature_offset=-1.0,
+                                        store_nv=False)
+    assert result.changed == ['temperature_offset']
+    assert result.restarted is False
+
+    result = device.apply_configuration(
+        voc_tuning_parameters=(100, 12, 180, 0), store_nv=False)
+    assert result.changed == ['voc_tuning_parameters']
+    assert result.stored is False
+    assert result.restarted is True
+    stop = device.instrumentation.get('Svm40I2cCmdStopMeasurement')
+    assert result.measurement_gap >= stop.total_time.max
+    assert transceiver.is_measuring
+    assert device.get_voc_state() == [1, 2, 3, 4, 5, 6, 7, 8]
+    assert _executions(device, 'Svm40I2cCmdSetVocAlgorithmState') == 2
+    assert _executions(device, 'Svm40I2cCmdStoreNvData') == 0
+
+
+def test_measuring_errors(device, transceiver):
+    """
+    Test if a failed write is raised even if the restart fails as well.
+    """
+    device.start_measurement()
+    with mock.patch.object(device, 'set_voc_tuning_parameters',
+                           side_effect=IOError("write failed")), \
+            mock.patch.object(device, 'start_measurement',
+                              side_effect=IOError("restart failed")):
+        with pytest.raises(IOError) as exc_info:
+            device.apply_configuration(voc_tuning_parameters=(100, 12, 180, 0))
+    assert str(exc_info.value) == "write failed"
+    assert not transceiver.is_measuring
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_svm40.archive import ArchiveReader, ArchiveWriter, \
+    decode_chunk, encode_chunk, DEFAULT_COMPRESSION
+from sensirion_i2c_svm40.binary_log import RECORD_SIZE, record_dtype
+import numpy as np
+import os
+import pytest
+
+
+def _records(count, start=1.6e9):
+    """
+    Create typical records: 1 Hz, slowly changing values with some noise.
+    """
+    rnd = np.random.RandomState(0)
+    t = np.arange(count, dtype=np.float64)
+    records = np.zeros(count, dtype=record_dtype())
+    records['timestamp'] = start + t + rnd.uniform(0, 0.01, count)
+    records['voc_index'] = 1000 + 200 * np.sin(t / 3000.) + \
+        rnd.randint(-1, 2, count)
+    records['humidity'] = 4000 + 500 * np.sin(t / 7000.) + \
+        rnd.randint(-2, 3, count)
+    records['temperature'] = 5000 + 400 * np.cos(t / 9000.) + \
+        rnd.randint(-1, 2, count)
+    records['raw_voc_ticks'] = 30000 + 300 * np.sin(t / 2000.) + \
+        rnd.randint(-3, 4, count)
+    records['raw_humidity'] = records['humidity'] - 200
+    records['raw_temperature'] = records['temperature'] + 300
+    return records
+
+
+def test_chunk_round_trip():
+    """
+    Test if a chunk is decoded losslessly (timestamps with 1ms resolution).
+    """
+    records = _records(1000)
+    records['raw_voc_ticks'][10] = 65535
+    records['temperature'][20] = -32768
+    for compression in ('zlib', DEFAULT_COMPRESSION):
+        decoded = decode_chunk(encode_chunk(records, compression))
+        for name in records.dtype.names:
+            if name == 'timestamp':
+                assert np.all(np.abs(decoded[name] - records[name]) <= 5e-4)
+            else:
+                assert np.array_equal(decoded[name], records[name])
+
+
+def _assert_records_equal(actual, expected):
+    assert len(actual) == len(expected)
+    assert np.allclose(actual['timestamp'], expected['timestamp'], rtol=0,
+                       atol=1e-3)  # millisecond resolution
+    for name in expected.dtype.names[1:]:
+        assert np.array_equal(actual[name], expected[name])
+
+
+def test_archive(tmpdir):
+    """
+    Test if records are split into chunks by time, can be read by time
+    range and are compressed by at least a factor of 10 (with LZMA).
+    """
+    path = str(tmpdir.join("archive.bin"))
+    records = _records(86400)
+    with ArchiveWriter(path, chunk_duration=3600.) as writer:
+        writer.write(records[:50000])
+        writer.write(records[50000:])
+    if DEFAULT_COMPRESSION == 'lzma':
+        assert os.path.getsize(path) * 10 < len(records) * RECORD_SIZE
+
+    reader = ArchiveReader(path)
+    assert len(reader) == len(records)
+    chunks = reader.chunks
+    assert len(chunks) == 24
+    assert chunks[1].min_timestamp >= records['timestamp'][0] + 3600.
+    statistics = chunks[0].statistics['humidity']
+    assert statistics.min == records['humidity'][:chunks[0].count].min()
+    assert abs(statistics.mean -
+               records['humidity'][:chunks[0].count].mean()) < 1e-6
+
+    start = records['timestamp'][5000]
+    selected = reader.read(start=start, end=start + 10.)
+    assert np.array_equal(selected['voc_index'],
+                          records['voc_index'][5000:5010])
+
+    # appending and an incomplete last chunk (crash during writing)
+    with ArchiveWriter(path) as writer:
+        writer.write(_records(10, start=2e9))
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 1)
+    assert len(ArchiveReader(path)) == len(records)
+
+
+@pytest.mark.parametrize("kwargs", [
+    dict(chunk_duration=0.),
+    dict(chunk_duration=-1.),
+    dict(max_chunk_records=0),
+])
+def test_invalid_chunk_limits(tmpdir, kwargs):
+    """
+    Test if chunk limits which would never split the records are rejected.
+    """
+    with pytest.raises(ValueError):
+        ArchiveWriter(str(tmpdir.join("archive.bin")), **kwargs)
+
+
+def test_append_after_torn_chunk(tmpdir):
+    """
+    Test if an incomplete last chunk (crash during writing) is removed
+    before appending, so the archive stays readable.
+    """
+    path = str(tmpdir.join("archive.bin"))
+    records = _records(3000)
+    with ArchiveWriter(path, chunk_duration=1000.) as writer:
+        writer.write(records[:2000])
+    chunks = ArchiveReader(path).chunks
+    assert len(chunks) == 2
+    with open(path, 'r+b') as f:
+        f.truncate(chunks[1].offset + chunks[1].size // 2)  # mid-chunk
+
+    with ArchiveWriter(path, chunk_duration=1000.) as writer:
+        writer.write(records[1000:])
+    reader = ArchiveReader(path)
+    assert len(reader.chunks) == 3
+    _assert_records_equal(reader.read(), records)
+
+
+def test_append_after_zeroed_chunk(tmpdir):
+    """
+    Test if a last chunk of full size with missing data (checksum mismatch)
+    is removed before appending.
+    """
+    path = str(tmpdir.join("archive.bin"))
+    records = _records(2000)
+    with ArchiveWriter(path, chunk_duration=1000.) as writer:
+        writer.write(records)
+    last = ArchiveReader(path).chunks[-1]
+    with open(path, 'r+b') as f:
+        f.seek(last.offset + last.size - 10)
+        f.write(bytearray(10))
+
+    with ArchiveWriter(path, chunk_duration=1000.) as writer:
+        writer.write(records[1000:])
+    _assert_records_equal(ArchiveReader(path).read(), records)
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_driver import I2cConnection, CrcCalculator
+from sensirion_i2c_driver.transceiver_v1 import I2cTransceiverV1
+from struct import pack
+import pytest
+import sys
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 5),
+                                reason="requires asyncio with async/await")
+
+
+class RecordingTransceiver(I2cTransceiverV1):
+    """
+    Transceiver which records all transfers and responds to every read with
+    a measured values frame.
+    """
+    def __init__(self):
+        super(RecordingTransceiver, self).__init__()
+        self.transfers = []
+
+    def transceive(self, slave_address, tx_data, rx_length, read_delay,
+                   timeout):
+        self.transfers.append((slave_address, tx_data, rx_length, read_delay))
+        crc = CrcCalculator(8, 0x31, 0xFF, 0x00)
+        rx_data = bytearray()
+        for word in [1000, 4500, slave_address][:(rx_length or 0) // 3]:
+            data = pack(">h", word)
+            rx_data += data + bytearray([crc(bytearray(data))])
+        return self.STATUS_OK, None, bytes(rx_data)
+
+
+def _run(factory):
+    import asyncio
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(factory())
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def test_read_measured_values():
+    """
+    Test if a read command is split into write and read transfers with the
+    read delay awaited in between.
+    """
+    from sensirion_i2c_svm40.async_device import Svm40I2cAsyncDevice
+    transceiver = RecordingTransceiver()
+    device = Svm40I2cAsyncDevice(I2cConnection(transceiver))
+    air_quality, humidity, temperature = _run(device.read_measured_values)
+    assert air_quality.voc_index == 100.
+    assert humidity.percent_rh == 45.
+    assert temperature.ticks == 0x6A
+    assert transceiver.transfers == [
+        (0x6A, b"\x03\xa6", None, 0.0),
+        (0x6A, None, 9, 0.0),
+    ]
+
+
+def test_concurrent_devices_on_one_bus():
+    """
+    Test if several devices on the same bus can be used concurrently and
+    every device receives its own response.
+    """
+    import asyncio
+    from sensirion_i2c_svm40.async_device import Svm40I2cAsyncDevice
+    transceiver = RecordingTransceiver()
+    connection = I2cConnection(transceiver)
+    devices = [Svm40I2cAsyncDevice(connection, address)
+               for address in range(0x10, 0x20)]
+    results = _run(lambda: asyncio.gather(
+        *[device.read_measured_values() for device in devices]))
+    assert [r[2].ticks for r in results] == list(range(0x10, 0x20))
+    # all write transfers happen before the first read transfer since the
+    # read delays are awaited concurrently
+    assert [t[2] for t in transceiver.transfers] == [None] * 16 + [9] * 16
+
+
+def test_transfers_run_in_executor():
+    """
+    Test if blocking transfers do not block the event loop and are still
+    serialized per bus.
+    """
+    import asyncio
+    import threading
+    import time
+    from sensirion_i2c_svm40.async_device import Svm40I2cAsyncDevice
+
+    class SlowTransceiver(RecordingTransceiver):
+        def __init__(self):
+            super(SlowTransceiver, self).__init__()
+            self.lock = threading.Lock()
+            self.active = 0
+            self.max_active = 0
+
+        def transceive(self, *args, **kwargs):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            time.sleep(0.02)
+            with self.lock:
+                self.active -= 1
+            return super(SlowTransceiver, self).transceive(*args, **kwargs)
+
+    transceiver = SlowTransceiver()
+    connection = I2cConnection(transceiver)
+    devices = [Svm40I2cAsyncDevice(connection, address)
+               for address in range(0x10, 0x14)]
+    ticks = []
+
+    async def ticker():
+        for _ in range(10):
+            ticks.append(time.time())
+            await asyncio.sleep(0.01)
+
+    results = _run(lambda: asyncio.gather(
+        ticker(), *[device.read_measured_values() for device in devices]))
+    assert [r[2].ticks for r in results[1:]] == list(range(0x10, 0x14))
+    assert len(transceiver.transfers) == 8
+    assert transceiver.max_active == 1
+    # the event loop kept running during the 8 * 20ms of transfers
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.015 + 0.05
+
+
+def test_iter_measurements():
+    """
+    Test if the asynchronous iterator yields every update exactly once with
+    about one read per update.
+    """
+    import mock
+    from sensirion_i2c_svm40.async_device import Svm40I2cAsyncDevice
+    from sensirion_i2c_svm40.response_types import AirQuality, Humidity, \
+        Temperature
+
+    class Clock(object):
+        now = 100.0
+
+        def __call__(self):
+            return self.now
+
+    clock = Clock()
+
+    class FakeDevice(Svm40I2cAsyncDevice):
+        reads = 0
+
+        async def read_measured_values(self, compact=False):
+            self.reads += 1
+            clock.now += 0.001  # transfer time
+            ticks = int((clock.now - 0.37) // 1.0)
+            return AirQuality(ticks), Humidity(ticks), Temperature(ticks)
+
+    async def sleep(seconds):
+        clock.now += seconds
+
+    async def collect(device):
+        indices = []
+        async for air_quality, _, _ in device.iter_measurements():
+            indices.append(air_quality.ticks)
+            if len(indices) == 5:
+                reads_before = device.reads
+            elif len(indices) == 105:
+                return indices, device.reads - reads_before
+
+    device = FakeDevice(connection=None)
+    with mock.patch('sensirion_i2c_svm40.device._clock', clock), \
+            mock.patch('sensirion_i2c_svm40.async_device._clock', clock), \
+            mock.patch('sensirion_i2c_svm40.async_device.asyncio.sleep',
+                       sleep):
+        indices, reads = _run(lambda: collect(device))
+    assert indices == list(range(indices[0], indices[0] + 105))
+    assert reads / 100. < 1.3
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_driver import CrcCalculator
+from sensirion_i2c_svm40.batch_decoder import decode_measured_values, \
+    decode_measured_values_raw
+from sensirion_i2c_svm40.commands import Svm40I2cCmdReadMeasuredValues, \
+    Svm40I2cCmdReadMeasuredValuesRaw
+from struct import pack
+import numpy as np
+import pytest
+import random
+
+
+def _build_frame(words, formats):
+    crc = CrcCalculator(8, 0x31, 0xFF, 0x00)
+    frame = bytearray()
+    for word, fmt in zip(words, formats):
+        data = pack(fmt, word)
+        frame += data + bytearray([crc(bytearray(data))])
+    return bytes(frame)
+
+
+def _random_frames(count, formats):
+    rnd = random.Random(42)
+    frames = []
+    for _ in range(count):
+        words = [rnd.randint(0, 65535) if f == ">H" else
+                 rnd.randint(-32768, 32767) for f in formats]
+        frames.append(_build_frame(words, formats))
+    return frames
+
+
+def test_decode_measured_values():
+    """
+    Test if the batch decoder returns the same values as the command.
+    """
+    frames = _random_frames(100, [">h"] * 3)
+    batch = decode_measured_values(b"".join(frames))
+    assert len(batch) == 100
+    assert not batch.crc_error.any()
+    for i, frame in enumerate(frames):
+        air_quality, humidity, temperature = \
+            Svm40I2cCmdReadMeasuredValues().interpret_response(frame)
+        assert batch.voc_index_ticks[i] == air_quality.ticks
+        assert batch.humidity_ticks[i] == humidity.ticks
+        assert batch.temperature_ticks[i] == temperature.ticks
+        assert batch.voc_index[i] == air_quality.voc_index
+        assert batch.percent_rh[i] == humidity.percent_rh
+        assert batch.degrees_celsius[i] == temperature.degrees_celsius
+
+
+def test_decode_measured_values_raw():
+    """
+    Test if the raw batch decoder returns the same values as the command.
+    """
+    frames = _random_frames(100, [">h", ">h", ">h", ">H", ">h", ">h"])
+    batch = decode_measured_values_raw(bytearray(b"".join(frames)))
+    assert not batch.crc_error.any()
+    for i, frame in enumerate(frames):
+        _, _, _, raw_voc_ticks, raw_humidity, raw_temperature = \
+            Svm40I2cCmdReadMeasuredValuesRaw().interpret_response(frame)
+        assert batch.raw_voc_ticks[i] == raw_voc_ticks
+        assert batch.raw_humidity_ticks[i] == raw_humidity.ticks
+        assert batch.raw_temperature_ticks[i] == raw_temperature.ticks
+        assert batch.raw_degrees_celsius[i] == \
+            raw_temperature.degrees_celsius
+
+
+def test_crc_error_mask():
+    """
+    Test if frames with a wrong CRC are flagged in the error mask.
+    """
+    data = bytearray(b"".join(_random_frames(10, [">h"] * 3)))
+    data[3 * 9 + 5] ^= 0x01  # corrupt CRC of 2nd word of frame 3
+    batch = decode_measured_values(data)
+    assert list(np.nonzero(batch.crc_error)[0]) == [3]
+    assert np.isnan(batch.voc_index[3])
+    assert batch.valid.sum() == 9
+
+
+def test_invalid_buffer_length():
+    """
+    Test if a truncated buffer is rejected.
+    """
+    with pytest.raises(ValueError):
+        decode_measured_values(b"\x00" * 10)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_svm40.binary_log import BinaryLogReader, \
+    BinaryLogWriter, HEADER_SIZE, RECORD_SIZE
+from sensirion_i2c_svm40.response_types import AirQuality, Humidity, \
+    Temperature
+import os
+import pytest
+
+
+def test_write_and_read(tmpdir):
+    """
+    Test if records are written in batches and read back as structured
+    array.
+    """
+    path = str(tmpdir.join("log.bin"))
+    with BinaryLogWriter(path, batch_size=3) as writer:
+        for i in range(5):
+            writer.append_ticks(i, 10 * i, -20 * i, 60000 + i, 30 * i,
+                                40 * i, device_index=i % 2,
+                                timestamp=1e9 + i)
+        assert writer.pending == 2
+        assert os.path.getsize(path) == HEADER_SIZE + 3 * RECORD_SIZE
+        writer.append((AirQuality(1), Humidity(2), Temperature(3)),
+                      device_index=7, timestamp=2e9)
+
+    records = BinaryLogReader(path).records
+    assert len(records) == 6
+    assert list(records['timestamp'][:2]) == [1e9, 1e9 + 1]
+    assert list(records['device_index']) == [0, 1, 0, 1, 0, 7]
+    assert list(records['temperature']) == [0, -20, -40, -60, -80, 3]
+    assert list(records['raw_voc_ticks']) == [60000, 60001, 60002, 60003,
+                                              60004, 0]
+    assert [len(chunk) for chunk in BinaryLogReader(path).chunks(4)] == [4, 2]
+
+
+def test_torn_record(tmpdir):
+    """
+    Test if an incomplete last record is ignored by the reader and removed
+    by the writer.
+    """
+    path = str(tmpdir.join("log.bin"))
+    with BinaryLogWriter(path) as writer:
+        writer.append_ticks(1, 2, 3, timestamp=1.0)
+        writer.append_ticks(4, 5, 6, timestamp=2.0)
+    with open(path, 'r+b') as f:
+        f.truncate(HEADER_SIZE + RECORD_SIZE + 5)  # crash while writing
+    assert len(BinaryLogReader(path)) == 1
+
+    with BinaryLogWriter(path) as writer:
+        writer.append_ticks(7, 8, 9, timestamp=3.0)
+    records = BinaryLogReader(path).records
+    assert list(records['voc_index']) == [1, 7]
+
+
+def test_invalid_file(tmpdir):
+    """
+    Test if files of other formats are rejected.
+    """
+    path = str(tmpdir.join("log.csv"))
+    with open(path, 'w') as f:
+        f.write("timestamp,voc_index,humidity,temperature\n")
+    with pytest.raises(ValueError):
+        BinaryLogWriter(path)
+    with pytest.raises(ValueError):
+        BinaryLogReader(path)
+
+    path = str(tmpdir.join("short.bin"))
+    with open(path, 'wb') as f:
+        f.write(b"SVM40")
+    with pytest.raises(ValueError):
+        BinaryLogWriter(path)
+    with open(path, 'rb') as f:
+        assert f.read() == b"SVM40"  # not overwritten
+
+    path = str(tmpdir.join("empty.bin"))
+    BinaryLogWriter(path).close()
+    assert len(BinaryLogReader(path)) == 0
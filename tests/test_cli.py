@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_svm40.binary_log import BinaryLogReader
+from sensirion_i2c_svm40.cli import main
+import json
+import subprocess
+import sys
+
+
+def test_config(capsys):
+    assert main(['--simulate', 'config', '--json']) == 0
+    config = json.loads(capsys.readouterr()[0])
+    assert len(config['serial_number']) == 16
+    assert config['temperature_offset'] == 0.0
+    assert config['voc_tuning_parameters']['learning_time_hours'] == 12
+
+
+def test_stream(capsys):
+    assert main(['--simulate', 'stream', '--raw', '--format', 'csv',
+                 '--count', '2']) == 0
+    lines = capsys.readouterr()[0].splitlines()
+    assert len(lines) == 3
+    assert lines[0].split(',')[-1] == 'raw_temperature'
+    assert len(lines[2].split(',')) == 7
+
+
+def test_log(tmpdir):
+    path = str(tmpdir.join('test.svm40log'))
+    assert main(['--simulate', 'log', path, '--raw', '--count', '2',
+                 '--device-index', '2']) == 0
+    records = BinaryLogReader(path).records
+    assert len(records) == 2
+    assert set(records['device_index']) == {2}
+
+
+def test_benchmark(capsys):
+    assert main(['--simulate', 'benchmark', '--duration', '0.1']) == 0
+    output = capsys.readouterr()[0]
+    assert 'reads/s' in output
+    assert 'Svm40I2cCmdReadMeasuredValues' in output
+    assert 'StopMeasurement' not in output
+
+
+def test_error(capsys):
+    assert main(['--simulate', '--address', '0x10', 'config']) == 1
+    assert 'Error' in capsys.readouterr()[1]
+
+
+def test_lazy_imports():
+    """
+    Test if loading the command line interface does not import NumPy.
+    """
+    code = "import sys, sensirion_i2c_svm40.cli; " \
+           "sys.exit('numpy' in sys.modules)"
+    assert subprocess.call([sys.executable, '-c', code]) == 0
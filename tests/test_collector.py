@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_svm40.collector import Svm40Collector
+import threading
+import time
+
+
+class FakeBus(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.concurrent_access = False
+
+
+class FakeDevice(object):
+    """
+    Device which takes some time per readout and detects concurrent accesses
+    to its bus.
+    """
+    active_buses = set()
+    active_lock = threading.Lock()
+    max_active_buses = 0
+
+    def __init__(self, connection, fail=False):
+        self.connection = connection
+        self.fail = fail
+
+    def read_measured_values(self, compact=False):
+        if not self.connection.lock.acquire(False):
+            self.connection.concurrent_access = True
+            return
+        try:
+            with FakeDevice.active_lock:
+                FakeDevice.active_buses.add(id(self.connection))
+                FakeDevice.max_active_buses = max(
+                    FakeDevice.max_active_buses, len(FakeDevice.active_buses))
+            time.sleep(0.02)
+            with FakeDevice.active_lock:
+                FakeDevice.active_buses.discard(id(self.connection))
+            if self.fail:
+                raise IOError("NACK")
+            return (compact,)
+        finally:
+            self.connection.lock.release()
+
+
+def test_collector():
+    """
+    Test if devices are grouped by bus, read periodically, never accessed
+    concurrently on the same bus but in parallel on different buses.
+    """
+    buses = [FakeBus() for _ in range(3)]
+    devices = [FakeDevice(buses[i % 3]) for i in range(9)]
+    failing = FakeDevice(buses[0], fail=True)
+    readouts = []
+    errors = []
+    collector = Svm40Collector(
+        devices + [failing],
+        callback=lambda d, t, v: readouts.append((d, v)),
+        error_callback=lambda d, e: errors.append(d),
+        interval=0.2, compact=True)
+    assert [len(bus) for bus in collector.buses] == [4, 3, 3]
+    with collector:
+        time.sleep(0.5)
+    assert not collector.is_running
+    assert not any(bus.concurrent_access for bus in buses)
+    assert FakeDevice.max_active_buses > 1
+    for device in devices:
+        count = sum(1 for d, _ in readouts if d is device)
+        assert 2 <= count <= 3
+    assert all(v == (True,) for _, v in readouts)
+    assert 2 <= len(errors) <= 3 and all(d is failing for d in errors)
+
+
+def test_failing_error_callback():
+    """
+    Test if the devices are still read after the error callback raised an
+    exception.
+    """
+    bus = FakeBus()
+    device = FakeDevice(bus)
+    failing = FakeDevice(bus, fail=True)
+    readouts = []
+
+    def error_callback(device, error):
+        raise ValueError("Callback failed")
+
+    with Svm40Collector([failing, device],
+                        callback=lambda d, t, v: readouts.append(d),
+                        error_callback=error_callback, interval=0.1):
+        time.sleep(0.35)
+    assert 3 <= len(readouts) <= 4
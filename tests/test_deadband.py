@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_svm40.deadband import DeadbandFilter
+from sensirion_i2c_svm40.response_types import AirQuality, Humidity, \
+    Temperature
+
+
+def _values(voc_index, humidity, temperature):
+    return AirQuality(voc_index), Humidity(humidity), Temperature(temperature)
+
+
+def test_deadband():
+    """
+    Test if only changes beyond the deadband (compared to the last published
+    values) are published.
+    """
+    deadband = DeadbandFilter({'temperature': 20}, max_silence=None)
+    temperatures = [5000, 5010, 5020, 5021, 5030, 5042, 5042, 5000]
+    published = [deadband.update(_values(0, 0, t), timestamp=float(i))
+                 for i, t in enumerate(temperatures)]
+    assert published == [True, False, False, True, False, True, False, True]
+    assert deadband.published == 4
+    assert deadband.suppressed == 4
+
+
+def test_max_silence_and_filter():
+    """
+    Test if unchanged values are published after the maximum silence, and
+    the filter generator yields only published values.
+    """
+    deadband = DeadbandFilter(max_silence=10.0)
+    assert deadband.update_ticks(voc_index=1000, humidity=4000,
+                                 temperature=5000, timestamp=0.)
+    assert not deadband.update_ticks(voc_index=1000, humidity=4000,
+                                     temperature=5000, timestamp=9.)
+    assert deadband.update_ticks(voc_index=1000, humidity=4000,
+                                 temperature=5000, timestamp=10.)
+    assert deadband.update_ticks(voc_index=1011, humidity=4000,
+                                 temperature=5000, timestamp=11.)
+
+    deadband.reset()
+    stream = [_values(1000, 4000, 5000)] * 5 + [_values(1000, 4051, 5000)]
+    assert list(deadband.filter(stream)) == [stream[0], stream[5]]
+    assert deadband.suppressed == 5
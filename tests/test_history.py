@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_svm40.history import MeasurementHistory
+from sensirion_i2c_svm40.response_types import AirQuality, Humidity, \
+    Temperature
+from array import array
+import mock
+
+
+def test_append_and_wrap_around():
+    """
+    Test if windows return the newest samples in chronological order, also
+    after the ring buffer has wrapped around.
+    """
+    history = MeasurementHistory(capacity=5)
+    assert len(history.window('voc_index')) == 0
+    for i in range(12):
+        history.append_ticks(i, 10 * i, 20 * i, raw_voc_ticks=60000 + i,
+                             timestamp=float(i))
+    assert len(history) == 5
+    assert list(history.window('voc_index')) == [7, 8, 9, 10, 11]
+    assert list(history.window('temperature', 2)) == [200, 220]
+    assert list(history.window('raw_voc_ticks', 1)) == [60011]
+    assert list(history.window('timestamp')) == [7., 8., 9., 10., 11.]
+
+
+def test_append_response_tuples():
+    """
+    Test if the responses of the device methods can be appended.
+    """
+    history = MeasurementHistory(capacity=3)
+    history.append((AirQuality(1000), Humidity(4500), Temperature(4600)),
+                   timestamp=1.)
+    history.append((AirQuality(1010), Humidity(4510), Temperature(4610),
+                    30000, Humidity(4000), Temperature(5000)), timestamp=2.)
+    assert list(history.window('humidity')) == [4500, 4510]
+    assert list(history.window('raw_humidity')) == [0, 4000]
+    assert list(history.ndarray('raw_temperature')) == [0, 5000]
+
+
+def test_window_is_zero_copy():
+    """
+    Test if the returned NumPy arrays reference the internal storage.
+    """
+    history = MeasurementHistory(capacity=4)
+    for i in range(4):
+        history.append_ticks(i, i, i, timestamp=0.)
+    values = history.ndarray('humidity')
+    history.append_ticks(0, 99, 0, timestamp=0.)  # overwrites oldest slot
+    assert values[0] == 99
+
+
+def test_window_python2():
+    """
+    Test if windows are returned as array copies on Python 2, where arrays
+    do not support memoryviews.
+    """
+    history = MeasurementHistory(capacity=3)
+    for i in range(5):
+        history.append_ticks(i, i, i, timestamp=0.)
+    with mock.patch('sensirion_i2c_svm40.history.sys.version_info', (2, 7)):
+        window = history.window('voc_index', 2)
+    assert isinstance(window, array)
+    assert list(window) == [3, 4]
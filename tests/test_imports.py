@@ -6,10 +6,14 @@ from setuptools import find_packages
 import importlib
 import pkgutil
 import re
+import subprocess
+import sys
 from os import path
-from pytest import mark
+from pytest import mark, raises
 
 EXCLUDES = []  # Regex: remember to use \. !
+if sys.version_info < (3, 5):
+    EXCLUDES.append(r'\.async_device$')  # requires async/await syntax
 
 
 root_path = path.join(path.dirname(__file__), "..")
@@ -24,3 +28,21 @@ def test_import(package):
     for _, mod, _ in pkgutil.walk_packages(module.__path__, prefix=prefix):
         if not any([re.search(exclude, mod) for exclude in EXCLUDES]):
             importlib.import_module(mod)
+
+
+@mark.skipif(sys.version_info < (3, 7), reason="requires PEP 562")
+def test_lazy_package_import():
+    """
+    Tests if importing the package does not load the device and the I²C
+    driver, while the public names are still available.
+    """
+    code = "import sys, sensirion_i2c_svm40.response_types; " \
+           "sys.exit('sensirion_i2c_driver' in sys.modules)"
+    assert subprocess.call([sys.executable, '-c', code]) == 0
+    import sensirion_i2c_svm40
+    from sensirion_i2c_svm40.device import Svm40I2cDevice
+    assert sensirion_i2c_svm40.Svm40I2cDevice is Svm40I2cDevice
+    assert sensirion_i2c_svm40.device.Svm40I2cDevice is Svm40I2cDevice
+    assert 'Svm40I2cDevice' in dir(sensirion_i2c_svm40)
+    with raises(AttributeError):
+        sensirion_i2c_svm40.does_not_exist
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_driver import I2cConnection
+from sensirion_i2c_driver.errors import I2cChecksumError, I2cNackError
+from sensirion_i2c_driver.transceiver_v1 import I2cTransceiverV1
+from sensirion_i2c_svm40 import Svm40I2cDevice
+from sensirion_i2c_svm40.commands import Svm40I2cCmdStartContinuousMeasurement  # noqa: E501
+from sensirion_i2c_svm40.instrumentation import CommandStats, \
+    LatencyHistogram, execute_instrumented
+import pytest
+import time
+
+
+class FakeTransceiver(I2cTransceiverV1):
+    """
+    Transceiver which returns a fixed response (or status).
+    """
+    description = "Fake transceiver"
+    channel_count = None
+
+    def __init__(self, response, status=I2cTransceiverV1.STATUS_OK):
+        super(FakeTransceiver, self).__init__()
+        self.response = response
+        self.status = status
+
+    def transceive(self, slave_address, tx_data, rx_length, read_delay,
+                   timeout):
+        return self.status, None, self.response
+
+
+def test_histogram():
+    """
+    Test the histogram summary values and percentiles.
+    """
+    histogram = LatencyHistogram()
+    assert histogram.mean is None
+    assert histogram.percentile(50.) is None
+    for latency in [0.001] * 99 + [0.1]:
+        histogram.add(latency)
+    assert histogram.count == 100
+    assert histogram.min == 0.001
+    assert histogram.max == 0.1
+    assert histogram.mean == pytest.approx(0.00199)
+    assert 0.001 <= histogram.percentile(50.) <= 0.002
+    assert histogram.percentile(100.) == 0.1
+    assert sum(count for _, count in histogram.as_dict()['buckets']) == 100
+
+
+def test_stats():
+    """
+    Test if executed commands and errors are recorded per command.
+    """
+    transceiver = FakeTransceiver(b"\x01\x2c\x8e")  # 1.5 °C
+    stats = CommandStats()
+    device = Svm40I2cDevice(I2cConnection(transceiver), instrumentation=stats)
+    assert device.get_compensation_temperature_offset() == 1.5
+    transceiver.response = b"\x01\x2c\x00"
+    with pytest.raises(I2cChecksumError):
+        device.get_compensation_temperature_offset()
+    transceiver.status = transceiver.STATUS_NACK
+    with pytest.raises(I2cNackError):
+        device.get_compensation_temperature_offset()
+    stats.record_retry('Svm40I2cCmdGetTemperatureOffsetForRhtMeasurements')
+
+    statistics = stats.get('Svm40I2cCmdGetTemperatureOffsetForRhtMeasurements')
+    assert stats.commands == \
+        ['Svm40I2cCmdGetTemperatureOffsetForRhtMeasurements']
+    assert statistics.executions == 3
+    assert statistics.checksum_errors == 1
+    assert statistics.nacks == 1
+    assert statistics.timeouts == statistics.other_errors == 0
+    assert statistics.retries == 1
+    assert statistics.decode_time.count == 3
+    # the fake transceiver does not sleep, so the read delay is not counted
+    assert statistics.sleep_time.max <= 0.001
+
+    stats.reset()
+    assert stats.commands == []
+
+
+def test_callback():
+    """
+    Test if a callback gets the records and the instrumentation can be
+    disabled.
+    """
+    records = []
+    device = Svm40I2cDevice(I2cConnection(FakeTransceiver(b"")),
+                            instrumentation=records.append)
+    device.start_measurement()  # post processing time 1ms
+    assert len(records) == 1
+    assert records[0].command == 'Svm40I2cCmdStartContinuousMeasurement'
+    assert records[0].error is None
+    assert records[0].sleep_time >= 0.001
+    assert records[0].total_time >= records[0].sleep_time
+    device.instrumentation = None
+    device.start_measurement()
+    assert len(records) == 1
+
+
+def test_wait_post_process_error():
+    """
+    Test if a failed wait for the post processing is counted as sleep time,
+    not as bus time.
+    """
+    def wait_post_process(command):
+        time.sleep(0.02)
+        raise I2cNackError(None, b"")
+
+    records = []
+    with pytest.raises(I2cNackError):
+        execute_instrumented(I2cConnection(FakeTransceiver(b"")), 0x6A,
+                             Svm40I2cCmdStartContinuousMeasurement(),
+                             records.append, wait_post_process)
+    assert len(records) == 1
+    assert isinstance(records[0].error, I2cNackError)
+    assert records[0].sleep_time >= 0.02
+    assert records[0].bus_time < 0.01
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_svm40 import Svm40I2cDevice
+from sensirion_i2c_svm40.response_types import AirQuality, Humidity, \
+    Temperature
+import mock
+import pytest
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeDevice(Svm40I2cDevice):
+    """
+    Device which updates its values with a given period and phase, based on
+    the fake clock.
+    """
+    def __init__(self, clock, period, phase, constant=False):
+        super(FakeDevice, self).__init__(connection=None)
+        self.clock = clock
+        self.period = period
+        self.phase = phase
+        self.constant = constant
+        self.reads = 0
+
+    def update_index(self):
+        return int((self.clock.now - self.phase) // self.period)
+
+    def read_measured_values(self, compact=False):
+        self.reads += 1
+        self.clock.now += 0.001  # transfer time
+        ticks = 0 if self.constant else self.update_index()
+        return AirQuality(ticks), Humidity(ticks), Temperature(ticks)
+
+
+@pytest.mark.parametrize("device_period", [1.0, 1.002, 0.998])
+def test_one_fresh_sample_per_update(device_period):
+    """
+    Test if every update is yielded exactly once, with small staleness and
+    about one read per update.
+    """
+    clock = FakeClock()
+    device = FakeDevice(clock, device_period, phase=0.37)
+    with mock.patch('sensirion_i2c_svm40.device._clock', clock), \
+            mock.patch('sensirion_i2c_svm40.device.time.sleep', clock.sleep):
+        iterator = device.iter_measurements()
+        indices = [next(iterator)[0].ticks for _ in range(5)]  # lock phase
+        reads_before = device.reads
+        for _ in range(300):
+            air_quality, _, _ = next(iterator)
+            indices.append(air_quality.ticks)
+            update_time = device.phase + air_quality.ticks * device_period
+            assert clock.now - update_time < 0.06  # staleness
+    assert indices == list(range(indices[0], indices[0] + 305))
+    assert (device.reads - reads_before) / 300. < 1.3
+
+
+def test_unchanged_values():
+    """
+    Test if one sample per period is yielded with one read per period if the
+    values do not change.
+    """
+    clock = FakeClock()
+    device = FakeDevice(clock, 1.0, phase=0.5, constant=True)
+    with mock.patch('sensirion_i2c_svm40.device._clock', clock), \
+            mock.patch('sensirion_i2c_svm40.device.time.sleep', clock.sleep):
+        iterator = device.iter_measurements()
+        start = clock.now
+        for _ in range(10):
+            next(iterator)
+        assert 8.5 < clock.now - start < 10.5
+        reads_before = device.reads
+        for _ in range(100):
+            next(iterator)
+    assert device.reads - reads_before == 100
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_driver import I2cConnection
+from sensirion_i2c_svm40 import Svm40I2cDevice
+from sensirion_i2c_svm40.simulation import Svm40SimulatedTransceiver
+
+
+def test_metadata_cache():
+    """
+    Test if serial number and version are read only once, and the cache is
+    invalidated by setters and device reset.
+    """
+    transceiver = Svm40SimulatedTransceiver(serial_number="0123456789ABCDEF")
+    device = Svm40I2cDevice(I2cConnection(transceiver))
+    assert device.serial_number == "0123456789ABCDEF"
+    assert device.version.firmware.major == 2
+    count = transceiver.transceive_count
+    metadata = device.metadata
+    assert metadata.serial_number == device.serial_number
+    assert metadata.version is device.version
+    assert metadata.temperature_offset is None
+    assert metadata.voc_tuning_parameters is None
+    assert transceiver.transceive_count == count  # no bus traffic
+
+    metadata = device.refresh_metadata(configuration=True)
+    assert metadata.temperature_offset == 0.0
+    assert metadata.voc_tuning_parameters == (100, 12, 180, 50)
+    device.set_compensation_temperature_offset(1.0)
+    assert device.metadata.temperature_offset is None
+    assert device.metadata.voc_tuning_parameters == (100, 12, 180, 50)
+    device.set_voc_tuning_parameters(100, 12, 180, 40)
+    assert device.metadata.voc_tuning_parameters is None
+
+    device.get_compensation_temperature_offset()
+    device.device_reset()
+    count = transceiver.transceive_count
+    assert device.metadata.temperature_offset is None
+    assert transceiver.transceive_count == count + 2  # serial and version
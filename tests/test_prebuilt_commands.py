@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_driver import CrcCalculator
+from sensirion_i2c_svm40.commands import prebuilt, \
+    Svm40I2cCmdSetTemperatureOffsetForRhtMeasurements, \
+    Svm40I2cCmdSetVocAlgorithmTuningParameters, \
+    Svm40I2cCmdSetVocAlgorithmState, Svm40I2cCmdReadMeasuredValuesRaw
+from sensirion_i2c_svm40.commands.crc import CrcTable8, SVM40_CRC
+import random
+
+
+def test_crc_table():
+    """
+    Test if the table-driven CRC matches the bitwise CRC calculator.
+    """
+    rnd = random.Random(0)
+    for polynomial, init_value, final_xor in [(0x31, 0xFF, 0x00),
+                                              (0x07, 0x00, 0x55)]:
+        table = CrcTable8(polynomial, init_value, final_xor)
+        reference = CrcCalculator(8, polynomial, init_value, final_xor)
+        for length in range(5):
+            data = bytearray(rnd.randint(0, 255) for _ in range(length))
+            assert table(data) == reference(data)
+    assert SVM40_CRC(b"\xbe\xef") == 0x92  # example from datasheet
+
+
+def test_setter_commands():
+    """
+    Test if cached setter commands send the same data as new instances and
+    are reused for equal parameters.
+    """
+    command = prebuilt.set_temperature_offset(-1.25)
+    assert command.tx_data == \
+        Svm40I2cCmdSetTemperatureOffsetForRhtMeasurements(-1.25).tx_data
+    assert prebuilt.set_temperature_offset(-1.25) is command
+
+    command = prebuilt.set_voc_tuning_parameters(100, 12, 180, 50)
+    assert command.tx_data == \
+        Svm40I2cCmdSetVocAlgorithmTuningParameters(100, 12, 180, 50).tx_data
+    assert prebuilt.set_voc_tuning_parameters(100, 12, 180, 50) is command
+
+    state = [1, 2, 3, 4, 5, 6, 7, 8]
+    assert prebuilt.set_voc_state(state).tx_data == \
+        Svm40I2cCmdSetVocAlgorithmState(state).tx_data
+
+
+def test_read_command():
+    """
+    Test if the prebuilt read commands interpret responses like new
+    instances.
+    """
+    data = b"\x03\xe8\xd4\x11\x94\xe6\x11\xf8\x20" \
+        b"\x75\x30\x08\x0f\xa0\xe4\x13\x88\x01"
+    expected = Svm40I2cCmdReadMeasuredValuesRaw().interpret_response(data)
+    result = prebuilt.read_measured_values_raw().interpret_response(data)
+    assert [str(value) for value in result] == \
+        [str(value) for value in expected]
+    result = prebuilt.read_measured_values_raw(compact=True) \
+        .interpret_response(data)
+    assert [getattr(value, 'ticks', value) for value in result] == \
+        [getattr(value, 'ticks', value) for value in expected]
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_driver import I2cConnection
+from sensirion_i2c_driver.transceiver_v1 import I2cTransceiverV1
+from sensirion_i2c_svm40 import Svm40I2cDevice
+from sensirion_i2c_svm40.instrumentation import CommandStats
+from sensirion_i2c_svm40.simulation import Svm40SimulatedTransceiver
+import time
+
+
+class NoProbeTransceiver(I2cTransceiverV1):
+    """
+    Transceiver which does not support writes without data.
+    """
+    description = "No probe transceiver"
+    channel_count = None
+
+    def __init__(self):
+        super(NoProbeTransceiver, self).__init__()
+        self.probes = 0
+
+    def transceive(self, slave_address, tx_data, rx_length, read_delay,
+                   timeout):
+        if len(tx_data) == 0:
+            self.probes += 1
+            return self.STATUS_UNSPECIFIED_ERROR, IOError("Unsupported"), b""
+        return self.STATUS_OK, None, b""
+
+
+def _multi_channel_connection(transceiver):
+    connection = I2cConnection(transceiver)
+    connection.always_multi_channel_response = True
+    return connection
+
+
+def _duration(function):
+    start = time.time()
+    function()
+    return time.time() - start
+
+
+def test_polling():
+    """
+    Test if commands return as soon as the simulated device is ready, but
+    the device is not accessed while it is busy.
+    """
+    transceiver = Svm40SimulatedTransceiver()
+    device = Svm40I2cDevice(I2cConnection(transceiver),
+                            readiness_polling=True)
+    assert _duration(device.store_nv_data) < 0.4  # worst case 0.5s
+    device.get_version()  # would raise I2cNackError if the device is busy
+    assert _duration(device.device_reset) < 0.09  # worst case 0.1s
+    device.get_version()
+
+    device.instrumentation = CommandStats()
+    device.start_measurement()
+    device.stop_measurement()
+    device.get_version()
+    sleep_time = device.instrumentation.get(
+        'Svm40I2cCmdStopMeasurement').sleep_time
+    assert sleep_time.max < 0.045  # worst case 0.05s
+
+
+def test_fallback():
+    """
+    Test if the worst case post processing time is waited if the
+    transceiver does not support readiness probes.
+    """
+    transceiver = NoProbeTransceiver()
+    device = Svm40I2cDevice(I2cConnection(transceiver),
+                            readiness_polling=True)
+    assert _duration(device.stop_measurement) >= 0.05
+    assert transceiver.probes == 1
+    device.readiness_polling = False
+    device.stop_measurement()
+    assert transceiver.probes == 1
+
+
+def test_multi_channel_response():
+    """
+    Test if a NACKed probe is also detected if the connection returns the
+    errors as multi-channel response instead of raising them.
+    """
+    transceiver = Svm40SimulatedTransceiver()
+    device = Svm40I2cDevice(_multi_channel_connection(transceiver),
+                            readiness_polling=True)
+    device.store_nv_data()
+    # would contain an I2cNackError if the device is still busy
+    version, = device.get_version()
+    assert not isinstance(version, Exception)
+
+    transceiver = NoProbeTransceiver()
+    device = Svm40I2cDevice(_multi_channel_connection(transceiver),
+                            readiness_polling=True)
+    assert _duration(device.stop_measurement) >= 0.05
+    assert transceiver.probes == 1
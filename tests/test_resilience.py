@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_driver import I2cConnection
+from sensirion_i2c_driver.errors import I2cChecksumError, I2cNackError
+from sensirion_i2c_svm40 import Svm40I2cDevice
+from sensirion_i2c_svm40.commands import prebuilt
+from sensirion_i2c_svm40.instrumentation import CommandStats
+from sensirion_i2c_svm40.resilience import CircuitOpenError, \
+    ResiliencePolicy
+from sensirion_i2c_svm40.simulation import Svm40SimulatedTransceiver
+import pytest
+import time
+
+
+class _Flaky(object):
+    """
+    Command function failing with the given exceptions (None for success).
+    """
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def __call__(self, command):
+        self.calls += 1
+        error = self.outcomes.pop(0) if self.outcomes else None
+        if error is not None:
+            raise error
+        return 'ok'
+
+
+# Retried by default.
+_READ = prebuilt.READ_MEASURED_VALUES
+
+
+def _nack():
+    return I2cNackError(None, b"")
+
+
+def test_retry():
+    """
+    Test if transient errors are retried with backoff.
+    """
+    policy = ResiliencePolicy(max_retries=2, backoff=0.01)
+    function = _Flaky(_nack(), I2cChecksumError(0, 0, b""))
+    start = time.time()
+    assert policy.execute(function, _READ) == 'ok'
+    assert time.time() - start >= 0.03  # 0.01 + 0.02
+    assert function.calls == 3
+    assert policy.retries == 2
+    assert policy.consecutive_failures == 0
+
+    function = _Flaky(_nack(), _nack(), _nack())
+    with pytest.raises(I2cNackError):
+        policy.execute(function, _READ)
+    assert function.calls == 3
+    assert policy.consecutive_failures == 1
+
+
+def test_other_errors_not_retried():
+    policy = ResiliencePolicy()
+    function = _Flaky(ValueError())
+    with pytest.raises(ValueError):
+        policy.execute(function, _READ)
+    assert function.calls == 1
+    assert policy.consecutive_failures == 0
+
+
+def test_retry_budget():
+    """
+    Test if retries are limited by the budget, which is refilled by
+    successful commands.
+    """
+    policy = ResiliencePolicy(max_retries=1, backoff=0.0, retry_ratio=0.25,
+                              max_retry_tokens=2.0, failure_threshold=100)
+    for _ in range(2):
+        assert policy.execute(_Flaky(_nack()), _READ) == 'ok'
+    with pytest.raises(I2cNackError):
+        policy.execute(_Flaky(_nack()), _READ)  # 0.5 tokens left
+    assert policy.retries == 2
+    policy.execute(_Flaky(), _READ)
+    policy.execute(_Flaky(), _READ)  # 1.0 token
+    assert policy.execute(_Flaky(_nack()), _READ) == 'ok'
+    assert policy.retries == 3
+
+
+def test_circuit_breaker():
+    """
+    Test if the circuit opens after repeated failures, rejects commands
+    without executing them, and closes after a successful probe.
+    """
+    policy = ResiliencePolicy(max_retries=0, failure_threshold=3,
+                              open_timeout=0.05, max_open_timeout=0.08)
+    for _ in range(3):
+        with pytest.raises(I2cNackError):
+            policy.execute(_Flaky(_nack()), _READ)
+    assert policy.state == ResiliencePolicy.OPEN
+    function = _Flaky()
+    with pytest.raises(CircuitOpenError) as excinfo:
+        policy.execute(function, _READ)
+    assert 0.0 < excinfo.value.retry_in <= 0.05
+    assert function.calls == 0
+    assert policy.rejected == 1
+
+    # failed probe: open for twice as long (limited by the maximum)
+    time.sleep(0.06)
+    with pytest.raises(I2cNackError):
+        policy.execute(_Flaky(_nack(), None), _READ)  # probe is not retried
+    assert policy.state == ResiliencePolicy.OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        policy.execute(function, _READ)
+    assert 0.05 < excinfo.value.retry_in <= 0.08
+
+    # successful probe
+    time.sleep(0.09)
+    assert policy.execute(function, _READ) == 'ok'
+    assert policy.state == ResiliencePolicy.CLOSED
+    assert policy.consecutive_failures == 0
+
+
+def test_device():
+    """
+    Test if a failing device stops accessing the bus when the circuit is
+    open, and reports its retries to the instrumentation.
+    """
+    transceiver = Svm40SimulatedTransceiver()
+    stats = CommandStats()
+    policy = ResiliencePolicy(max_retries=1, backoff=0.0,
+                              failure_threshold=2)
+    device = Svm40I2cDevice(I2cConnection(transceiver), slave_address=0x10,
+                            instrumentation=stats, resilience=policy)
+    assert device.resilience is policy
+    for _ in range(2):
+        with pytest.raises(I2cNackError):
+            device.get_serial_number()
+    count = transceiver.transceive_count
+    with pytest.raises(CircuitOpenError):
+        device.get_serial_number()
+    assert transceiver.transceive_count == count
+    assert stats.get('Svm40I2cCmdGetSerialNumber').retries == 2
+
+
+def test_write_commands_not_retried():
+    """
+    Test if commands which change the device state are not retried by
+    default, but their errors are still counted as failures.
+    """
+    policy = ResiliencePolicy(backoff=0.0)
+    for command in [prebuilt.DEVICE_RESET, prebuilt.START_MEASUREMENT,
+                    prebuilt.STOP_MEASUREMENT, prebuilt.STORE_NV_DATA,
+                    prebuilt.set_voc_state([0] * 8)]:
+        function = _Flaky(_nack(), None)
+        with pytest.raises(I2cNackError):
+            policy.execute(function, command)
+        assert function.calls == 1
+    assert policy.retries == 0
+    assert policy.consecutive_failures == 5
+
+    policy = ResiliencePolicy(backoff=0.0,
+                              retry_commands=[type(prebuilt.STORE_NV_DATA)])
+    assert policy.execute(_Flaky(_nack()), prebuilt.STORE_NV_DATA) == 'ok'
+    with pytest.raises(I2cNackError):
+        policy.execute(_Flaky(_nack()), _READ)
+
+
+def test_expected_errors():
+    """
+    Test if expected errors are neither retried nor counted as failures.
+    """
+    policy = ResiliencePolicy(backoff=0.0, failure_threshold=1)
+    function = _Flaky(_nack())
+    with pytest.raises(I2cNackError):
+        policy.execute(function, prebuilt.GET_VOC_STATE,
+                       expected_errors=(I2cNackError,))
+    assert function.calls == 1
+    assert policy.retries == 0
+    assert policy.consecutive_failures == 0
+    assert policy.state == ResiliencePolicy.CLOSED
+
+
+def test_apply_configuration_mode_probe():
+    """
+    Test if the operating mode probe of apply_configuration() in idle mode
+    does not use the retry budget and does not open the circuit.
+    """
+    transceiver = Svm40SimulatedTransceiver()
+    stats = CommandStats()
+    policy = ResiliencePolicy(backoff=0.0, failure_threshold=1)
+    device = Svm40I2cDevice(I2cConnection(transceiver),
+                            instrumentation=stats, resilience=policy)
+    result = device.apply_configuration(
+        voc_tuning_parameters=(120, 12, 180, 50), store_nv=False)
+    assert result.changed == ['voc_tuning_parameters']
+    assert stats.get('Svm40I2cCmdGetVocAlgorithmState').executions == 1
+    assert policy.retries == 0
+    assert policy.consecutive_failures == 0
+    assert policy.state == ResiliencePolicy.CLOSED
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_svm40.response_types import AirQuality, Humidity, \
+    Temperature, CompactAirQuality, CompactHumidity, CompactTemperature
+import pickle
+import pytest
+
+
+@pytest.mark.parametrize("default_type,compact_type,attributes", [
+    (AirQuality, CompactAirQuality, ['ticks', 'voc_index']),
+    (Humidity, CompactHumidity, ['ticks', 'percent_rh']),
+    (Temperature, CompactTemperature,
+     ['ticks', 'degrees_celsius', 'degrees_fahrenheit']),
+])
+def test_compact_types(default_type, compact_type, attributes):
+    """
+    Test if the compact types behave like the default response types.
+    """
+    default = default_type(-1234)
+    compact = compact_type(-1234)
+    for attribute in attributes:
+        assert getattr(compact, attribute) == getattr(default, attribute)
+    assert str(compact) == str(default)
+    assert not hasattr(compact, '__dict__')
+    with pytest.raises(AttributeError):
+        compact.ticks = 0
+
+
+def test_compact_types_hash_and_pickle():
+    """
+    Test if the compact types are hashable, comparable and picklable.
+    """
+    humidity = CompactHumidity(4500)
+    assert humidity == CompactHumidity(4500)
+    assert humidity != CompactHumidity(4501)
+    assert humidity != CompactTemperature(4500)
+    assert len({humidity, CompactHumidity(4500), CompactTemperature(4500)}) \
+        == 2
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        restored = pickle.loads(pickle.dumps(humidity, protocol))
+        assert type(restored) is CompactHumidity
+        assert restored == humidity
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_svm40.rht_compensation import compensate, \
+    compensate_ticks
+import numpy as np
+import pytest
+import time
+
+
+def test_zero_offset():
+    """
+    Test if a zero offset returns the raw values.
+    """
+    humidity, temperature = compensate_ticks([4500, 0, 10000], [5000] * 3, 0.)
+    assert humidity.tolist() == [4500, 0, 10000]
+    assert temperature.tolist() == [5000] * 3
+
+
+# Reference vectors (raw %RH, raw °C, offset °C, compensated %RH) computed
+# with the Magnus formula (beta = 17.62, lambda = 243.12 °C) via the dew point.
+# E.g. 50 %RH at 25 °C correspond to 67.74 %RH at 20 °C (saturation vapor
+# pressures 31.67 hPa and 23.37 hPa).
+REFERENCE = [
+    (50., 25., 5., 67.7369),
+    (20., -10., 2.5, 24.4085),
+    (45., 25., 2.5, 52.3022),
+    (60., 40., 2.5, 68.6582),
+    (30., 30., -3., 25.2996),
+]
+
+
+@pytest.mark.parametrize("raw_humidity,raw_temperature,offset,expected",
+                         REFERENCE)
+def test_reference(raw_humidity, raw_temperature, offset, expected):
+    """
+    Test if the compensation matches the reference vectors.
+    """
+    humidity, temperature = compensate(int(raw_humidity * 100),
+                                       int(raw_temperature * 200), offset)
+    assert temperature == raw_temperature - offset
+    assert humidity == pytest.approx(expected, abs=1e-3)
+    humidity, temperature = compensate_ticks(int(raw_humidity * 100),
+                                             int(raw_temperature * 200),
+                                             offset)
+    assert temperature == int((raw_temperature - offset) * 200)
+    assert humidity == int(round(expected * 100))
+
+
+def test_clamped():
+    humidity, _ = compensate_ticks(9000, 5000, 5.)
+    assert humidity == 10000
+    humidity, _ = compensate(9000, 5000, 5.)
+    assert humidity == 100.
+
+
+def test_offset_sweep():
+    """
+    Test if several offsets can be evaluated at once by broadcasting.
+    """
+    offsets = np.array([-1., 0., 1., 2.])[:, np.newaxis]
+    humidity, temperature = compensate_ticks(np.full(10, 4000),
+                                             np.full(10, 5000), offsets)
+    assert humidity.shape == temperature.shape == (4, 10)
+    assert temperature[:, 0].tolist() == [5200, 5000, 4800, 4600]
+    assert np.all(np.diff(humidity[:, 0]) > 0)  # cooler means more humid
+
+
+def test_simulated_device(simulated_device):
+    """
+    Test if the compensated raw values match the values of the device.
+    """
+    simulated_device.set_compensation_temperature_offset(3.25)
+    simulated_device.start_measurement()
+    time.sleep(0.02)
+    _, humidity, temperature, _, raw_humidity, raw_temperature = \
+        simulated_device.read_measured_values_raw()
+    simulated_device.stop_measurement()
+    humidity_ticks, temperature_ticks = compensate_ticks(
+        raw_humidity.ticks, raw_temperature.ticks, 3.25)
+    assert temperature_ticks == temperature.ticks
+    # the device compensates the unrounded raw values
+    assert abs(int(humidity_ticks) - humidity.ticks) <= 2
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_driver import I2cConnection
+from sensirion_i2c_driver.errors import I2cNackError
+from sensirion_i2c_svm40 import Svm40I2cDevice
+from sensirion_i2c_svm40.response_types import AirQuality, Humidity, \
+    Temperature
+from sensirion_i2c_svm40.version_types import Version
+from sensirion_i2c_svm40.simulation import Svm40SimulatedTransceiver
+import pytest
+import time
+
+
+def test_identification(simulated_device):
+    """
+    Test if serial number and version are read correctly.
+    """
+    serial_number = simulated_device.get_serial_number()
+    assert len(serial_number) == 16
+    assert serial_number == simulated_device.get_serial_number()
+    version = simulated_device.get_version()
+    assert type(version) is Version
+    assert version.firmware.major == 2
+
+
+def test_configuration(simulated_device):
+    """
+    Test if the configuration is stored to the non-volatile memory, and reset
+    to the stored values by a device reset.
+    """
+    assert simulated_device.get_voc_tuning_parameters() == (100, 12, 180, 50)
+    simulated_device.set_compensation_temperature_offset(1.5)
+    simulated_device.set_voc_tuning_parameters(120, 24, 60, 40)
+    simulated_device.store_nv_data()
+    simulated_device.set_compensation_temperature_offset(-2.0)
+    assert simulated_device.get_compensation_temperature_offset() == -2.0
+    simulated_device.device_reset()
+    assert simulated_device.get_compensation_temperature_offset() == 1.5
+    assert simulated_device.get_voc_tuning_parameters() == (120, 24, 60, 40)
+
+
+def test_measurement(simulated_device):
+    """
+    Test if measured values are zero initially and updated periodically.
+    """
+    simulated_device.start_measurement()
+    air_quality, humidity, temperature = \
+        simulated_device.read_measured_values()
+    assert air_quality.ticks == humidity.ticks == temperature.ticks == 0
+
+    time.sleep(0.015)  # more than one update interval
+    values = simulated_device.read_measured_values_raw()
+    assert [type(value) for value in values] == \
+        [AirQuality, Humidity, Temperature, int, Humidity, Temperature]
+    assert 1.0 <= values[0].voc_index <= 500.0
+    assert 20.0 <= values[2].degrees_celsius <= 30.0
+    assert 0 < values[3] < 65536
+
+    state = simulated_device.get_voc_state()
+    assert len(state) == 8
+    simulated_device.stop_measurement()
+    simulated_device.set_voc_state(state)
+
+
+def test_nack():
+    """
+    Test if commands are not acknowledged in the wrong mode, while the device
+    is busy and for a wrong slave address.
+    """
+    transceiver = Svm40SimulatedTransceiver(realtime=False)
+    device = Svm40I2cDevice(I2cConnection(transceiver))
+    with pytest.raises(I2cNackError):
+        device.read_measured_values()  # not available in idle mode
+    device.start_measurement()
+    with pytest.raises(I2cNackError):
+        device.set_voc_tuning_parameters(100, 12, 180, 50)
+    status, error, _ = transceiver.transceive(0x6A, b"\x01\x04", None, 0, 0)
+    assert status == transceiver.STATUS_OK  # stop measurement
+    status, error, _ = transceiver.transceive(0x6A, b"\xd1\x00", 12, 0, 0)
+    assert status == transceiver.STATUS_NACK  # still busy
+    status, error, _ = transceiver.transceive(0x69, b"\xd1\x00", 12, 0, 0)
+    assert status == transceiver.STATUS_NACK  # wrong address
+
+
+def test_read_delay_scaled():
+    """
+    Test if the read delay is scaled by the speed factor like the simulated
+    time.
+    """
+    transceiver = Svm40SimulatedTransceiver(speed=100.)
+    start = time.time()
+    status, _, _ = transceiver.transceive(0x6A, b"\xd1\x00", 12, 1.0, 0)
+    assert status == transceiver.STATUS_OK
+    assert 0.01 <= time.time() - start < 0.5
+
+
+@pytest.mark.parametrize("command,words", [
+    (0x6014, 2),  # temperature offset
+    (0x6083, 3),  # VOC tuning parameters
+    (0x6083, 5),
+    (0x6181, 2),  # VOC state
+])
+def test_wrong_payload_length(command, words):
+    """
+    Test if a write command with a wrong payload length is not acknowledged.
+    """
+    from sensirion_i2c_svm40.commands.crc import SVM40_CRC
+    transceiver = Svm40SimulatedTransceiver(realtime=False)
+    frame = bytearray([command >> 8, command & 0xFF])
+    for _ in range(words):
+        frame += b"\x00\x01" + bytearray([SVM40_CRC(b"\x00\x01")])
+    status, error, _ = transceiver.transceive(0x6A, bytes(frame), None, 0, 0)
+    assert status == transceiver.STATUS_NACK
+    assert "payload length" in str(error)
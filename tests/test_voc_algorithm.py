@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_svm40.voc_algorithm import VocAlgorithm, \
+    decode_voc_state, encode_voc_state
+import numpy as np
+import pytest
+
+
+def _sraw(count, seed=0):
+    """
+    Create a raw VOC signal: slow drift with some events and noise.
+    """
+    rnd = np.random.RandomState(seed)
+    t = np.arange(count, dtype=np.float64)
+    sraw = 30000 + 300 * np.sin(t / 1800.) + rnd.normal(0, 5, count)
+    sraw[count // 2:count // 2 + 300] -= 1500  # VOC event
+    return np.round(sraw)
+
+
+def test_blackout():
+    """
+    Test if the VOC index is zero during the initial blackout.
+    """
+    result = VocAlgorithm().run(_sraw(100))
+    assert np.all(result[:46] == 0)
+    assert np.all(result[46:] >= 0.5)
+
+
+@pytest.mark.parametrize("offset", [100, 250])
+def test_constant_signal(offset):
+    """
+    Test if a constant signal converges to the VOC index offset.
+    """
+    result = VocAlgorithm(voc_index_offset=offset).run(np.full(3600, 30000))
+    assert result[-1, 0] == pytest.approx(offset, abs=1.)
+
+
+def test_event():
+    """
+    Test if a drop of the raw signal (i.e. more VOCs) raises the index.
+    """
+    sraw = _sraw(7200)
+    result = VocAlgorithm().run(sraw)[:, 0]
+    assert result[3600 + 299] > result[3590] + 50
+
+
+@pytest.mark.parametrize("count", [3, 18])
+def test_batch_matches_single_instances(count):
+    """
+    Test if every instance of a batch (processed instance by instance, or
+    with NumPy operations) behaves like a single instance with the same
+    tuning parameters and signal.
+    """
+    parameters = [(100, 12, 180, 50), (200, 6, 60, 30),
+                  (50, 24, 300, 80)] * (count // 3)
+    sraw = np.stack([_sraw(5000, seed) for seed in range(count)], axis=1)
+    batch = VocAlgorithm(count, *zip(*parameters)).run(sraw)
+    for i, (offset, hours, minutes, std) in enumerate(parameters):
+        single = VocAlgorithm(1, offset, hours, minutes, std).run(sraw[:, i])
+        assert np.allclose(batch[:, i], single[:, 0])
+
+
+@pytest.mark.parametrize("count", [2, 16])
+def test_single_matches_batch(count):
+    """
+    Test if the scalar processing of a single series matches the processing
+    of a batch, also with invalid samples, a restored state and when
+    continued sample by sample.
+    """
+    sraw = _sraw(5000)
+    sraw[[100, 2000, 2001]] = 0
+    single = VocAlgorithm()
+    batch = VocAlgorithm(count=count)
+    for algorithm in (single, batch):
+        algorithm.set_states([9800., 60.])
+    assert np.array_equal(single.run(sraw[:4000])[:, 0],
+                          batch.run(sraw[:4000])[:, 0])
+    for value in sraw[4000:]:
+        assert single.process(value)[0] == batch.process(value)[0]
+    assert np.array_equal(single.get_states()[0], batch.get_states()[0])
+
+
+def test_rounded():
+    """
+    Test if the VOC index is rounded to integers like on the device.
+    """
+    result = VocAlgorithm(count=2).run(_sraw(1000))
+    assert np.array_equal(result, np.round(result))
+    assert np.array_equal(VocAlgorithm().process(30000), [0.])
+
+
+def test_process_matches_run():
+    sraw = _sraw(300)
+    algorithm = VocAlgorithm(count=2)
+    expected = VocAlgorithm(count=2).run(sraw)
+    for i, value in enumerate(sraw):
+        assert np.array_equal(algorithm.process(value), expected[i])
+
+
+def test_invalid_samples_ignored():
+    """
+    Test if invalid samples are treated like a repetition of the last valid
+    sample, in some instances of a batch only.
+    """
+    sraw = _sraw(2000)
+    invalid = sraw.copy()
+    invalid[100:110] = 0
+    invalid[500] = 65000
+    repeated = sraw.copy()
+    repeated[100:110] = sraw[99]
+    repeated[500] = sraw[499]
+    result = VocAlgorithm(count=2).run(np.stack([invalid, sraw], axis=1))
+    assert np.allclose(result[:, 0], VocAlgorithm().run(repeated)[:, 0])
+    assert np.allclose(result[:, 1], VocAlgorithm().run(sraw)[:, 0])
+
+
+def test_state_round_trip():
+    state = encode_voc_state(10000.5, 42.25)
+    assert len(state) == 8
+    assert decode_voc_state(state) == (10000.5, 42.25)
+    with pytest.raises(ValueError):
+        decode_voc_state([0] * 7)
+
+
+def test_start_from_state():
+    """
+    Test if a restored state skips the initial learning phase.
+    """
+    sraw = _sraw(4 * 3600)
+    learned = VocAlgorithm()
+    learned.run(sraw[:3 * 3600])
+    state = encode_voc_state(*learned.get_states()[0])
+    restored = VocAlgorithm()
+    restored.set_states(decode_voc_state(state))
+    assert restored.get_states()[0] == pytest.approx(learned.get_states()[0])
+    result = restored.run(sraw[3 * 3600:])[600:, 0]
+    reference = learned.run(sraw[3 * 3600:])[600:, 0]
+    fresh = VocAlgorithm().run(sraw[3 * 3600:])[600:, 0]
+    # after the lowpass filter settled, the restored instance follows the
+    # learned one, unlike an instance starting from scratch
+    assert np.mean(np.abs(result - reference)) < 3.
+    assert np.mean(np.abs(fresh - reference)) > 10.
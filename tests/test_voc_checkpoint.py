@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_svm40.voc_checkpoint import VocStateCheckpointer
+import mock
+import os
+import threading
+import time
+
+
+class FakeDevice(object):
+    """
+    Device providing serial number and VOC state.
+    """
+    def __init__(self, serial_number="0123456789ABCDEF"):
+        self.serial_number = serial_number
+        self.state = [1, 2, 3, 4, 5, 6, 7, 8]
+        self.restored_state = None
+        self.reads = 0
+
+    def get_serial_number(self):
+        return self.serial_number
+
+    def get_voc_state(self):
+        self.reads += 1
+        return list(self.state)
+
+    def set_voc_state(self, state):
+        self.restored_state = list(state)
+
+
+def test_checkpoint_and_restore(tmpdir):
+    """
+    Test if the newest snapshot is restored, and only the newest snapshots
+    are kept.
+    """
+    directory = str(tmpdir.join("snapshots"))
+    device = FakeDevice()
+    checkpointer = VocStateCheckpointer(device, directory, keep=2)
+    assert checkpointer.restore() is False  # no snapshot yet
+    for i in range(3):
+        device.state[0] = i
+        with mock.patch('time.time', return_value=1e9 + i):
+            checkpointer.checkpoint()
+    assert len(os.listdir(directory)) == 2
+
+    other = FakeDevice(serial_number="FEDCBA9876543210")
+    assert VocStateCheckpointer(other, directory).restore() is False
+
+    device = FakeDevice()
+    with mock.patch('time.time', return_value=1e9 + 600.):
+        assert VocStateCheckpointer(device, directory).restore() is True
+    assert device.restored_state == [2, 2, 3, 4, 5, 6, 7, 8]
+
+
+def test_invalid_and_expired(tmpdir):
+    """
+    Test if corrupt snapshots are skipped and expired snapshots are not
+    restored.
+    """
+    directory = str(tmpdir)
+    device = FakeDevice()
+    checkpointer = VocStateCheckpointer(device, directory, max_age=60.)
+    with mock.patch('time.time', return_value=1e9):
+        checkpointer.checkpoint()
+    with mock.patch('time.time', return_value=1e9 + 1):
+        path = checkpointer.checkpoint()
+    with open(path, 'w') as f:
+        f.write('{"format": 1, "serial_')  # torn write (not atomic)
+    with mock.patch('time.time', return_value=1e9 + 10.):
+        assert checkpointer.load() == ([1, 2, 3, 4, 5, 6, 7, 8], 10.)
+    with mock.patch('time.time', return_value=1e9 + 61.):
+        assert checkpointer.restore() is False
+    assert device.restored_state is None
+
+
+def test_background_thread(tmpdir):
+    """
+    Test if the background thread takes checkpoints periodically while
+    holding the lock.
+    """
+    lock = threading.Lock()
+    device = FakeDevice()
+    checkpointer = VocStateCheckpointer(device, str(tmpdir), interval=0.01,
+                                        keep=100, lock=lock)
+    with checkpointer:
+        assert checkpointer.is_running
+        time.sleep(0.1)
+        with lock:
+            reads = device.reads
+            time.sleep(0.05)
+            assert device.reads == reads
+    assert not checkpointer.is_running
+    assert reads >= 2
+    assert len(os.listdir(str(tmpdir))) >= reads
+
+
+def test_maybe_checkpoint(tmpdir):
+    """
+    Test if checkpoints are taken synchronously once per interval.
+    """
+    device = FakeDevice()
+    checkpointer = VocStateCheckpointer(device, str(tmpdir), interval=60.,
+                                        keep=100)
+    clock = mock.Mock(return_value=1000.)
+    with mock.patch('sensirion_i2c_svm40.voc_checkpoint._clock', clock):
+        assert checkpointer.maybe_checkpoint() is None  # first call
+        clock.return_value = 1059.
+        assert checkpointer.maybe_checkpoint() is None
+        clock.return_value = 1060.
+        assert checkpointer.maybe_checkpoint() is not None
+        assert checkpointer.maybe_checkpoint() is None
+        device.get_voc_state = mock.Mock(side_effect=IOError("NACK"))
+        clock.return_value = 1120.
+        assert checkpointer.maybe_checkpoint() is None  # error logged
+    assert device.reads == 1
+
+
+def test_orphaned_temporary_files(tmpdir):
+    """
+    Test if temporary files of the device left behind by a crash are removed
+    on the next checkpoint.
+    """
+    device = FakeDevice()
+    orphan = tmpdir.join("0123456789ABCDEF.abc123.tmp")
+    orphan.write('{"format": 1')
+    other = tmpdir.join("FEDCBA9876543210.abc123.tmp")
+    other.write('{"format": 1')
+    VocStateCheckpointer(device, str(tmpdir)).checkpoint()
+    assert not orphan.exists()
+    assert other.exists()  # belongs to another device
+    assert len([name for name in os.listdir(str(tmpdir))
+                if name.endswith('.json')]) == 1
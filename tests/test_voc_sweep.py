@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_i2c_svm40.archive import ArchiveWriter
+from sensirion_i2c_svm40.binary_log import BinaryLogWriter, record_dtype
+from sensirion_i2c_svm40.voc_algorithm import VocAlgorithm
+from sensirion_i2c_svm40.voc_sweep import find_shards, parameter_grid, \
+    sweep, PARAMETERS
+import mock
+import numpy as np
+import pytest
+
+
+def _sraw(count, seed):
+    rnd = np.random.RandomState(seed)
+    t = np.arange(count, dtype=np.float64)
+    sraw = 30000 + 300 * np.sin(t / 600.) + rnd.normal(0, 5, count)
+    sraw[count // 2:count // 2 + 200] -= 1500  # VOC event
+    return np.round(sraw).astype(np.uint16)
+
+
+@pytest.fixture
+def recordings(tmpdir):
+    """
+    A binary log with two interleaved devices, and an archive of a third
+    device.
+    """
+    signals = [_sraw(3000, seed) for seed in range(3)]
+    log_path = str(tmpdir.join('devices.svm40log'))
+    with BinaryLogWriter(log_path, batch_size=1000) as writer:
+        for i in range(3000):
+            for device_index in (0, 1):
+                writer.append_ticks(0, 0, 0, raw_voc_ticks=signals[
+                    device_index][i], device_index=device_index,
+                    timestamp=1.6e9 + i)
+    records = np.zeros(3000, dtype=record_dtype())
+    records['timestamp'] = 1.6e9 + np.arange(3000)
+    records['raw_voc_ticks'] = signals[2]
+    archive_path = str(tmpdir.join('device.svm40arc'))
+    with ArchiveWriter(archive_path, chunk_duration=1000) as writer:
+        writer.write(records)
+    return [log_path, archive_path], signals
+
+
+def test_parameter_grid():
+    grid = parameter_grid(learning_time_hours=[6, 12], std_initial=[30, 50])
+    assert len(grid) == 4
+    assert grid.dtype.names == PARAMETERS
+    assert grid[3].tolist() == (100, 12, 180, 50)
+
+
+def test_find_shards(recordings):
+    paths, _ = recordings
+    assert find_shards(paths) == [(paths[0], 0), (paths[0], 1),
+                                  (paths[1], None)]
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_sweep(recordings, processes):
+    """
+    Test if the metrics match the VOC index computed directly.
+    """
+    paths, signals = recordings
+    grid = parameter_grid(voc_index_offset=[100, 200],
+                          learning_time_hours=[1, 12])
+    results = sweep(find_shards(paths), grid, processes=processes,
+                    warmup=500, threshold=150., chunk_size=700)
+    voc_index = np.concatenate([VocAlgorithm(
+        len(grid), *(grid[name] for name in PARAMETERS)).run(signal)[500:]
+        for signal in signals])
+    assert results['samples'].tolist() == [3 * 2500] * 4
+    assert np.allclose(results['mean'], voc_index.mean(axis=0))
+    assert np.allclose(results['std'], voc_index.std(axis=0))
+    assert np.allclose(results['min'], voc_index.min(axis=0))
+    assert np.allclose(results['max'], voc_index.max(axis=0))
+    assert np.allclose(results['above'], (voc_index > 150.).mean(axis=0))
+    for name in PARAMETERS:
+        assert np.array_equal(results[name], grid[name])
+
+
+def test_sweep_without_samples(recordings):
+    paths, _ = recordings
+    results = sweep([paths[1]], parameter_grid(), processes=0, warmup=5000)
+    assert results['samples'][0] == 0
+    assert np.isnan(results['mean'][0]) and np.isnan(results['max'][0])
+
+
+def test_file_read_once(recordings):
+    """
+    Test if a binary log containing several devices is read only once.
+    """
+    from sensirion_i2c_svm40.binary_log import BinaryLogReader
+    paths, _ = recordings
+    original = BinaryLogReader.chunks
+    calls = []
+
+    def chunks(self, *args, **kwargs):
+        calls.append(self)
+        return original(self, *args, **kwargs)
+
+    with mock.patch.object(BinaryLogReader, 'chunks', chunks):
+        results = sweep(find_shards(paths[:1]), parameter_grid(),
+                        processes=0, warmup=0)
+    assert len(calls) == 1
+    assert results['samples'].tolist() == [2 * 3000]